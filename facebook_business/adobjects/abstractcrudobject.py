@@ -23,13 +23,16 @@ from facebook_business.exceptions import (
 )
 from facebook_business.api import (
     FacebookAdsApi,
+    FacebookBatchFuture,
     Cursor,
     FacebookRequest,
+    check_sync_api,
 )
 
 from facebook_business.adobjects.abstractobject import AbstractObject
 from facebook_business.adobjects.objectparser import ObjectParser
 
+import collections
 import logging
 
 class AbstractCrudObject(AbstractObject):
@@ -68,7 +71,7 @@ class AbstractCrudObject(AbstractObject):
         if key not in self._data or self._data[key] != value:
             self._changes[key] = value
         super(AbstractCrudObject, self).__setitem__(key, value)
-        if '_setitem_trigger' in dir(self):
+        if hasattr(self, '_setitem_trigger'):
             self._setitem_trigger(key, value)
 
         return self
@@ -96,16 +99,44 @@ class AbstractCrudObject(AbstractObject):
     @classmethod
     def get_by_ids(cls, ids, params=None, fields=None, api=None):
         api = api or FacebookAdsApi.get_default_api()
+        check_sync_api(api, 'get_by_ids')
         params = dict(params or {})
-        cls._assign_fields_to_params(fields, params)
-        params['ids'] = ','.join(map(str, ids))
-        response = api.call(
-            'GET',
-            ['/'],
-            params=params,
-        )
+        get_object_cache = getattr(api, 'get_object_cache', None)
+        object_cache = get_object_cache() if get_object_cache else None
+        data_by_id = collections.OrderedDict()
+        cache_keys = {}
+        if object_cache is not None:
+            # Only the objects missing from the cache are read
+            if fields is None:
+                fields = cls.get_default_read_fields()
+            for fbid in map(str, ids):
+                cache_keys[fbid] = object_cache.get_key(
+                    cls,
+                    fbid,
+                    fields,
+                    params,
+                    api._api_version,
+                )
+                data = object_cache.get(cache_keys[fbid])
+                if data is not None:
+                    data_by_id[fbid] = data
+            ids = [fbid for fbid in cache_keys if fbid not in data_by_id]
+
+        if ids:
+            cls._assign_fields_to_params(fields, params)
+            params['ids'] = ','.join(map(str, ids))
+            response = api.call(
+                'GET',
+                ['/'],
+                params=params,
+            )
+            for fbid, data in response.json().items():
+                if fbid in cache_keys:
+                    object_cache.set(cache_keys[fbid], data)
+                data_by_id[fbid] = data
+
         result = []
-        for fbid, data in response.json().items():
+        for fbid, data in data_by_id.items():
             obj = cls(fbid, api=api)
             obj._set_data(data)
             result.append(obj)
@@ -254,7 +285,7 @@ class AbstractCrudObject(AbstractObject):
                 the FacebookResponse of this call if the call failed with a transient error.
         Returns:
             self if not a batch call.
-            the return value of batch.add if a batch call.
+            the FacebookBatchFuture of the call if a batch call.
         """
         warning_message = "`remote_create` is being deprecated, please update your code with new function."
         logging.warning(warning_message)
@@ -310,7 +341,7 @@ class AbstractCrudObject(AbstractObject):
                 transient_error=callback_transient_error,
             )
         else:
-            response = request.execute()
+            response = self._execute_now(request, 'remote_create')
             self._set_data(response._json)
             self._clear_history()
 
@@ -346,7 +377,7 @@ class AbstractCrudObject(AbstractObject):
                 the FacebookResponse of this call if the call failed with a transient error.
         Returns:
             self if not a batch call.
-            the return value of batch.add if a batch call.
+            the FacebookBatchFuture of the call if a batch call.
         """
         warning_message = "`remote_read` is being deprecated, please update your code with new function."
         logging.warning(warning_message)
@@ -390,7 +421,7 @@ class AbstractCrudObject(AbstractObject):
             )
             return batch_call
         else:
-            self = request.execute()
+            self = self._execute_now(request, 'remote_read')
             return self
 
     # @deprecated
@@ -422,7 +453,7 @@ class AbstractCrudObject(AbstractObject):
                 the FacebookResponse of this call if the call failed with a transient error.
         Returns:
             self if not a batch call.
-            the return value of batch.add if a batch call.
+            the FacebookBatchFuture of the call if a batch call.
         """
         warning_message = "`remote_update` is being deprecated, please update your code with new function."
         logging.warning(warning_message)
@@ -468,7 +499,7 @@ class AbstractCrudObject(AbstractObject):
             )
             return batch_call
         else:
-            request.execute()
+            self._execute_now(request, 'remote_update')
             self._clear_history()
 
             return self
@@ -499,7 +530,7 @@ class AbstractCrudObject(AbstractObject):
                 the FacebookResponse of this call if the call failed with a transient error.
         Returns:
             self if not a batch call.
-            the return value of batch.add if a batch call.
+            the FacebookBatchFuture of the call if a batch call.
         """
         warning_message = "`remote_delete` is being deprecated, please update your code with new function."
         logging.warning(warning_message)
@@ -536,13 +567,23 @@ class AbstractCrudObject(AbstractObject):
             )
             return batch_call
         else:
-            request.execute()
+            self._execute_now(request, 'remote_delete')
             self.clear_id()
 
             return self
 
     # Helpers
 
+    @staticmethod
+    def _execute_now(request, name):
+        """Executes the request and returns its parsed response, waiting for
+        its batch in the context of FacebookAdsApi.auto_batch()."""
+        check_sync_api(request._api, name)
+        result = request.execute()
+        if isinstance(result, FacebookBatchFuture):
+            return result.result()
+        return result
+
     # @deprecated
     def remote_save(self, *args, **kwargs):
         """
@@ -585,12 +626,17 @@ class AbstractCrudObject(AbstractObject):
         params=None,
         fetch_first_page=True,
         include_summary=True,
-        endpoint=None
+        endpoint=None,
+        prefetch=False,
+        raw=False,
     ):
         """
         Returns Cursor with argument self as source_object and
         the rest as given __init__ arguments.
         Note: list(iterate_edge(...)) can prefetch all the objects.
+        With prefetch=True, the next page is fetched on a worker thread while
+        the current one is consumed. With raw=True, the cursor yields the
+        decoded JSON rows instead of target_objects_class objects.
         """
         source_object = self
         cursor = Cursor(
@@ -600,6 +646,8 @@ class AbstractCrudObject(AbstractObject):
             params=params,
             include_summary=include_summary,
             endpoint=endpoint,
+            prefetch=prefetch,
+            raw=raw,
         )
         if fetch_first_page:
             cursor.load_next_page()
@@ -647,6 +695,7 @@ class AbstractCrudObject(AbstractObject):
         # indicates the progress of the async request.
         if endpoint is None:
             endpoint = target_objects_class.get_endpoint()
+        check_sync_api(self.get_api_assured(), 'iterate_edge_async')
         response = self.get_api_assured().call(
             'POST',
             (self.get_id_assured(), endpoint),
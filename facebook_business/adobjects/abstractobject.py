@@ -24,6 +24,7 @@ from facebook_business.exceptions import (
 from facebook_business.typechecker import TypeChecker
 
 import collections
+import inspect
 import json
 
 class AbstractObject(collections.MutableMapping):
@@ -41,8 +42,7 @@ class AbstractObject(collections.MutableMapping):
 
     def __init__(self):
         self._data = {}
-        self._field_checker = TypeChecker(self._field_types,
-            self._get_field_enum_info())
+        self._field_checker = self._get_field_checker()
 
     def __getitem__(self, key):
         return self._data[str(key)]
@@ -100,6 +100,36 @@ class AbstractObject(collections.MutableMapping):
         """
         return {}
 
+    @classmethod
+    def _get_field_checker(cls):
+        """Returns the TypeChecker of the class fields. It is built on first
+        use and shared by all the instances of the class (but not by its
+        subclasses, which have their own fields).
+        """
+        checker = cls.__dict__.get('_field_checker_cache')
+        if checker is None:
+            checker = TypeChecker(
+                cls._field_types,
+                cls._get_compiled_field_enum_info(),
+            )
+            cls._field_checker_cache = checker
+        return checker
+
+    @classmethod
+    def _get_compiled_field_enum_info(cls):
+        """Returns _get_field_enum_info() with the values of the enum classes
+        only, leaving out their __module__, __doc__, etc. entries."""
+        field_enum_info = {}
+        for enum_name, values in cls._get_field_enum_info().items():
+            enum_class = getattr(cls, enum_name, None)
+            if inspect.isclass(enum_class):
+                values = [
+                    value for name, value in vars(enum_class).items()
+                    if not name.startswith('__')
+                ]
+            field_enum_info[enum_name] = values
+        return field_enum_info
+
     # @deprecated get_endpoint function is deprecated
     @classmethod
     def get_endpoint(cls):
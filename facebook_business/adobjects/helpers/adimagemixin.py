@@ -19,7 +19,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 from facebook_business.adobjects.adaccount import AdAccount
-from facebook_business.api import FacebookAdsApi
+from facebook_business.api import FacebookAdsApi, check_sync_api
 from facebook_business.exceptions import FacebookBadObjectError
 from facebook_business.adobjects.abstractcrudobject import AbstractCrudObject
 
@@ -27,6 +27,7 @@ class AdImageMixin:
     @classmethod
     def remote_create_from_zip(cls, filename, parent_id, api=None):
         api = api or FacebookAdsApi.get_default_api()
+        check_sync_api(api, 'remote_create_from_zip')
         open_file = open(filename, 'rb')
         response = api.call(
             'POST',
@@ -18,6 +18,8 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+from facebook_business.api import check_sync_api
+
 class ReachFrequencyPredictionMixin:
     def reserve(
         self,
@@ -36,6 +38,7 @@ class ReachFrequencyPredictionMixin:
         }
         # Filter out None values.
         params = dict((k, v) for k, v in params.items() if v is not None)
+        check_sync_api(self.get_api_assured(), 'reserve')
 
         response = self.get_api_assured().call(
             'POST',
@@ -50,6 +53,7 @@ class ReachFrequencyPredictionMixin:
             self.Field.prediction_id: self.get_id_assured(),
             self.Field.action: self.Action.cancel,
         }
+        check_sync_api(self.get_api_assured(), 'cancel')
         self.get_api_assured().call(
             'POST',
             (self.get_parent_id_assured(), self.get_endpoint()),
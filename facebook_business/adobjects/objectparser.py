@@ -82,8 +82,16 @@ class ObjectParser:
                 'Must specify either target class calling object' +
                 'or custom parse method for parser')
 
-    def parse_multiple(self, response):
+    def parse_multiple(self, response, raw=False):
+        """Parses a response holding a list of objects.
+        Args:
+            response: The decoded response.
+            raw (optional): Return the decoded rows as they are, without
+                building any object.
+        """
         if 'data' in response and isinstance(response['data'], list):
+            if raw:
+                return response['data']
             ret = []
             if isinstance(response['data'], list):
                 for json_obj in response['data']:
@@ -92,6 +100,8 @@ class ObjectParser:
                 ret.append(self.parse_single(response['data']))
         else:
             data = response['data'] if 'data' in response else response
+            if raw:
+                return [data]
             ret = [AbstractObject.create_object(self._api, data,
                                                 self._target_class)]
 
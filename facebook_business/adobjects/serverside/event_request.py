@@ -18,13 +18,13 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import json
 import pprint
 import six
 
 from facebook_business.adobjects.adspixel import AdsPixel
 from facebook_business.adobjects.serverside.event import Event
 from facebook_business.adobjects.serverside.event_response import EventResponse
+from facebook_business.utils import jsoncodec
 
 
 class EventRequest(object):
@@ -231,7 +231,7 @@ class EventRequest(object):
         normalized_events = []
         for event in self.events:
             normalized_event = event.normalize()
-            normalized_events.append(json.dumps(normalized_event))
+            normalized_events.append(jsoncodec.dumps(normalized_event))
 
         return normalized_events
 
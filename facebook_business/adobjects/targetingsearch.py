@@ -20,7 +20,7 @@
 
 
 from facebook_business.adobjects.abstractobject import AbstractObject
-from facebook_business.api import FacebookAdsApi
+from facebook_business.api import FacebookAdsApi, check_sync_api
 from facebook_business.exceptions import FacebookBadObjectError
 from facebook_business.session import FacebookSession
 
@@ -69,6 +69,7 @@ class TargetingSearch(AbstractObject):
                 "An Api instance must be provided as an argument or set as "
                 "the default Api in FacebookAdsApi.",
             )
+        check_sync_api(api, 'TargetingSearch.search')
 
         params = {} if not params else params.copy()
         response = api.call(
@@ -28,6 +28,7 @@ from facebook_business.exceptions import (
     FacebookBadParameterError,
 )
 from facebook_business.utils import api_utils
+from facebook_business.utils import jsoncodec
 from facebook_business.utils import urls
 
 from contextlib import contextmanager
@@ -38,6 +39,15 @@ import json
 import six
 import collections
 import re
+import requests
+import sys
+import threading
+import time
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # Python < 3.7
+    ContextVar = None
 
 from facebook_business.adobjects.objectparser import ObjectParser
 from facebook_business.typechecker import TypeChecker
@@ -57,30 +67,49 @@ class FacebookResponse(object):
         'This could happen if a dependent request failed or the entire request timed out.'
     ]
 
-    def __init__(self, body=None, http_status=None, headers=None, call=None):
+    def __init__(
+        self,
+        body=None,
+        http_status=None,
+        headers=None,
+        call=None,
+        json_codec=None,
+    ):
         """Initializes the object's internal data.
         Args:
             body (optional): The response body as text.
             http_status (optional): The http status code.
             headers (optional): The http headers.
             call (optional): The original call that was made.
+            json_codec (optional): The codec decoding the body, by default
+                the one set in apiconfig, see facebook_business.utils.jsoncodec.
         """
         self._body = body
-        self._evaluate_if_transient()
+        self._json_codec = json_codec
+        self._json = None
+        self._json_parsed = False
         self._http_status = http_status
         self._headers = headers or {}
         self._call = call
+        self._is_transient = self._evaluate_if_transient()
 
     def body(self):
         """Returns the response body."""
         return self._body
 
     def json(self):
-        """Returns the response body -- in json if possible."""
-        try:
-            return json.loads(self._body)
-        except (TypeError, ValueError):
-            return self._body
+        """Returns the response body -- in json if possible.
+        The body is decoded once and the same object is returned on every
+        call, copy it before modifying it.
+        """
+        if not self._json_parsed:
+            codec = self._json_codec or jsoncodec.get_codec()
+            try:
+                self._json = codec.loads(self._body)
+            except (TypeError, ValueError):
+                self._json = self._body
+            self._json_parsed = True
+        return self._json
 
     def headers(self):
         """Return the response headers."""
@@ -124,34 +153,26 @@ class FacebookResponse(object):
 
     def _evaluate_if_transient(self):
         """Evaluate if the response has a transient error, depending on the status and the message"""
+        if self.is_success():
+            return False
+
         json_body = self.json()
         try:
             error = json_body.get('error', {})
-            is_transient = error.get('is_transient', False)
+            if error.get('is_transient', False):
+                return True
             error_message = error.get('message', False)
-
-            if (
-                self.is_failure()
-                and not is_transient
-                and error_message
-                and any((transient_message in error_message for transient_message in self.TRANSIENT_ERROR_MESSAGES))
-            ):
-                error['is_transient'] = True
-                json_body['error'] = error
-                self._body = json.dumps(json_body)
         except AttributeError:  # not a dict, we don't know much
-            return
+            return False
+
+        return bool(
+            error_message
+            and any((transient_message in error_message for transient_message in self.TRANSIENT_ERROR_MESSAGES))
+        )
 
     def is_transient(self):
         """Returns boolean indicating if the response failure is transient."""
-        if self.is_success():
-            return False
-
-        json_body = self.json()
-        try:
-            return json_body.get('error', {}).get('is_transient', False)
-        except AttributeError:  # not a dict, we don't know much
-            return False
+        return self._is_transient
 
     def error(self):
         """
@@ -164,7 +185,8 @@ class FacebookResponse(object):
                 self._call,
                 self.status(),
                 self.headers(),
-                self.body(),
+                self.json(),
+                is_transient=self._is_transient,
             )
         else:
             return None
@@ -199,18 +221,62 @@ class FacebookAdsApi(object):
     _default_api = None
     _default_account_id = None
 
-    def __init__(self, session, api_version=None, enable_debug_logger=False):
+    def __init__(
+        self,
+        session,
+        api_version=None,
+        enable_debug_logger=False,
+        retry_policy=None,
+        throttler=None,
+        etag_cache=None,
+        object_cache=None,
+        coalesce_reads=False,
+        hooks=None,
+        json_codec=None,
+    ):
         """Initializes the api instance.
         Args:
             session: FacebookSession object that contains a requests interface
                 and attribute GRAPH (the Facebook GRAPH API URL).
             api_version: API version
+            retry_policy (optional): A RetryPolicy (see the retry module)
+                deciding which failed calls are retried. Failed calls are not
+                retried by default.
+            throttler (optional): A Throttler (see the throttler module)
+                pacing the calls according to the rate limit usage reported
+                by the Graph API. Calls are not paced by default.
+            etag_cache (optional): An ETagCache (see the httpcache module)
+                making GET calls conditional on the ETag of their last
+                response. GET calls are not cached by default.
+            object_cache (optional): An ObjectCache (see the objectcache
+                module) serving repeated node reads from memory. Node reads
+                are not cached by default.
+            coalesce_reads (optional): Whether identical GET calls made
+                concurrently (same path, params, headers and access token)
+                are sent once, all the callers getting the same
+                FacebookResponse.
+            hooks (optional): A list of RequestHook objects (see the hooks
+                module) called along the lifecycle of the calls, e.g. a
+                MetricsCollector (see the metrics module).
+            json_codec (optional): The JSON codec used to encode the params
+                and decode the responses of the api, a codec name or object
+                (see the utils.jsoncodec module). The one set in apiconfig is
+                used by default.
         """
         self._session = session
         self._num_requests_succeeded = 0
         self._num_requests_attempted = 0
+        self._num_requests_lock = threading.Lock()
         self._api_version = api_version or self.API_VERSION
         self._enable_debug_logger = enable_debug_logger
+        self._retry_policy = retry_policy
+        self._throttler = throttler
+        self._etag_cache = etag_cache
+        self._object_cache = object_cache
+        self._in_flight_calls = _InFlightCalls() if coalesce_reads else None
+        self._hooks = list(hooks or ())
+        self._json_codec = json_codec
+        self._auto_batches = threading.local()
 
     def get_num_requests_attempted(self):
         """Returns the number of calls attempted."""
@@ -220,6 +286,64 @@ class FacebookAdsApi(object):
         """Returns the number of calls that succeeded."""
         return self._num_requests_succeeded
 
+    def get_retry_policy(self):
+        """Returns the RetryPolicy of the api, or None."""
+        return self._retry_policy
+
+    def set_retry_policy(self, retry_policy):
+        """Sets the RetryPolicy applied to the calls, the Cursor page loads
+        and the batch executions of the api. None disables retries."""
+        self._retry_policy = retry_policy
+
+    def get_throttler(self):
+        """Returns the Throttler of the api, or None."""
+        return self._throttler
+
+    def set_throttler(self, throttler):
+        """Sets the Throttler pacing the calls of the api. None disables
+        pacing."""
+        self._throttler = throttler
+
+    def get_etag_cache(self):
+        """Returns the ETagCache of the api, or None."""
+        return self._etag_cache
+
+    def set_etag_cache(self, etag_cache):
+        """Sets the ETagCache of the GET calls of the api. None disables
+        caching."""
+        self._etag_cache = etag_cache
+
+    def get_hooks(self):
+        """Returns the list of RequestHook objects of the api."""
+        return list(self._hooks)
+
+    def add_hook(self, hook):
+        """Adds a RequestHook called along the lifecycle of the calls."""
+        self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook):
+        """Removes a RequestHook added to the api."""
+        self._hooks = [other for other in self._hooks if other is not hook]
+
+    def get_json_codec(self):
+        """Returns the JSON codec of the api, by default the one set in
+        apiconfig."""
+        return jsoncodec.get_codec(self._json_codec)
+
+    def set_json_codec(self, json_codec):
+        """Sets the JSON codec of the api, a codec name or object. None
+        reverts to the one set in apiconfig."""
+        self._json_codec = json_codec
+
+    def get_object_cache(self):
+        """Returns the ObjectCache of the api, or None."""
+        return self._object_cache
+
+    def set_object_cache(self, object_cache):
+        """Sets the ObjectCache of the node reads of the api. None disables
+        caching."""
+        self._object_cache = object_cache
+
     @classmethod
     def init(
         cls,
@@ -232,10 +356,71 @@ class FacebookAdsApi(object):
         timeout=None,
         debug=False,
         crash_log=True,
+        json_codec=None,
+        retry_policy=None,
+        throttler=None,
+        etag_cache=None,
+        object_cache=None,
+        coalesce_reads=False,
+        hooks=None,
+        pool_connections=FacebookSession.DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=FacebookSession.DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        host_pool_maxsize=None,
+        max_retries=0,
+        keep_alive=True,
+        tcp_keepalive=False,
+        transport=None,
     ):
-        session = FacebookSession(app_id, app_secret, access_token, proxies,
-                                  timeout)
-        api = cls(session, api_version, enable_debug_logger=debug)
+        """Creates an api instance and sets it as the default one.
+        Args:
+            json_codec (optional): The JSON codec of the api, see
+                FacebookAdsApi.__init__.
+            retry_policy (optional): A RetryPolicy, see
+                facebook_business.retry.
+            throttler (optional): A Throttler, see facebook_business.throttler.
+            etag_cache (optional): An ETagCache, see
+                facebook_business.httpcache.
+            object_cache (optional): An ObjectCache, see
+                facebook_business.objectcache.
+            coalesce_reads (optional): Whether identical concurrent GET calls
+                are sent once, see FacebookAdsApi.__init__.
+            hooks (optional): A list of RequestHook objects, see
+                facebook_business.hooks.
+            pool_connections, pool_maxsize, pool_block, host_pool_maxsize,
+            max_retries, keep_alive, tcp_keepalive (optional): The connection
+                pool settings of the FacebookSession, see
+                facebook_business.session.
+            transport (optional): The Transport class of the FacebookSession,
+                see facebook_business.transport.
+        """
+        session = FacebookSession(
+            app_id,
+            app_secret,
+            access_token,
+            proxies,
+            timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            host_pool_maxsize=host_pool_maxsize,
+            max_retries=max_retries,
+            keep_alive=keep_alive,
+            tcp_keepalive=tcp_keepalive,
+            transport=transport,
+        )
+        api = cls(
+            session,
+            api_version,
+            enable_debug_logger=debug,
+            retry_policy=retry_policy,
+            throttler=throttler,
+            etag_cache=etag_cache,
+            object_cache=object_cache,
+            coalesce_reads=coalesce_reads,
+            hooks=hooks,
+            json_codec=json_codec,
+        )
         cls.set_default_api(api)
 
         if account_id:
@@ -261,9 +446,31 @@ class FacebookAdsApi(object):
 
     @classmethod
     def get_default_api(cls):
-        """Returns the default api instance."""
+        """Returns the api set by use() in the current context, else the
+        default api instance."""
+        api_instance = _context_api.get()
+        if api_instance is not None:
+            return api_instance
         return cls._default_api
 
+    @classmethod
+    @contextmanager
+    def use(cls, api_instance):
+        """Returns a context manager in which get_default_api() returns
+        api_instance, leaving the default api of the other threads and
+        asyncio tasks unchanged. Contexts can be nested.
+        Args:
+            api_instance: The instance to use by default in the context.
+        Examples:
+            >>> with FacebookAdsApi.use(tenant_api):
+            ...     AdAccount(account_id).get_ads()
+        """
+        token = _context_api.push(api_instance)
+        try:
+            yield api_instance
+        finally:
+            _context_api.pop(token)
+
     @classmethod
     def set_default_account_id(cls, account_id):
         account_id = str(account_id)
@@ -307,43 +514,148 @@ class FacebookAdsApi(object):
             A FacebookResponse object containing the response body, headers,
             http status, and summary of the call that was made.
         Raises:
-            FacebookResponse.error() if the request failed.
+            FacebookResponse.error() if the request failed, once the retries
+            allowed by the retry policy, if any, are exhausted.
         """
-        if not params:
-            params = {}
-        if not headers:
-            headers = {}
-        if not files:
-            files = {}
-
-        api_version = api_version or self._api_version
-
-        if api_version and not re.search('v[0-9]+\.[0-9]+', api_version):
-            raise FacebookBadObjectError(
-                'Please provide the API version in the following format: %s'
-                % self.API_VERSION,
+        path, params, headers, files = self._prepare_call(
+            path,
+            params,
+            headers,
+            files,
+            url_override,
+            api_version,
+        )
+        in_flight_key = self._get_in_flight_key(method, path, params, headers,
+                                                files)
+        if in_flight_key is None:
+            fb_response = self._send_with_retries(
+                method,
+                path,
+                params,
+                headers,
+                files,
             )
+        else:
+            fb_response = self._in_flight_calls.call(
+                in_flight_key,
+                self._send_with_retries,
+                method,
+                path,
+                params,
+                headers,
+                files,
+            )
+        return self._check_response(fb_response)
 
-        self._num_requests_attempted += 1
-
-        if not isinstance(path, six.string_types):
-            # Path is not a full path
-            path = "/".join((
-                url_override or self._session.GRAPH,
-                api_version,
-                '/'.join(map(str, path)),
-            ))
-
-        # Include api headers in http request
-        headers = headers.copy()
-        headers.update(FacebookAdsApi.HTTP_DEFAULT_HEADERS)
-
-        if params:
-            params = _top_level_param_json_encode(params)
+    def _send_with_retries(self, method, path, params, headers, files):
+        """Sends a call prepared by _prepare_call(), retrying it as allowed
+        by the retry policy.
+        Returns:
+            The last FacebookResponse, successful or not.
+        """
+        call, cache_key = self._start_call(method, path, params, headers,
+                                           files)
+        attempt = 1
+        while True:
+            throttle_delay = self._get_call_throttle_delay(call)
+            if throttle_delay:
+                time.sleep(throttle_delay)
+            start = self._before_request(call)
+            try:
+                fb_response = self._send_call(method, path, params,
+                                              call['headers'], files)
+            except Exception as e:
+                self._on_send_error(call, e, start)
+                raise
+            fb_response, delay = self._after_response(
+                call,
+                cache_key,
+                fb_response,
+                attempt,
+                start,
+            )
+            if delay is None:
+                return fb_response
+            time.sleep(delay)
+            self._prepare_retry(files)
+            attempt += 1
+
+    # The steps of _send_with_retries() shared with AsyncFacebookAdsApi, which
+    # only sends the calls and waits differently.
+
+    def _start_call(self, method, path, params, headers, files):
+        """Returns the call dict given to the hooks and the ETag cache key
+        of a call prepared by _prepare_call()."""
+        cache_key = self._prepare_cached_call(
+            method,
+            path,
+            params,
+            headers,
+            files,
+        )
+        call = {
+            'method': method,
+            'path': path,
+            'params': params,
+            'headers': headers,
+            'files': files,
+        }
+        return call, cache_key
+
+    def _get_call_throttle_delay(self, call):
+        """Returns the delay, in seconds, to wait before sending the call,
+        telling the hooks about it."""
+        delay = self._get_throttle_delay(call['path'])
+        if delay:
+            self._run_hooks('on_throttle', call, delay)
+        return delay
+
+    def _before_request(self, call):
+        """Runs the before_request hooks, and returns the start time of
+        the request."""
+        self._run_hooks('before_request', call)
+        return time.time()
+
+    def _on_send_error(self, call, error, start):
+        self._run_hooks('on_error', call, error, time.time() - start)
+
+    def _after_response(self, call, cache_key, fb_response, attempt, start):
+        """Handles the response to the given attempt of a call: updates the
+        ETag cache and the throttler, decides whether to retry the call and
+        runs the hooks.
+        Returns:
+            The FacebookResponse of the call, and the delay, in seconds,
+            before retrying it or None.
+        """
+        cached_response = self._update_cache(cache_key, fb_response)
+        duration = time.time() - start
+        if cached_response is None:
+            # A 304 whose cached body was evicted: the call is sent again
+            # unconditionally right away
+            self._run_hooks('after_response', call, fb_response, duration)
+            call['headers'] = dict(call['headers'])
+            del call['headers']['If-None-Match']
+            return fb_response, 0
+        fb_response = cached_response
+        self._run_hooks('after_response', call, fb_response, duration)
+        self._update_throttler(fb_response)
+        delay = self._get_retry_delay(fb_response, attempt)
+        if delay is None:
+            if self._hooks and fb_response.is_failure():
+                self._run_hooks('on_error', call, fb_response.error(),
+                                duration)
+        else:
+            self._run_hooks('on_retry', call, fb_response, attempt, delay)
+        return fb_response, delay
 
+    def _send_call(self, method, path, params, headers, files):
+        """Sends a call prepared by _prepare_call().
+        Returns:
+            The FacebookResponse, successful or not.
+        """
         # Get request response and encapsulate it in a FacebookResponse
         if method in ('GET', 'DELETE'):
-            response = self._session.requests.request(
+            response = self._session.transport.send(
                 method,
                 path,
                 params=params,
@@ -353,7 +665,7 @@ class FacebookAdsApi(object):
             )
 
         else:
-            response = self._session.requests.request(
+            response = self._session.transport.send(
                 method,
                 path,
                 data=params,
@@ -362,8 +674,11 @@ class FacebookAdsApi(object):
                 timeout=self._session.timeout
             )
         if self._enable_debug_logger:
-            import curlify
-            print(curlify.to_curl(response.request))
+            if isinstance(response, requests.Response):
+                import curlify
+                print(curlify.to_curl(response.request))
+            else:
+                print('%s %s' % (method, path))
         fb_response = FacebookResponse(
             body=response.text,
             headers=response.headers,
@@ -375,20 +690,255 @@ class FacebookAdsApi(object):
                 'headers': headers,
                 'files': files,
             },
+            json_codec=self.get_json_codec(),
+        )
+        return fb_response
+
+    def _prepare_call(
+        self,
+        path,
+        params,
+        headers,
+        files,
+        url_override,
+        api_version,
+    ):
+        """Validates and normalizes the arguments of call().
+        Returns:
+            A (path, params, headers, files) tuple ready to be sent, path
+            being a full URL.
+        """
+        if not params:
+            params = {}
+        if not headers:
+            headers = {}
+        if not files:
+            files = {}
+
+        api_version = api_version or self._api_version
+
+        if api_version and not re.search('v[0-9]+\.[0-9]+', api_version):
+            raise FacebookBadObjectError(
+                'Please provide the API version in the following format: %s'
+                % self.API_VERSION,
+            )
+
+        self._count_request_attempt()
+
+        if not isinstance(path, six.string_types):
+            # Path is not a full path
+            path = "/".join((
+                url_override or self._session.GRAPH,
+                api_version,
+                '/'.join(map(str, path)),
+            ))
+
+        # Include api headers in http request
+        headers = headers.copy()
+        headers.update(FacebookAdsApi.HTTP_DEFAULT_HEADERS)
+
+        if params:
+            params = _top_level_param_json_encode(
+                params,
+                self.get_json_codec(),
+            )
+
+        return path, params, headers, files
+
+    def _count_request_attempt(self):
+        with self._num_requests_lock:
+            self._num_requests_attempted += 1
+
+    def _run_hooks(self, name, *args):
+        """Calls the method name of each hook with args."""
+        for hook in self._hooks:
+            getattr(hook, name)(*args)
+
+    def _get_in_flight_key(self, method, path, params, headers, files):
+        """Returns the key identifying the call amongst the calls in flight
+        if it can be coalesced with identical ones, else None."""
+        if self._in_flight_calls is None or method != 'GET' or files:
+            return None
+        return (
+            path,
+            tuple(sorted(
+                (key, six.text_type(value)) for key, value in params.items()
+            )),
+            tuple(sorted(headers.items())),
+            self._session.access_token,
+        )
+
+    def _prepare_cached_call(self, method, path, params, headers, files):
+        """Makes the call conditional if the ETag cache has its response.
+        Returns:
+            The cache key of the call, or None if it is not cached.
+        """
+        if self._etag_cache is None:
+            return None
+        return self._etag_cache.prepare(
+            self._session,
+            method,
+            path,
+            params,
+            headers,
+            files,
         )
 
+    def _update_cache(self, cache_key, fb_response):
+        """Stores fb_response in the ETag cache, or returns the cached
+        response if fb_response is a 304 Not Modified (None if it was
+        evicted, see ETagCache.update)."""
+        if cache_key is None:
+            return fb_response
+        return self._etag_cache.update(cache_key, fb_response)
+
+    def _check_response(self, fb_response):
+        """Raises the response error, if any, and counts the success."""
         if fb_response.is_failure():
             raise fb_response.error()
 
-        self._num_requests_succeeded += 1
+        with self._num_requests_lock:
+            self._num_requests_succeeded += 1
         return fb_response
 
-    def new_batch(self):
+    def _get_throttle_delay(self, path):
+        """Returns the delay, in seconds, asked by the throttler, if any,
+        before calling path."""
+        if self._throttler is None:
+            return 0
+        return self._throttler.get_delay(path)
+
+    def _update_throttler(self, fb_response):
+        if self._throttler is not None:
+            self._throttler.update(fb_response)
+
+    def _get_retry_delay(self, fb_response, attempt):
+        """Returns the delay, in seconds, before retrying the call whose
+        given attempt returned fb_response, or None to not retry it."""
+        if self._retry_policy is None or fb_response.is_success():
+            return None
+        return self._retry_policy.get_retry_delay(fb_response, attempt)
+
+    def _prepare_retry(self, files):
+        """Counts the new attempt and rewinds the files to send them again."""
+        self._count_request_attempt()
+        for fileobj in files.values():
+            if hasattr(fileobj, 'seek'):
+                fileobj.seek(0)
+
+    def new_batch(self, deduplicate=True):
         """
         Returns a new FacebookAdsApiBatch, which when executed will go through
         this api.
         """
-        return FacebookAdsApiBatch(api=self)
+        return FacebookAdsApiBatch(api=self, deduplicate=deduplicate)
+
+    def auto_batch(self, max_size=50, max_delay_ms=None):
+        """Returns a FacebookAutoBatch, a context manager in which the
+        requests executed through this api by the current thread, such as
+        Ad(ad_id).api_get() or api_update(), are added to batches and return a
+        FacebookBatchFuture.
+        Args:
+            max_size (optional): The number of calls after which a batch is
+                executed, 50 at most.
+            max_delay_ms (optional): The delay, in milliseconds, after which a
+                batch is executed even if it is not full. By default, batches
+                are only executed when full, when the result of one of their
+                futures is needed or when leaving the context.
+        Examples:
+            >>> with api.auto_batch() as auto_batch:
+            ...     futures = [Ad(ad_id).api_update(params=...)
+            ...                for ad_id in ad_ids]
+            >>> [future.result() for future in futures]
+        """
+        return FacebookAutoBatch(self, max_size, max_delay_ms)
+
+    def get_auto_batch(self):
+        """Returns the FacebookAutoBatch in use by the current thread, or
+        None."""
+        return getattr(self._auto_batches, 'current', None)
+
+
+class FacebookBatchFuture(object):
+
+    """Handle on a call of a FacebookAdsApiBatch, returned by add_request(),
+    which is resolved when the batch is executed.
+    Examples:
+        >>> future = batch.add_request(ad.api_get(fields=['name'],
+        ...                                       pending=True))
+        >>> batch.execute()
+        >>> future.result()['name']
+    """
+
+    __slots__ = ('_request', '_response', '_result', '_exc_info')
+
+    def __init__(self, request=None):
+        self._request = request
+        self._response = None
+        self._result = None
+        self._exc_info = None
+
+    def done(self):
+        """Returns whether the call has been executed, or its batch call
+        has failed."""
+        return self._response is not None or self._exc_info is not None
+
+    def response(self):
+        """Returns the FacebookResponse of the call, or None if it has not
+        been executed."""
+        return self._response
+
+    def exception(self):
+        """Returns the FacebookRequestError of the call if it failed, else
+        None.
+        Raises:
+            FacebookUnavailablePropertyException if the call has not been
+            executed.
+            The error of the batch call if it failed, e.g. a transport
+            error.
+        """
+        return self._get_response().error()
+
+    def result(self):
+        """Returns the response parsed as by FacebookRequest.execute() (e.g.
+        an Ad object), or the FacebookResponse if the call was not added
+        from a FacebookRequest.
+        Raises:
+            FacebookUnavailablePropertyException if the call has not been
+            executed.
+            The FacebookRequestError of the call if it failed.
+            The error of the batch call if it failed, e.g. a transport
+            error.
+        """
+        response = self._get_response()
+        if response.error():
+            raise response.error()
+        if self._result is None:
+            if self._request is None:
+                self._result = response
+            elif response.json() is not None:
+                # Not an omitted response
+                self._result = self._request._parse_response(response)
+        return self._result
+
+    def _get_response(self):
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        if self._response is None:
+            raise FacebookUnavailablePropertyException(
+                "The batch of this call has not been executed yet.",
+            )
+        return self._response
+
+    def _set_response(self, response):
+        self._response = response
+        self._result = None
+        self._exc_info = None
+
+    def _set_exception(self, exc_info):
+        """Resolves the future with the error of its batch call, as
+        returned by sys.exc_info()."""
+        self._exc_info = exc_info
 
 
 class FacebookAdsApiBatch(object):
@@ -399,15 +949,26 @@ class FacebookAdsApiBatch(object):
     Note: Individual exceptions won't be thrown for each call that fails.
         The success and failure callback functions corresponding to a call
         should handle its success or failure.
+    Calls can be named and depend on earlier calls of the same batch, whose
+    results they can reference (see result_reference), so that e.g. a
+    campaign, its ad sets and their ads are created with one http request.
+    add_request() returns a FacebookBatchFuture resolved by execute(), an
+    alternative to callbacks.
+    Identical GET calls are sent once, their response going to each of them,
+    unless deduplicate is False.
     """
 
-    def __init__(self, api, success=None, failure=None):
+    FUTURE_CLASS = FacebookBatchFuture
+
+    def __init__(self, api, success=None, failure=None, deduplicate=True):
         self._api = api
+        self._deduplicate = deduplicate
         self._files = []
         self._batch = []
         self._success_callbacks = []
         self._failure_callbacks = []
         self._transient_errors_callbacks = []
+        self._futures = []
 
         if success is not None:
             self._success_callbacks.append(success)
@@ -430,6 +991,9 @@ class FacebookAdsApiBatch(object):
         failure=None,
         transient_error=None,
         request=None,
+        name=None,
+        depends_on=None,
+        omit_response_on_success=None,
     ):
         """Adds a call to the batch.
         Args:
@@ -451,6 +1015,15 @@ class FacebookAdsApiBatch(object):
             failure (optional): A callback function which will be called with
                 the FacebookResponse of this call if the call failed.
             request (optional): The APIRequest object
+            name (optional): The name of the call, for other calls of the
+                batch to depend on it or to reference its result.
+            depends_on (optional): The name of a call which must succeed
+                before this call is executed.
+            omit_response_on_success (optional): Whether the response of a
+                successful named call is omitted, its success callback being
+                then called with an empty response. Responses are kept by
+                default, as a call that timed out or did not run gets no
+                response either and would be taken for a success.
         Returns:
             A dictionary describing the call.
         """
@@ -473,13 +1046,23 @@ class FacebookAdsApiBatch(object):
         }
 
         if params:
-            params = _top_level_param_json_encode(params)
+            params = _top_level_param_json_encode(
+                params,
+                self._get_json_codec(),
+            )
             keyvals = ['%s=%s' % (key, urls.quote_with_encoding(value))
                        for key, value in params.items()]
+            encoded_params = '&'.join(keyvals)
+            # References to the results of other calls are kept as is
+            if '%7Bresult%3D' in encoded_params:
+                encoded_params = _QUOTED_RESULT_REFERENCE.sub(
+                    _unquote_result_reference,
+                    encoded_params,
+                )
             if method == 'GET':
-                call['relative_url'] += '?' + '&'.join(keyvals)
+                call['relative_url'] += '?' + encoded_params
             else:
-                call['body'] = '&'.join(keyvals)
+                call['body'] = encoded_params
 
         if files:
             call['attached_files'] = ','.join(files.keys())
@@ -492,12 +1075,22 @@ class FacebookAdsApiBatch(object):
                 batch_formatted_header['value'] = headers[header]
                 call['headers'].append(batch_formatted_header)
 
+        if name is not None:
+            call['name'] = name
+            if omit_response_on_success is None:
+                omit_response_on_success = False
+        if depends_on is not None:
+            call['depends_on'] = depends_on
+        if omit_response_on_success is not None:
+            call['omit_response_on_success'] = omit_response_on_success
+
         self._batch.append(call)
         self._files.append(files)
         self._success_callbacks.append(success)
         self._failure_callbacks.append(failure)
         self._transient_errors_callbacks.append(transient_error)
         self._requests.append(request)
+        self._futures.append(self.FUTURE_CLASS(request))
 
         return call
 
@@ -507,6 +1100,9 @@ class FacebookAdsApiBatch(object):
         success=None,
         failure=None,
         transient_error=None,
+        name=None,
+        depends_on=None,
+        omit_response_on_success=None,
     ):
         """Interface to add a APIRequest to the batch.
         Args:
@@ -515,13 +1111,17 @@ class FacebookAdsApiBatch(object):
                 the FacebookResponse of this call if the call succeeded.
             failure (optional): A callback function which will be called with
                 the FacebookResponse of this call if the call failed.
+            name, depends_on, omit_response_on_success (optional): See add().
             Returns:
-                A dictionary describing the call.
+                A FacebookBatchFuture resolved when the batch is executed.
         """
-        updated_params = copy.deepcopy(request._params)
+        request._invalidate_cached_object()
+        # The parameters are encoded right away, there is no need to copy
+        # their values
+        updated_params = dict(request._params)
         if request._fields:
             updated_params['fields'] = ','.join(request._fields)
-        return self.add(
+        self.add(
             method=request._method,
             relative_path=request._path,
             params=updated_params,
@@ -530,89 +1130,407 @@ class FacebookAdsApiBatch(object):
             failure=failure,
             transient_error=transient_error,
             request=request,
+            name=name,
+            depends_on=depends_on,
+            omit_response_on_success=omit_response_on_success,
         )
+        return self._futures[-1]
+
+    @staticmethod
+    def result_reference(name, path='$.id'):
+        """Returns a reference to the result of the call named name, to be
+        used in the parameters or the path of a later call of the batch.
+        Args:
+            name: The name of the referenced call.
+            path (optional): The JSONPath of the value in its result.
+        Examples:
+            >>> batch.add_request(
+            ...     account.create_ad_set(params={
+            ...         'campaign_id': batch.result_reference('campaign'),
+            ...         ...
+            ...     }, pending=True),
+            ...     depends_on='campaign',
+            ... )
+        """
+        return '{result=%s:%s}' % (name, path)
 
     def execute(self):
         """Makes a batch call to the api associated with this object.
-        For each individual call response, calls the success or failure callback
-        function if they were specified.
+        For each individual call response, resolves its FacebookBatchFuture
+        and calls the success or failure callback function if they were
+        specified.
+        If the api has a RetryPolicy, the calls failing with an error it deems
+        retryable are executed again in a new batch call, within the limits
+        of the policy.
+        The calls which depend on other calls of the batch, or reference
+        their results, and the calls they depend on, cannot be executed on
+        their own: they are neither retried nor returned in the batch of
+        transient errors, their failures go to their failure callback.
         Note: Does not explicitly raise exceptions. Individual exceptions won't
         be thrown for each call that fails. The success and failure callback
         functions corresponding to a call should handle its success or failure.
+        If the batch call itself fails, e.g. with a transport error, its
+        error is set on the futures not resolved yet and raised.
         Returns:
-            If some of the calls have failed, returns  a new FacebookAdsApiBatch
-            object with those calls. Otherwise, returns None.
+            If some of the calls have failed with a transient error and are
+            not retried any more, returns a new FacebookAdsApiBatch object with
+            those calls. Otherwise, returns None.
         """
         if not self._batch:
             return None
-        method = 'POST'
-        path = tuple()
-        params = {'batch': self._batch}
+        retry_policy, throttler = self._get_retry_policy_and_throttler()
+        transient_batch = self._new_batch()
+        batch = self
+        attempt = 1
+        while True:
+            throttle_delay = batch._get_throttle_delay(throttler)
+            if throttle_delay:
+                time.sleep(throttle_delay)
+            params, files, call_indices = batch._prepare_batch_call()
+            try:
+                fb_response = self._api.call(
+                    'POST',
+                    tuple(),
+                    params=params,
+                    files=files,
+                )
+            except Exception:
+                self._set_exception(sys.exc_info())
+                raise
+            retry_indices, delay = batch._process_responses(
+                fb_response,
+                call_indices,
+                attempt,
+                retry_policy,
+                throttler,
+                transient_batch,
+            )
+            if not retry_indices:
+                break
+            time.sleep(delay)
+            batch = batch._get_retry_batch(retry_indices)
+            attempt += 1
+
+        if transient_batch._batch:
+            return transient_batch
+        else:
+            return None
+
+    def _get_retry_policy_and_throttler(self):
+        # Duck typed apis may not have retry policies nor throttlers
+        get_retry_policy = getattr(self._api, 'get_retry_policy', None)
+        get_throttler = getattr(self._api, 'get_throttler', None)
+        return (
+            get_retry_policy() if get_retry_policy else None,
+            get_throttler() if get_throttler else None,
+        )
+
+    def _get_json_codec(self):
+        # Duck typed apis use the codec set in apiconfig
+        get_json_codec = getattr(self._api, 'get_json_codec', None)
+        return get_json_codec() if get_json_codec else None
+
+    def _new_batch(self):
+        return self.__class__(self._api, deduplicate=self._deduplicate)
+
+    def _set_exception(self, exc_info):
+        """Resolves the futures not resolved yet with the error of the
+        batch call."""
+        for future in self._futures:
+            if not future.done():
+                future._set_exception(exc_info)
+
+    def _get_calls_to_send(self):
+        """Returns the calls to send, identical GET calls being sent once,
+        and the index in them of the call sent for each call of the batch."""
+        if not self._deduplicate:
+            return self._batch, range(len(self._batch))
+        calls = []
+        call_indices = []
+        sent_indices = {}
+        for call, files in zip(self._batch, self._files):
+            if (
+                call['method'] == 'GET' and
+                not files and
+                'name' not in call and
+                'depends_on' not in call
+            ):
+                key = (
+                    call['relative_url'],
+                    tuple(
+                        (header['name'], header['value'])
+                        for header in call.get('headers', ())
+                    ),
+                )
+                sent_index = sent_indices.get(key)
+                if sent_index is None:
+                    sent_index = sent_indices[key] = len(calls)
+                    calls.append(call)
+            else:
+                sent_index = len(calls)
+                calls.append(call)
+            call_indices.append(sent_index)
+        return calls, call_indices
+
+    def _run_hooks(self, name, *args):
+        run_hooks = getattr(self._api, '_run_hooks', None)
+        if run_hooks is not None:
+            run_hooks(name, *args)
+
+    def _get_throttle_delay(self, throttler):
+        """Returns the delay, in seconds, to wait before sending the batch
+        call, telling the hooks about it."""
+        if throttler is None:
+            return 0
+        # The app usage is taken care of by the api call
+        delay = max(
+            throttler.get_delay(call['relative_url'], include_app=False)
+            for call in self._batch
+        )
+        if delay:
+            self._run_hooks('on_throttle', None, delay)
+        return delay
+
+    def _prepare_batch_call(self):
+        """Runs the on_batch hooks and returns the params and files of the
+        batch call, and the index of the call sent for each call of the
+        batch (see _get_calls_to_send())."""
+        calls, call_indices = self._get_calls_to_send()
+        self._run_hooks('on_batch', calls)
+        return {'batch': calls}, self._get_files(), call_indices
+
+    def _get_files(self):
         files = {}
         for call_files in self._files:
             if call_files:
                 files.update(call_files)
+        return files
 
-        fb_response = self._api.call(
-            method,
-            path,
-            params=params,
-            files=files,
-        )
+    def _get_retry_batch(self, indices):
+        retry_batch = self._new_batch()
+        retry_batch._append_calls(self, indices)
+        return retry_batch
 
+    def _process_responses(
+        self,
+        fb_response,
+        call_indices,
+        attempt,
+        retry_policy,
+        throttler,
+        transient_batch,
+    ):
+        """Resolves the futures and calls the callbacks of the calls that are
+        not retried by retry_policy, appending those which failed with a
+        transient error to transient_batch.
+        The response to each call is at its index in call_indices, as
+        returned by _get_calls_to_send().
+        Returns:
+            The indices of the calls to retry, and the delay before retrying
+            them.
+        """
         responses = fb_response.json()
         retry_indices = []
-
-        for index, response in enumerate(responses):
-            if not response:
-                transient_body = {
-                    "error": {
-                        "is_transient": True,
-                        "message": "Transient Error",
-                        "type": "empty response"
-                    }
-                }
-                inner_fb_response = FacebookResponse(
-                    body=transient_body,
-                    http_status=500,
-                    call=self._batch[index],
-                )
-            else:
-                inner_fb_response = FacebookResponse(
-                    body=response.get('body'),
-                    headers=response.get('headers'),
-                    http_status=response.get('code'),
-                    call=self._batch[index],
+        retry_delay = 0
+        transient_indices = []
+        sent_responses = {}
+        dependency_names = _get_dependency_names(self._batch)
+
+        for index, call in enumerate(self._batch):
+            sent_index = call_indices[index]
+            if sent_index >= len(responses):
+                continue
+            # Identical GET calls share their response
+            inner_fb_response = sent_responses.get(sent_index)
+            if inner_fb_response is None:
+                inner_fb_response = self._get_inner_response(
+                    responses[sent_index],
+                    call,
+                    throttler,
                 )
+                sent_responses[sent_index] = inner_fb_response
 
             if inner_fb_response.is_success():
+                self._futures[index]._set_response(inner_fb_response)
                 if self._success_callbacks[index]:
                     self._success_callbacks[index](inner_fb_response)
+            elif (
+                _is_dependent(call) or
+                call.get('name') in dependency_names
+            ):
+                self._futures[index]._set_response(inner_fb_response)
+                if self._failure_callbacks[index]:
+                    self._failure_callbacks[index](inner_fb_response)
             else:
+                if retry_policy is not None:
+                    delay = retry_policy.get_retry_delay(
+                        inner_fb_response,
+                        attempt,
+                    )
+                else:
+                    delay = None
+                if delay is not None:
+                    retry_indices.append(index)
+                    retry_delay = max(retry_delay, delay)
+                    continue
+
+                self._futures[index]._set_response(inner_fb_response)
                 error_callback = self._failure_callbacks[index]
                 # retry transient errors
                 if inner_fb_response.is_transient():
-                    retry_indices.append(index)
+                    transient_indices.append(index)
                     error_callback = self._transient_errors_callbacks[index]
 
                 # execute failure callbacks on error
                 if error_callback:
                     error_callback(inner_fb_response)
 
-        if retry_indices:
-            new_batch = self.__class__(self._api)
-            new_batch._files = [self._files[index] for index in retry_indices]
-            new_batch._batch = [self._batch[index] for index in retry_indices]
-            new_batch._success_callbacks = [self._success_callbacks[index]
-                                            for index in retry_indices]
-            new_batch._failure_callbacks = [self._failure_callbacks[index]
-                                            for index in retry_indices]
-            new_batch._transient_errors_callbacks = [
-                self._transient_errors_callbacks[index] for index in retry_indices
-            ]
-            return new_batch
+        transient_batch._append_calls(self, transient_indices)
+        return retry_indices, retry_delay
+
+    def _get_inner_response(self, response, call, throttler):
+        """Returns the FacebookResponse of a call from its entry in the batch
+        response."""
+        if not response and _is_response_omitted(call):
+            inner_fb_response = FacebookResponse(
+                http_status=200,
+                call=call,
+            )
+        elif not response:
+            transient_body = {
+                "error": {
+                    "is_transient": True,
+                    "message": "Transient Error",
+                    "type": "empty response"
+                }
+            }
+            inner_fb_response = FacebookResponse(
+                body=transient_body,
+                http_status=500,
+                call=call,
+            )
         else:
-            return None
+            inner_fb_response = FacebookResponse(
+                body=response.get('body'),
+                headers=response.get('headers'),
+                http_status=response.get('code'),
+                call=call,
+                json_codec=self._get_json_codec(),
+            )
+            if throttler is not None:
+                throttler.update(inner_fb_response)
+        return inner_fb_response
+
+    def _append_calls(self, batch, indices):
+        """Appends the calls of another batch, at the given indices."""
+        for index in indices:
+            self._batch.append(batch._batch[index])
+            self._files.append(batch._files[index])
+            self._success_callbacks.append(batch._success_callbacks[index])
+            self._failure_callbacks.append(batch._failure_callbacks[index])
+            self._transient_errors_callbacks.append(
+                batch._transient_errors_callbacks[index],
+            )
+            self._futures.append(batch._futures[index])
+            if index < len(batch._requests):
+                self._requests.append(batch._requests[index])
+
+
+class _AutoBatchFuture(FacebookBatchFuture):
+
+    """FacebookBatchFuture executing its batch when its response is needed
+    before the batch was full."""
+
+    __slots__ = ('_auto_batch',)
+
+    def __init__(self, request=None):
+        super(_AutoBatchFuture, self).__init__(request)
+        self._auto_batch = None
+
+    def _get_response(self):
+        if self._response is None and self._auto_batch is not None:
+            self._auto_batch.flush()
+        return super(_AutoBatchFuture, self)._get_response()
+
+
+class _AutoBatchCalls(FacebookAdsApiBatch):
+
+    FUTURE_CLASS = _AutoBatchFuture
+
+
+class FacebookAutoBatch(object):
+
+    """Collects the requests executed in its context into batches, see
+    FacebookAdsApi.auto_batch().
+    Edge reads, which return a Cursor, raw reads and file uploads are not
+    batched and are executed right away. The batches are executed when full,
+    after max_delay_ms, when the result of one of their futures is needed,
+    and when leaving the context.
+    """
+
+    def __init__(self, api, max_size=50, max_delay_ms=None):
+        if not 1 <= max_size <= 50:
+            raise ValueError("max_size must be between 1 and 50")
+        self._api = api
+        self._max_size = max_size
+        self._max_delay_ms = max_delay_ms
+        self._batch = None
+        self._timer = None
+        self._lock = threading.RLock()
+        self._previous = []
+
+    def __enter__(self):
+        self._previous.append(self._api.get_auto_batch())
+        self._api._auto_batches.current = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._api._auto_batches.current = self._previous.pop()
+        self.flush()
+
+    def accepts(self, request, raw=False):
+        """Returns whether the request can be batched."""
+        return not (
+            raw or
+            request._file_params or
+            (request._api_type == "EDGE" and request._method == "GET")
+        )
+
+    def add(self, request):
+        """Adds the request to the current batch, executing it if it is full.
+        Returns:
+            The FacebookBatchFuture of the request.
+        """
+        with self._lock:
+            if self._batch is None:
+                self._batch = _AutoBatchCalls(self._api)
+                if self._max_delay_ms is not None:
+                    self._timer = threading.Timer(
+                        self._max_delay_ms / 1000.0,
+                        self.flush,
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
+            future = self._batch.add_request(request)
+            future._auto_batch = self
+            if len(self._batch) >= self._max_size:
+                self.flush()
+            return future
+
+    def flush(self):
+        """Executes the current batch, if any. If the batch call fails, its
+        error is raised by the futures of the batch rather than by flush(),
+        which may run on the timer thread."""
+        with self._lock:
+            batch, self._batch = self._batch, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if batch is not None:
+                try:
+                    batch.execute()
+                except Exception:
+                    batch._set_exception(sys.exc_info())
 
 
 class FacebookRequest:
@@ -726,18 +1644,29 @@ class FacebookRequest:
     def get_params(self):
         return copy.deepcopy(self._params)
 
-    def execute(self):
+    def execute(self, raw=False):
+        """Sends the request.
+        Args:
+            raw (optional): Return the decoded JSON instead of objects. Edge
+                reads return a Cursor over the decoded rows.
+        Returns:
+            The parsed response, a Cursor for edge reads, or a
+            FacebookBatchFuture in the context of FacebookAdsApi.auto_batch().
+        """
+        if getattr(self._api, 'IS_ASYNC', False) is True:
+            # The async api resolves the request in a coroutine.
+            return self._api.execute_request(self, raw=raw)
+        get_auto_batch = getattr(self._api, 'get_auto_batch', None)
+        auto_batch = get_auto_batch() if get_auto_batch else None
+        if auto_batch is not None and auto_batch.accepts(self, raw):
+            return auto_batch.add(self)
+        cache_key, cached_data = self._get_cached_data()
+        if cached_data is not None:
+            return self._parse_data(cached_data, raw=raw)
+        self._invalidate_cached_object()
         params = copy.deepcopy(self._params)
         if self._api_type == "EDGE" and self._method == "GET":
-            cursor = Cursor(
-                target_objects_class=self._target_class,
-                params=params,
-                fields=self._fields,
-                include_summary=self._include_summary,
-                api=self._api,
-                node_id=self._node_id,
-                endpoint=self._endpoint,
-            )
+            cursor = self._create_cursor(Cursor, params, raw=raw)
             cursor.load_next_page()
             return cursor
         if self._fields:
@@ -750,15 +1679,100 @@ class FacebookRequest:
                 files=files,
                 api_version=self._api_version,
             )
-            if response.error():
-                raise response.error()
-            if self._response_parser:
-                return self._response_parser.parse_single(response.json())
-            else:
-                return response
+            self._cache_response(cache_key, response)
+            return self._parse_response(response, raw=raw)
+
+    def _create_cursor(self, cursor_class, params, raw=False):
+        return cursor_class(
+            target_objects_class=self._target_class,
+            params=params,
+            fields=self._fields,
+            include_summary=self._include_summary,
+            api=self._api,
+            node_id=self._node_id,
+            endpoint=self._endpoint,
+            raw=raw,
+        )
+
+    def _parse_response(self, response, raw=False):
+        if response.error():
+            raise response.error()
+        if raw or self._response_parser:
+            return self._parse_data(response.json(), raw=raw)
+        else:
+            return response
+
+    def _parse_data(self, data, raw=False):
+        if raw:
+            return data
+        return self._response_parser.parse_single(data)
+
+    def _get_object_cache(self):
+        get_object_cache = getattr(self._api, 'get_object_cache', None)
+        return get_object_cache() if get_object_cache else None
+
+    def _get_cached_data(self):
+        """Looks the request up in the ObjectCache of the api if it is a
+        node read.
+        Returns:
+            A (cache key, cached data) tuple, the key being None if the
+            request is not cached and the data None on a miss.
+        """
+        object_cache = self._get_object_cache()
+        if (
+            object_cache is None or
+            self._method != 'GET' or
+            self._endpoint or
+            self._file_params or
+            self._response_parser is None
+        ):
+            return None, None
+        cache_key = object_cache.get_key(
+            self._target_class,
+            self._node_id,
+            self._fields,
+            self._params,
+            self._api_version or self._api._api_version,
+        )
+        return cache_key, object_cache.get(cache_key)
+
+    def _cache_response(self, cache_key, response):
+        if cache_key is not None and not response.error():
+            self._get_object_cache().set(cache_key, response.json())
+
+    def _invalidate_cached_object(self):
+        """Drops the cached reads of the node if the request updates or
+        deletes it."""
+        object_cache = self._get_object_cache()
+        if (
+            object_cache is not None and
+            object_cache.invalidate_on_write and
+            self._method in ('POST', 'DELETE') and
+            not self._endpoint
+        ):
+            object_cache.invalidate(self._node_id)
 
-    def add_to_batch(self, batch, success=None, failure=None, transient_error=None):
-        batch.add_request(self, success, failure, transient_error)
+    def add_to_batch(
+        self,
+        batch,
+        success=None,
+        failure=None,
+        transient_error=None,
+        name=None,
+        depends_on=None,
+        omit_response_on_success=None,
+    ):
+        """Adds this request to a FacebookAdsApiBatch, see
+        FacebookAdsApiBatch.add_request()."""
+        batch.add_request(
+            self,
+            success,
+            failure,
+            transient_error,
+            name=name,
+            depends_on=depends_on,
+            omit_response_on_success=omit_response_on_success,
+        )
 
     def _extract_value(self, value):
         if hasattr(value, 'export_all_data'):
@@ -795,7 +1809,9 @@ class Cursor(object):
         api=None,
         node_id=None,
         endpoint=None,
-        object_parser=None
+        object_parser=None,
+        prefetch=False,
+        raw=False,
     ):
         """
         Initializes an cursor over the objects to which there is an edge from
@@ -817,6 +1833,10 @@ class Cursor(object):
             node_id (optional): The ID of calling node.
             endpoint (optional): The edge name.
             object_parser (optional): The ObjectParser to parse response.
+            prefetch (optional): Fetch the next page on a worker thread while
+                the current one is consumed, see set_prefetch().
+            raw (optional): Yield the decoded JSON rows instead of
+                target_objects_class objects.
         """
         self.params = dict(params or {})
         target_objects_class._assign_fields_to_params(fields, self.params)
@@ -829,7 +1849,10 @@ class Cursor(object):
             self._node_id,
             self._endpoint,
         )
-        self._queue = []
+        self._queue = collections.deque()
+        self._prefetch = prefetch
+        self._raw = raw
+        self._next_page = None
         self._headers = []
         self._finished_iteration = False
         self._total_count = None
@@ -841,7 +1864,7 @@ class Cursor(object):
         )
 
     def __repr__(self):
-        return str(self._queue)
+        return str(list(self._queue))
 
     def __len__(self):
         return len(self._queue)
@@ -855,12 +1878,14 @@ class Cursor(object):
         if not self._queue and not self.load_next_page():
             raise StopIteration()
 
-        return self._queue.pop(0)
+        return self._queue.popleft()
 
     # Python 2 compatibility.
     next = __next__
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._queue)[index]
         return self._queue[index]
 
     def headers(self):
@@ -896,19 +1921,57 @@ class Cursor(object):
         """
         if self._finished_iteration:
             return False
+        check_sync_api(self._api, 'Cursor')
+
+        if self._next_page is not None:
+            # Cleared first, for a failed page to be requested again by the
+            # next call
+            next_page, self._next_page = self._next_page, None
+            response_obj = next_page.result()
+        else:
+            self._add_summary_param()
+            response_obj = self._api.call(
+                'GET',
+                self._path,
+                params=self.params,
+            )
+        has_objects = self._load_page(response_obj)
+        if self._prefetch:
+            self._prefetch_next_page()
+        return has_objects
+
+    def set_prefetch(self, prefetch=True):
+        """Enables or disables the prefetch of the next page.
+        When enabled, once a page is loaded the next one is requested on a
+        worker thread, overlapping the network latency with the consumption
+        of the current page. It can be enabled on a cursor returned by a
+        generated get_* method, which already holds the first page.
+        """
+        self._prefetch = prefetch
+        if prefetch:
+            self._prefetch_next_page()
+        return self
+
+    def _prefetch_next_page(self):
+        if self._next_page is None and not self._finished_iteration:
+            self._add_summary_param()
+            self._next_page = _PageFetch(self._api, self._path, self.params)
 
+    def _add_summary_param(self):
+        # The paging.next URL of later pages already carries the query.
         if (
+            isinstance(self._path, tuple) and
             self._include_summary and
             'default_summary' not in self.params and
             'summary' not in self.params
         ):
             self.params['summary'] = True
 
-        response_obj = self._api.call(
-            'GET',
-            self._path,
-            params=self.params,
-        )
+    def _load_page(self, response_obj):
+        """Loads a page response into the internal queue.
+        Returns:
+            True if the page holds objects, else False.
+        """
         response = response_obj.json()
         self._headers = response_obj.headers()
 
@@ -929,7 +1992,9 @@ class Cursor(object):
         if self._include_summary and 'summary' in response:
             self._summary = response['summary']
 
-        self._queue = self.build_objects_from_response(response)
+        self._queue = collections.deque(
+            self.build_objects_from_response(response),
+        )
         return len(self._queue) > 0
 
     def get_one(self):
@@ -938,9 +2003,127 @@ class Cursor(object):
         return None
 
     def build_objects_from_response(self, response):
+        if self._raw:
+            return self._object_parser.parse_multiple(response, raw=True)
         return self._object_parser.parse_multiple(response)
 
 
+class _PageFetch(object):
+    """Requests a Cursor page on a worker thread."""
+
+    def __init__(self, api, path, params):
+        self._response = None
+        self._exc_info = None
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(api, path, params),
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, api, path, params):
+        try:
+            self._response = api.call('GET', path, params=params)
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+    def result(self):
+        """Waits for the page and returns its FacebookResponse, or raises
+        the error of the call."""
+        self._thread.join()
+        if self._exc_info is not None:
+            six.reraise(*self._exc_info)
+        return self._response
+
+
+class _ContextApi(object):
+    """The api set by FacebookAdsApi.use() in the current context: a
+    ContextVar, so that each thread and asyncio task has its own, or a
+    thread local where contextvars is not available."""
+
+    def __init__(self):
+        if ContextVar is not None:
+            self._var = ContextVar('facebook_business_api', default=None)
+        else:
+            self._var = None
+            self._local = threading.local()
+
+    def get(self):
+        if self._var is not None:
+            return self._var.get()
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def push(self, api):
+        """Sets api in the current context and returns the token to give
+        to pop() to restore the previous one."""
+        if self._var is not None:
+            return self._var.set(api)
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        self._local.stack.append(api)
+        return None
+
+    def pop(self, token):
+        if self._var is not None:
+            self._var.reset(token)
+        else:
+            self._local.stack.pop()
+
+
+_context_api = _ContextApi()
+
+
+class _InFlightCalls(object):
+    """Runs a single call at a time per key, the concurrent callers with
+    the same key waiting for its result instead of making their own."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def call(self, key, function, *args):
+        with self._lock:
+            in_flight = self._calls.get(key)
+            if in_flight is None:
+                in_flight = self._calls[key] = _InFlightCall()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return in_flight.result()
+
+        try:
+            in_flight.response = function(*args)
+        except BaseException:
+            in_flight.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            in_flight.done.set()
+        return in_flight.response
+
+
+class _InFlightCall(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.exc_info = None
+
+    def result(self):
+        """Waits for the call and returns its response, or raises its
+        error."""
+        self.done.wait()
+        if self.exc_info is not None:
+            six.reraise(*self.exc_info)
+        return self.response
+
+
 @contextmanager
 def open_files(files):
     opened_files = {}
@@ -951,7 +2134,54 @@ def open_files(files):
         file.close()
 
 
-def _top_level_param_json_encode(params):
+def check_sync_api(api, name):
+    """Raises a TypeError if api is an AsyncFacebookAdsApi, whose calls are
+    coroutines, as name needs the responses of its calls right away."""
+    if getattr(api, 'IS_ASYNC', False) is True:
+        raise TypeError(
+            "%s is not supported with AsyncFacebookAdsApi, await the "
+            "FacebookRequest methods instead, e.g. await "
+            "Ad(ad_id).api_get()." % name,
+        )
+
+
+_QUOTED_RESULT_REFERENCE = re.compile(r'%7Bresult%3D(.*?)%7D')
+_RESULT_REFERENCE_NAME = re.compile(r'\{result=([^:}]*)')
+
+
+def _unquote_result_reference(match):
+    return '{result=%s}' % six.moves.urllib.parse.unquote(match.group(1))
+
+
+def _is_dependent(call):
+    """Returns whether a batch call depends on another call of the batch."""
+    return (
+        'depends_on' in call or
+        '{result=' in call['relative_url'] or
+        '{result=' in call.get('body', '')
+    )
+
+
+def _get_dependency_names(calls):
+    """Returns the names of the batch calls that other calls depend on or
+    reference the results of."""
+    names = set()
+    for call in calls:
+        if 'depends_on' in call:
+            names.add(call['depends_on'])
+        for text in (call['relative_url'], call.get('body', '')):
+            if '{result=' in text:
+                names.update(_RESULT_REFERENCE_NAME.findall(text))
+    return names
+
+
+def _is_response_omitted(call):
+    """Returns whether the response of a successful batch call is omitted."""
+    return 'name' in call and call.get('omit_response_on_success', False)
+
+
+def _top_level_param_json_encode(params, json_codec=None):
+    codec = json_codec or jsoncodec.get_codec()
     params = params.copy()
 
     for param, value in params.items():
@@ -959,11 +2189,7 @@ def _top_level_param_json_encode(params):
             isinstance(value, (collections.Mapping, collections.Sequence, bool))
             and not isinstance(value, six.string_types)
         ):
-            params[param] = json.dumps(
-                value,
-                sort_keys=True,
-                separators=(',', ':'),
-            )
+            params[param] = codec.dumps(value, sort_keys=True)
         else:
             params[param] = value
 
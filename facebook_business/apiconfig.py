@@ -21,5 +21,6 @@
 ads_api_config = {
   'API_VERSION': 'v7.0',
   'SDK_VERSION': 'v7.0.1',
-  'STRICT_MODE': False
+  'STRICT_MODE': False,
+  'JSON_CODEC': 'json'
 }
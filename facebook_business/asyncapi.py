@@ -0,0 +1,479 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+asyncapi module contains an asyncio flavour of the api module classes, backed
+by aiohttp. It requires Python 3.5+ and the `aiohttp` package:
+
+    pip install facebook_business[async]
+
+Example:
+    >>> api = AsyncFacebookAdsApi.init(access_token=token)
+    >>> async with api:
+    ...     account = AdAccount('act_123', api=api)
+    ...     ads = await account.get_ads(fields=[Ad.Field.name])
+    ...     async for ad in ads:
+    ...         print(ad[Ad.Field.name])
+    ...     batch = api.new_batch()
+    ...     future = batch.add_request(Ad(ad_id, api=api).api_get(
+    ...         fields=[Ad.Field.name], pending=True))
+    ...     await batch.execute()
+    ...     ad = await future
+"""
+
+import asyncio
+import copy
+import os
+import ssl
+import sys
+
+import aiohttp
+
+from facebook_business.api import (
+    FacebookAdsApi,
+    FacebookAdsApiBatch,
+    FacebookBatchFuture,
+    FacebookResponse,
+    Cursor,
+    open_files,
+)
+from facebook_business.transport import stringify_params
+
+
+class AsyncFacebookAdsApi(FacebookAdsApi):
+
+    """Encapsulates session attributes and methods to make API calls
+    asynchronously.
+    call() is a coroutine, and the FacebookRequest objects bound to this api
+    (e.g. those built by the generated get_*/create_* methods) return an
+    awaitable from execute(). Edge reads resolve to an AsyncCursor.
+    The underlying aiohttp.ClientSession is created on first use and must be
+    released with close(), or by using the api as an async context manager.
+    """
+
+    IS_ASYNC = True
+
+    def __init__(
+        self,
+        session,
+        api_version=None,
+        enable_debug_logger=False,
+        retry_policy=None,
+        throttler=None,
+        max_connections=100,
+        etag_cache=None,
+        object_cache=None,
+        coalesce_reads=False,
+        hooks=None,
+        json_codec=None,
+    ):
+        """Initializes the api instance.
+        Args:
+            session: FacebookSession object that contains the credentials
+                and attribute GRAPH (the Facebook GRAPH API URL).
+            api_version: API version
+            retry_policy (optional): A RetryPolicy, see
+                facebook_business.retry.
+            throttler (optional): A Throttler, see facebook_business.throttler.
+            max_connections (optional): The maximum number of simultaneous
+                connections kept by the aiohttp connector.
+            etag_cache (optional): An ETagCache, see
+                facebook_business.httpcache.
+            object_cache (optional): An ObjectCache, see
+                facebook_business.objectcache.
+            coalesce_reads (optional): Whether identical concurrent GET calls
+                are sent once, see FacebookAdsApi.__init__.
+            hooks (optional): A list of RequestHook objects, see
+                facebook_business.hooks.
+            json_codec (optional): The JSON codec of the api, see
+                FacebookAdsApi.__init__.
+        """
+        super(AsyncFacebookAdsApi, self).__init__(
+            session,
+            api_version,
+            enable_debug_logger=enable_debug_logger,
+            retry_policy=retry_policy,
+            throttler=throttler,
+            etag_cache=etag_cache,
+            object_cache=object_cache,
+            coalesce_reads=coalesce_reads,
+            hooks=hooks,
+            json_codec=json_codec,
+        )
+        self._max_connections = max_connections
+        self._client = None
+        self._in_flight_tasks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the underlying aiohttp.ClientSession, if any."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.closed:
+            verify = self._session.requests.verify
+            if isinstance(verify, str):
+                ssl_context = ssl.create_default_context(cafile=verify)
+            else:
+                ssl_context = None if verify else False
+            self._client = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._max_connections,
+                    ssl=ssl_context,
+                    force_close=not getattr(self._session, 'keep_alive', True),
+                ),
+                timeout=_client_timeout(self._session.timeout),
+            )
+        return self._client
+
+    async def call(
+        self,
+        method,
+        path,
+        params=None,
+        headers=None,
+        files=None,
+        url_override=None,
+        api_version=None,
+    ):
+        """Makes an API call. See FacebookAdsApi.call for the arguments.
+        Returns:
+            A FacebookResponse object containing the response body, headers,
+            http status, and summary of the call that was made.
+        Raises:
+            FacebookResponse.error() if the request failed, once the retries
+            allowed by the retry policy, if any, are exhausted.
+        """
+        path, params, headers, files = self._prepare_call(
+            path,
+            params,
+            headers,
+            files,
+            url_override,
+            api_version,
+        )
+        in_flight_key = self._get_in_flight_key(method, path, params, headers,
+                                                files)
+        if in_flight_key is None:
+            fb_response = await self._send_with_retries(
+                method,
+                path,
+                params,
+                headers,
+                files,
+            )
+        else:
+            task = self._in_flight_tasks.get(in_flight_key)
+            if task is None:
+                task = asyncio.ensure_future(self._send_with_retries(
+                    method,
+                    path,
+                    params,
+                    headers,
+                    files,
+                ))
+                self._in_flight_tasks[in_flight_key] = task
+                task.add_done_callback(
+                    lambda _: self._in_flight_tasks.pop(in_flight_key, None),
+                )
+            # A caller being cancelled does not cancel the call of the others
+            fb_response = await asyncio.shield(task)
+        return self._check_response(fb_response)
+
+    async def _send_with_retries(self, method, path, params, headers, files):
+        """See FacebookAdsApi._send_with_retries."""
+        call, cache_key = self._start_call(method, path, params, headers,
+                                           files)
+        attempt = 1
+        while True:
+            throttle_delay = self._get_call_throttle_delay(call)
+            if throttle_delay:
+                await asyncio.sleep(throttle_delay)
+            start = self._before_request(call)
+            try:
+                fb_response = await self._send_call(
+                    method,
+                    path,
+                    params,
+                    call['headers'],
+                    files,
+                )
+            except Exception as e:
+                self._on_send_error(call, e, start)
+                raise
+            fb_response, delay = self._after_response(
+                call,
+                cache_key,
+                fb_response,
+                attempt,
+                start,
+            )
+            if delay is None:
+                return fb_response
+            await asyncio.sleep(delay)
+            self._prepare_retry(files)
+            attempt += 1
+
+    async def _send_call(self, method, path, params, headers, files):
+        """Sends a call prepared by _prepare_call().
+        Returns:
+            The FacebookResponse, successful or not.
+        """
+        # Session level params (access_token, appsecret_proof) are merged in
+        # by requests in the sync api, do the same here.
+        request_params = stringify_params(self._session.requests.params)
+        if method in ('GET', 'DELETE'):
+            request_params.update(stringify_params(params))
+            data = None
+        else:
+            data = _build_form_data(params, files)
+
+        proxies = self._session.proxies or {}
+        async with self._get_client().request(
+            method,
+            path,
+            params=request_params,
+            data=data,
+            headers=headers,
+            proxy=proxies.get('https') or proxies.get('http'),
+        ) as response:
+            body = await response.text()
+
+        if self._enable_debug_logger:
+            print('%s %s' % (method, response.url))
+        fb_response = FacebookResponse(
+            body=body,
+            headers=response.headers,
+            http_status=response.status,
+            call={
+                'method': method,
+                'path': path,
+                'params': params,
+                'headers': headers,
+                'files': files,
+            },
+            json_codec=self.get_json_codec(),
+        )
+        return fb_response
+
+    def new_batch(self, deduplicate=True):
+        """Returns a new AsyncFacebookAdsApiBatch going through this api."""
+        return AsyncFacebookAdsApiBatch(api=self, deduplicate=deduplicate)
+
+    async def execute_request(self, request, raw=False):
+        """Executes a FacebookRequest bound to this api.
+        Args:
+            request: The FacebookRequest.
+            raw (optional): See FacebookRequest.execute.
+        Returns:
+            An AsyncCursor with its first page loaded for edge reads, else the
+            parsed response.
+        """
+        cache_key, cached_data = request._get_cached_data()
+        if cached_data is not None:
+            return request._parse_data(cached_data, raw=raw)
+        request._invalidate_cached_object()
+        params = copy.deepcopy(request._params)
+        if request._api_type == "EDGE" and request._method == "GET":
+            cursor = request._create_cursor(AsyncCursor, params, raw=raw)
+            await cursor.load_next_page()
+            return cursor
+        if request._fields:
+            params['fields'] = ','.join(request._fields)
+        with open_files(request._file_params) as files:
+            response = await self.call(
+                method=request._method,
+                path=request._path,
+                params=params,
+                files=files,
+                api_version=request._api_version,
+            )
+            request._cache_response(cache_key, response)
+            return request._parse_response(response, raw=raw)
+
+
+class AsyncFacebookBatchFuture(FacebookBatchFuture):
+
+    """FacebookBatchFuture which can be awaited, e.g. by a coroutine other
+    than the one executing the batch. Awaiting it returns result()."""
+
+    __slots__ = ('_waiter',)
+
+    def __init__(self, request=None):
+        super(AsyncFacebookBatchFuture, self).__init__(request)
+        self._waiter = None
+
+    def __await__(self):
+        if not self.done():
+            if self._waiter is None:
+                self._waiter = asyncio.get_event_loop().create_future()
+            yield from self._waiter
+        return self.result()
+
+    def _set_response(self, response):
+        super(AsyncFacebookBatchFuture, self)._set_response(response)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _set_exception(self, exc_info):
+        super(AsyncFacebookBatchFuture, self)._set_exception(exc_info)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class AsyncFacebookAdsApiBatch(FacebookAdsApiBatch):
+
+    """FacebookAdsApiBatch whose execute() is a coroutine, and whose
+    add_request() returns AsyncFacebookBatchFuture objects."""
+
+    FUTURE_CLASS = AsyncFacebookBatchFuture
+
+    async def execute(self):
+        """See FacebookAdsApiBatch.execute."""
+        if not self._batch:
+            return None
+        retry_policy, throttler = self._get_retry_policy_and_throttler()
+        transient_batch = self._new_batch()
+        batch = self
+        attempt = 1
+        while True:
+            throttle_delay = batch._get_throttle_delay(throttler)
+            if throttle_delay:
+                await asyncio.sleep(throttle_delay)
+            params, files, call_indices = batch._prepare_batch_call()
+            try:
+                fb_response = await self._api.call(
+                    'POST',
+                    tuple(),
+                    params=params,
+                    files=files,
+                )
+            except Exception:
+                self._set_exception(sys.exc_info())
+                raise
+            retry_indices, delay = batch._process_responses(
+                fb_response,
+                call_indices,
+                attempt,
+                retry_policy,
+                throttler,
+                transient_batch,
+            )
+            if not retry_indices:
+                break
+            await asyncio.sleep(delay)
+            batch = batch._get_retry_batch(retry_indices)
+            attempt += 1
+
+        if transient_batch._batch:
+            return transient_batch
+        else:
+            return None
+
+
+class AsyncCursor(Cursor):
+
+    """Cursor over an object's connections, to be consumed with `async for`.
+    Examples:
+        >>> async for ad in await account.get_ads():
+        ...     print(ad)
+    """
+
+    def __iter__(self):
+        raise TypeError(
+            "AsyncCursor must be iterated over with 'async for'.",
+        )
+
+    def __aiter__(self):
+        return self
+
+    def set_prefetch(self, prefetch=True):
+        raise TypeError(
+            "AsyncCursor does not prefetch pages, await several cursors "
+            "concurrently instead.",
+        )
+
+    async def __anext__(self):
+        # Load next page at end.
+        if not self._queue and not await self.load_next_page():
+            raise StopAsyncIteration()
+
+        return self._queue.popleft()
+
+    async def load_next_page(self):
+        """Queries server for more nodes and loads them into the internal queue.
+        Returns:
+            True if successful, else False.
+        """
+        if self._finished_iteration:
+            return False
+
+        self._add_summary_param()
+        response_obj = await self._api.call(
+            'GET',
+            self._path,
+            params=self.params,
+        )
+        return self._load_page(response_obj)
+
+    async def get_one(self):
+        async for obj in self:
+            return obj
+        return None
+
+
+def _client_timeout(timeout):
+    """Translates a requests style timeout into an aiohttp.ClientTimeout."""
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+def _build_form_data(params, files):
+    if not files:
+        return stringify_params(params)
+    form = aiohttp.FormData()
+    for key, value in stringify_params(params).items():
+        form.add_field(key, value)
+    for key, fileobj in files.items():
+        form.add_field(
+            key,
+            fileobj,
+            filename=os.path.basename(getattr(fileobj, 'name', key)),
+        )
+    return form
+
+
+__all__ = [
+    'AsyncFacebookAdsApi',
+    'AsyncFacebookAdsApiBatch',
+    'AsyncFacebookBatchFuture',
+    'AsyncCursor',
+]
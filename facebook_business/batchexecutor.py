@@ -0,0 +1,412 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""
+batchexecutor module contains the BatchExecutor, which executes any number of
+requests through batch calls made concurrently.
+
+Example:
+    >>> executor = BatchExecutor(api, max_workers=4)
+    >>> requests = (
+    ...     Ad(ad_id).api_update(params={'status': 'PAUSED'}, pending=True)
+    ...     for ad_id in ad_ids
+    ... )
+    >>> for result in executor.execute(requests):
+    ...     if not result.is_success():
+    ...         print(result.request._node_id, result.error())
+"""
+
+import collections
+import itertools
+import threading
+import time
+
+from six.moves import queue
+
+from facebook_business.api import FacebookAdsApi
+from facebook_business.exceptions import (
+    FacebookError,
+    FacebookRequestError,
+)
+from facebook_business.retry import RetryPolicy
+
+
+class BatchResult(object):
+
+    """The outcome of a FacebookRequest executed by a BatchExecutor.
+    Attributes:
+        request: The FacebookRequest.
+        response: The FacebookResponse of its call, or None if the batch call
+            itself failed or did not return a response to the call.
+        exception: The exception raised by the batch call, if it failed.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.response = None
+        self.exception = None
+
+    def __repr__(self):
+        return '<%s %s %s>' % (
+            self.__class__.__name__,
+            'success' if self.is_success() else 'failure',
+            '/'.join(map(str, self.request._path)),
+        )
+
+    def is_success(self):
+        return (
+            self.exception is None and
+            self.response is not None and
+            self.response.is_success()
+        )
+
+    def error(self):
+        """Returns the exception of a failed request, else None."""
+        if self.exception is not None:
+            return self.exception
+        if self.response is None:
+            return FacebookError(
+                "The batch call returned no response to %s." %
+                '/'.join(map(str, self.request._path)),
+            )
+        return self.response.error()
+
+    def result(self):
+        """Returns the response parsed like FacebookRequest.execute() would.
+        Raises:
+            The error of the request if it failed.
+        """
+        if self.exception is not None or self.response is None:
+            raise self.error()
+        return self.request._parse_response(self.response)
+
+    def _set_response(self, response):
+        self.response = response
+
+    def _is_pending(self):
+        return (
+            self.exception is None and
+            (self.response is None or self.response.is_transient())
+        )
+
+
+class BatchExecutor(object):
+
+    """Executes a stream of FacebookRequest objects through batch calls of up
+    to batch_size calls each, at most max_workers of which are in flight at
+    once.
+    The calls which fail with a transient error are re-submitted in a new
+    batch call, up to the max_attempts of the retry policy, after its backoff.
+    When the api has a RetryPolicy of its own, the calls it deems retryable
+    are already retried by the batches and are not re-submitted again, the
+    others (e.g. POST calls, which it only retries when throttled) are.
+    The requests are executed with the api of the executor.
+    In adaptive mode, the batch size is halved when a batch call shows signs
+    of being too heavy for the Graph API (calls with an empty response or
+    timing out, the batch call itself timing out), and grows back by one
+    call, up to batch_size, with each batch call executed without them.
+    Batches formed before the size shrinks, and re-submitted calls, are split
+    to the current size.
+    """
+
+    MAX_BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        api=None,
+        batch_size=MAX_BATCH_SIZE,
+        max_workers=4,
+        retry_policy=None,
+        adaptive=False,
+        min_batch_size=1,
+        target_duration=None,
+    ):
+        """Initializes the executor.
+        Args:
+            api (optional): The FacebookAdsApi to make the batch calls with,
+                the default api if None.
+            batch_size (optional): The number of calls per batch call, 50 at
+                most (the limit of the Graph API).
+            max_workers (optional): The number of batch calls made
+                concurrently.
+            retry_policy (optional): The RetryPolicy used to re-submit the
+                calls which failed with a transient error.
+            adaptive (optional): Whether to adapt the batch size, starting
+                from batch_size.
+            min_batch_size (optional): The smallest batch size in adaptive
+                mode.
+            target_duration (optional): In adaptive mode, the duration, in
+                seconds, over which a batch call is not deemed fast enough to
+                grow the batch size.
+        """
+        if not 1 <= batch_size <= self.MAX_BATCH_SIZE:
+            raise ValueError(
+                "batch_size must be between 1 and %d" % self.MAX_BATCH_SIZE,
+            )
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._api = api or FacebookAdsApi.get_default_api()
+        self._batch_size = batch_size
+        self._max_workers = max_workers
+        self._retry_policy = retry_policy or RetryPolicy()
+        if adaptive:
+            self._sizer = _AdaptiveBatchSize(
+                batch_size,
+                min_batch_size,
+                target_duration,
+            )
+        else:
+            self._sizer = None
+
+    def get_batch_size(self):
+        """Returns the size of the next batches."""
+        if self._sizer is not None:
+            return self._sizer.get()
+        return self._batch_size
+
+    def execute(self, requests):
+        """Executes the requests, which may be any iterable and are only
+        consumed as the batch calls progress.
+        Returns:
+            A generator of the BatchResult of each request, in the order of
+            the requests.
+        """
+        jobs = queue.Queue()
+        cancelled = threading.Event()
+        workers = [
+            threading.Thread(target=self._work, args=(jobs, cancelled))
+            for _ in range(self._max_workers)
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        # Batches are submitted ahead of the results being consumed, up to
+        # twice the number of workers so that they never wait for the caller.
+        pending = collections.deque()
+        max_pending = 2 * self._max_workers
+        try:
+            for chunk in _chunks(requests, self.get_batch_size):
+                job = _BatchJob(chunk)
+                jobs.put(job)
+                pending.append(job)
+                while pending and (
+                    len(pending) >= max_pending or pending[0].is_done()
+                ):
+                    for result in pending.popleft().wait():
+                        yield result
+            while pending:
+                for result in pending.popleft().wait():
+                    yield result
+        finally:
+            cancelled.set()
+            for _ in workers:
+                jobs.put(None)
+
+    def execute_batch(self, requests):
+        """Executes up to batch_size requests in one batch call, or several in
+        adaptive mode, re-submitting those which failed with a transient
+        error.
+        Returns:
+            The list of the BatchResult of each request.
+        """
+        results = [BatchResult(request) for request in requests]
+        batch = self._api.new_batch()
+        for result in results:
+            batch.add_request(
+                result.request,
+                success=result._set_response,
+                failure=result._set_response,
+                transient_error=result._set_response,
+            )
+
+        get_retry_policy = getattr(self._api, 'get_retry_policy', None)
+        api_retry_policy = get_retry_policy() if get_retry_policy else None
+        batches = [batch]
+        attempt = 1
+        try:
+            while True:
+                transient_batches = []
+                for batch in batches:
+                    for sub_batch in self._split(batch):
+                        transient_batch = _get_not_retried(
+                            self._execute_once(sub_batch),
+                            api_retry_policy,
+                        )
+                        if transient_batch is not None:
+                            transient_batches.append(transient_batch)
+                if (
+                    not transient_batches or
+                    attempt >= self._retry_policy.max_attempts
+                ):
+                    break
+                time.sleep(self._retry_policy.get_backoff(attempt))
+                batches = transient_batches
+                attempt += 1
+        except Exception as e:
+            for result in results:
+                if result._is_pending():
+                    result.exception = e
+        return results
+
+    def _split(self, batch):
+        """Splits the batch into batches of the adaptive batch size."""
+        size = self.get_batch_size()
+        if len(batch) <= size:
+            return [batch]
+        return [
+            batch._get_retry_batch(range(start, min(start + size, len(batch))))
+            for start in range(0, len(batch), size)
+        ]
+
+    def _execute_once(self, batch):
+        """Executes the batch, adapting the batch size to its outcome.
+        Returns:
+            The batch of the calls which failed with a transient error, or
+            None.
+        """
+        start = time.time()
+        try:
+            transient_batch = batch.execute()
+        except Exception as e:
+            if self._sizer is not None and _is_heavy_batch_error(e):
+                self._sizer.shrink()
+            raise
+        if self._sizer is not None:
+            if transient_batch is not None and any(
+                _is_timeout(future.response())
+                for future in transient_batch._futures
+            ):
+                self._sizer.shrink()
+            else:
+                self._sizer.grow(time.time() - start)
+        return transient_batch
+
+    def _work(self, jobs, cancelled):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            try:
+                if not cancelled.is_set():
+                    job.results = self.execute_batch(job.requests)
+            except Exception as e:
+                # e.g. parameters that cannot be encoded
+                job.results = [BatchResult(request) for request in job.requests]
+                for result in job.results:
+                    result.exception = e
+            finally:
+                job.done.set()
+
+
+class _AdaptiveBatchSize(object):
+    """Additive increase, multiplicative decrease of the batch size, as in
+    TCP congestion control."""
+
+    def __init__(self, maximum, minimum=1, target_duration=None):
+        if not 1 <= minimum <= maximum:
+            raise ValueError(
+                "min_batch_size must be between 1 and the batch size",
+            )
+        self._size = maximum
+        self._maximum = maximum
+        self._minimum = minimum
+        self._target_duration = target_duration
+        self._lock = threading.Lock()
+
+    def get(self):
+        return self._size
+
+    def shrink(self):
+        with self._lock:
+            self._size = max(self._minimum, self._size // 2)
+
+    def grow(self, duration):
+        if (
+            self._target_duration is not None and
+            duration > self._target_duration
+        ):
+            return
+        with self._lock:
+            self._size = min(self._maximum, self._size + 1)
+
+
+def _get_not_retried(batch, retry_policy):
+    """Returns the batch of the calls of batch that retry_policy, the one of
+    the api, does not retry, or None."""
+    if batch is None or retry_policy is None:
+        return batch
+    indices = [
+        index for index, future in enumerate(batch._futures)
+        if not retry_policy.is_retryable(future.response())
+    ]
+    if not indices:
+        return None
+    if len(indices) == len(batch):
+        return batch
+    return batch._get_retry_batch(indices)
+
+
+def _is_timeout(response):
+    """Returns whether the call had an empty response or timed out, which
+    the Graph API does when a batch is too heavy."""
+    if not response.is_transient():
+        return False
+    error = response.json().get('error', {})
+    return (
+        error.get('type') == 'empty response' or
+        'timed out' in error.get('message', '')
+    )
+
+
+def _is_heavy_batch_error(exception):
+    """Returns whether a batch call failed as when it is too heavy: a server
+    error or an http error such as a timeout."""
+    if isinstance(exception, FacebookRequestError):
+        return (exception.http_status() or 0) >= 500
+    return isinstance(exception, (IOError, OSError))
+
+
+class _BatchJob(object):
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.results = None
+        self.done = threading.Event()
+
+    def is_done(self):
+        return self.done.is_set()
+
+    def wait(self):
+        self.done.wait()
+        return self.results
+
+
+def _chunks(iterable, get_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, get_size()))
+        if not chunk:
+            return
+        yield chunk
+
+
+__all__ = ['BatchExecutor', 'BatchResult']
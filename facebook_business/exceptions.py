@@ -26,6 +26,8 @@ raised by the sdk.
 import json
 import re
 
+from facebook_business.utils import jsoncodec
+
 
 class FacebookError(Exception):
     """
@@ -47,34 +49,39 @@ class FacebookRequestError(FacebookError):
         request_context,
         http_status,
         http_headers,
-        body
+        body,
+        is_transient=False,
     ):
         self._message = message
         self._request_context = request_context
         self._http_status = http_status
         self._http_headers = http_headers
-        try:
-            self._body = json.loads(body)
-        except (TypeError, ValueError):
+        if isinstance(body, (dict, list)):
+            # Already decoded by FacebookResponse
             self._body = body
+        else:
+            try:
+                self._body = jsoncodec.loads(body)
+            except (TypeError, ValueError):
+                self._body = body
 
         self._api_error_code = None
         self._api_error_type = None
         self._api_error_message = None
         self._api_error_subcode = None
         self._api_blame_field_specs = None
-        self._api_transient_error = False
+        self._api_transient_error = is_transient
 
         if self._body and 'error' in self._body:
             self._error = self._body['error']
-            error_data = self._error.get('error_data', str({}))
+            error_data = self._error.get('error_data', {})
             if not isinstance(error_data, dict):
-                error_data = json.loads(error_data)
+                error_data = jsoncodec.loads(error_data)
             if 'message' in self._error:
                 self._api_error_message = self._error['message']
             if 'code' in self._error:
                 self._api_error_code = self._error['code']
-            if 'is_transient' in self._error:
+            if 'is_transient' in self._error and not is_transient:
                 self._api_transient_error = self._error['is_transient']
             if 'error_subcode' in self._error:
                 self._api_error_subcode = self._error['error_subcode']
@@ -0,0 +1,81 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""
+hooks module contains RequestHook, the base class of the objects called by
+FacebookAdsApi along the lifecycle of its calls, e.g. to log, trace or
+measure them (see facebook_business.metrics).
+
+Example:
+    >>> class SlowCallLogger(RequestHook):
+    ...     def after_response(self, call, fb_response, duration):
+    ...         if duration > 1:
+    ...             logging.warning('%s %s took %.1fs', call['method'],
+    ...                             call['path'], duration)
+    >>> api = FacebookAdsApi.init(access_token=token, hooks=[SlowCallLogger()])
+"""
+
+
+class RequestHook(object):
+
+    """Does nothing at each step of a call, to be overridden.
+
+    The call argument is a mapping with the 'method', 'path' (full URL),
+    'params', 'headers' and 'files' of the http request, as sent.
+    before_request() may modify its params and headers in place.
+
+    Hooks are called from the threads making the calls, and so must be thread
+    safe if the api is shared. Their exceptions are not caught.
+    """
+
+    def before_request(self, call):
+        """Called before each http request of a call, retries included."""
+        pass
+
+    def after_response(self, call, fb_response, duration):
+        """Called with the FacebookResponse of each http request, successful
+        or not, and its duration in seconds."""
+        pass
+
+    def on_error(self, call, error, duration):
+        """Called when a call fails, with the error raised: the exception of
+        the transport, or the FacebookRequestError of the last response once
+        the retries are exhausted."""
+        pass
+
+    def on_retry(self, call, fb_response, attempt, delay):
+        """Called when the failed attempt number attempt of a call is going
+        to be retried after delay seconds."""
+        pass
+
+    def on_throttle(self, call, delay):
+        """Called when the throttler delays a call by delay seconds. call is
+        None for the delays of a FacebookAdsApiBatch before its batch
+        calls."""
+        pass
+
+    def on_batch(self, calls):
+        """Called with the list of calls of a FacebookAdsApiBatch before they
+        are sent in a batch call, re-submitted transient failures included."""
+        pass
+
+
+__all__ = ['RequestHook']
@@ -0,0 +1,218 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""
+httpcache module contains the ETagCache used by FacebookAdsApi to make
+conditional GET requests, and the storages it can keep the responses in.
+
+Example:
+    >>> api = FacebookAdsApi.init(
+    ...     access_token=token,
+    ...     etag_cache=ETagCache(DiskStorage('/var/cache/facebook_business')),
+    ... )
+"""
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import six
+from six.moves import http_client
+
+from facebook_business.utils import api_utils
+from facebook_business.utils import urls
+
+
+class MemoryStorage(object):
+
+    """Keeps up to max_entries cache entries in memory, evicting the least
+    recently used ones. It is thread safe."""
+
+    def __init__(self, max_entries=10000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the (etag, body) entry of key, or None."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskStorage(object):
+
+    """Keeps the cache entries in a directory, one file per entry, so that
+    they are shared between processes and survive restarts."""
+
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._directory = directory
+
+    def _get_filename(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, digest + '.json')
+
+    def get(self, key):
+        """Returns the (etag, body) entry of key, or None."""
+        try:
+            with open(self._get_filename(key), 'r') as entry_file:
+                stored_key, etag, body = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if stored_key != key:
+            return None
+        return etag, body
+
+    def set(self, key, entry):
+        etag, body = entry
+        # Written to a temporary file first, for readers to never see a
+        # partial entry
+        fd, temporary = tempfile.mkstemp(dir=self._directory)
+        try:
+            with os.fdopen(fd, 'w') as entry_file:
+                json.dump([key, etag, body], entry_file)
+            _replace(temporary, self._get_filename(key))
+        except Exception:
+            os.remove(temporary)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self._get_filename(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for filename in os.listdir(self._directory):
+            if filename.endswith('.json'):
+                os.remove(os.path.join(self._directory, filename))
+
+
+class ETagCache(object):
+
+    """Caches the body and ETag of the GET responses of an api. Later GET
+    calls to the same URL, with the same parameters and access token, send
+    the ETag in an If-None-Match header, and are answered with the cached
+    body when the Graph API replies 304 Not Modified.
+    The storage can be any object with the get(), set() and delete() methods
+    of MemoryStorage, which is the default.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage if storage is not None else MemoryStorage()
+
+    def get_key(self, session, path, params):
+        """Returns the cache key of a GET call to path with params through
+        session. The access tokens, of the session or in the query string of
+        path as in paging URLs, are only part of it as a digest, for the
+        storage never to hold them."""
+        path, secrets = urls.split_secret_params(path)
+        secrets.insert(0, getattr(session, 'access_token', None) or '')
+        query = []
+        for key, value in (params or {}).items():
+            if key in urls.SECRET_PARAMS:
+                secrets.append(six.text_type(value))
+            else:
+                query.append((six.text_type(key), six.text_type(value)))
+        digest = hashlib.sha256(
+            '\n'.join(secrets).encode('utf-8'),
+        ).hexdigest()
+        return json.dumps([digest, path, sorted(query)])
+
+    def prepare(self, session, method, path, params, headers, files):
+        """Adds an If-None-Match header to headers if the call is a GET with
+        a cached response.
+        Returns:
+            The cache key of the call, or None if it is not cached.
+        """
+        if method != 'GET' or files or 'If-None-Match' in headers:
+            return None
+        key = self.get_key(session, path, params)
+        entry = self.storage.get(key)
+        if entry is not None:
+            headers['If-None-Match'] = entry[0]
+        return key
+
+    def update(self, key, fb_response):
+        """Stores fb_response if it has an ETag, or substitutes the cached
+        body to an empty 304 response.
+        Returns:
+            The FacebookResponse of the call, or None if it is a 304 response
+            whose cached body was evicted since prepare(), the call having to
+            be sent again without If-None-Match.
+        """
+        if key is None:
+            return fb_response
+        if fb_response.status() == http_client.NOT_MODIFIED:
+            entry = self.storage.get(key)
+            if entry is None:
+                return None
+            return fb_response.__class__(
+                body=entry[1],
+                headers=fb_response.headers(),
+                http_status=fb_response.status(),
+                call=fb_response._call,
+                json_codec=fb_response._json_codec,
+            )
+        etag = api_utils.get_header(fb_response.headers(), 'ETag')
+        if fb_response.status() == http_client.OK and etag:
+            self.storage.set(key, (etag, fb_response.body()))
+        return fb_response
+
+
+def _replace(source, destination):
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    else:
+        # Python 2, where rename does not overwrite on Windows
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+__all__ = ['ETagCache', 'MemoryStorage', 'DiskStorage']
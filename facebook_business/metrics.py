@@ -0,0 +1,312 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""
+metrics module contains MetricsCollector, a RequestHook measuring the calls
+of FacebookAdsApi per endpoint, and exposing its measures as a dict or in the
+Prometheus text format.
+
+Example:
+    >>> metrics = MetricsCollector()
+    >>> api = FacebookAdsApi.init(access_token=token, hooks=[metrics])
+    >>> AdAccount('act_123').get_ads()
+    >>> metrics.snapshot()['endpoints']['GET /{id}/ads']['requests']
+    1
+    >>> print(metrics.to_prometheus())
+"""
+
+import re
+import threading
+
+from six.moves import urllib
+
+from facebook_business.hooks import RequestHook
+from facebook_business.transport import stringify_params
+
+
+class MetricsCollector(RequestHook):
+
+    """Counts the http requests, errors and retries of the calls, the bytes
+    sent and received, and the distribution of their durations, per
+    endpoint. Endpoints are named after the method and the path of their
+    calls, ids replaced by {id}, e.g. 'GET /{id}/insights'. It also measures
+    the sizes of the batches and the delays waited for the throttler.
+    It is thread safe.
+    """
+
+    # Upper bounds of the histogram buckets, in seconds
+    DURATION_BUCKETS = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+    )
+    BATCH_SIZE_BUCKETS = (1, 5, 10, 20, 30, 40, 50)
+
+    def __init__(self, prefix='facebook_business'):
+        """Initializes the collector.
+        Args:
+            prefix (optional): The prefix of the Prometheus metric names.
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forgets all the measures."""
+        with self._lock:
+            self._endpoints = {}
+            self._batch_sizes = _Histogram(self.BATCH_SIZE_BUCKETS)
+            self._throttle_waits = 0
+            self._throttle_seconds = 0.0
+
+    def before_request(self, call):
+        size = _get_request_size(call)
+        with self._lock:
+            self._get_endpoint(call).request_bytes += size
+
+    def after_response(self, call, fb_response, duration):
+        size = len(fb_response.body() or '')
+        with self._lock:
+            endpoint = self._get_endpoint(call)
+            endpoint.requests += 1
+            endpoint.response_bytes += size
+            endpoint.durations.observe(duration)
+
+    def on_error(self, call, error, duration):
+        with self._lock:
+            self._get_endpoint(call).errors += 1
+
+    def on_retry(self, call, fb_response, attempt, delay):
+        with self._lock:
+            self._get_endpoint(call).retries += 1
+
+    def on_throttle(self, call, delay):
+        with self._lock:
+            self._throttle_waits += 1
+            self._throttle_seconds += delay
+
+    def on_batch(self, calls):
+        with self._lock:
+            self._batch_sizes.observe(len(calls))
+
+    def snapshot(self):
+        """Returns the measures as a dict:
+            'endpoints': a mapping of endpoint names to their 'requests',
+                'errors', 'retries', 'request_bytes' and 'response_bytes'
+                counts, and their 'duration' histogram.
+            'batch_size': the histogram of the number of calls per batch.
+            'throttle': the 'waits' and 'seconds' waited for the throttler.
+        Histograms are dicts with the 'count' and 'sum' of the values, and
+        their 'buckets', a list of (upper bound, cumulative count) pairs.
+        """
+        with self._lock:
+            return {
+                'endpoints': dict(
+                    (name, endpoint.snapshot())
+                    for name, endpoint in self._endpoints.items()
+                ),
+                'batch_size': self._batch_sizes.snapshot(),
+                'throttle': {
+                    'waits': self._throttle_waits,
+                    'seconds': self._throttle_seconds,
+                },
+            }
+
+    def to_prometheus(self):
+        """Returns the measures in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        endpoints = sorted(snapshot['endpoints'].items())
+
+        counters = (
+            ('requests', 'requests_total', 'HTTP requests sent.'),
+            ('errors', 'errors_total', 'Failed calls.'),
+            ('retries', 'retries_total', 'Retried attempts.'),
+            ('request_bytes', 'request_bytes_total',
+             'Bytes of the request params.'),
+            ('response_bytes', 'response_bytes_total',
+             'Bytes of the response bodies.'),
+        )
+        for key, name, description in counters:
+            name = self._add_metric(lines, name, 'counter', description)
+            for endpoint, values in endpoints:
+                lines.append('%s%s %s' % (
+                    name,
+                    _format_labels(_get_endpoint_labels(endpoint)),
+                    values[key],
+                ))
+
+        name = self._add_metric(
+            lines,
+            'request_duration_seconds',
+            'histogram',
+            'Duration of the HTTP requests.',
+        )
+        for endpoint, values in endpoints:
+            _add_histogram(
+                lines,
+                name,
+                _get_endpoint_labels(endpoint),
+                values['duration'],
+            )
+
+        name = self._add_metric(lines, 'batch_size', 'histogram',
+                                'Calls per batch call.')
+        _add_histogram(lines, name, [], snapshot['batch_size'])
+
+        name = self._add_metric(lines, 'throttle_waits_total', 'counter',
+                                'Calls delayed by the throttler.')
+        lines.append('%s %s' % (name, snapshot['throttle']['waits']))
+        name = self._add_metric(lines, 'throttle_wait_seconds_total',
+                                'counter', 'Time waited for the throttler.')
+        lines.append('%s %s' % (name, _format_value(
+            snapshot['throttle']['seconds'])))
+        return '\n'.join(lines) + '\n'
+
+    def _add_metric(self, lines, name, metric_type, description):
+        name = '%s_%s' % (self.prefix, name)
+        lines.append('# HELP %s %s' % (name, description))
+        lines.append('# TYPE %s %s' % (name, metric_type))
+        return name
+
+    def _get_endpoint(self, call):
+        name = get_endpoint_name(call['method'], call['path'])
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = _EndpointMetrics(
+                self.DURATION_BUCKETS,
+            )
+        return endpoint
+
+
+def get_endpoint_name(method, url):
+    """Returns the name of the endpoint of a call, e.g. 'GET /{id}/ads' for
+    'https://graph.facebook.com/v7.0/act_123/ads'. The batch calls are
+    named 'POST /'."""
+    path = urllib.parse.urlparse(url).path
+    tokens = [token for token in path.split('/') if token]
+    if tokens and _VERSION_RE.match(tokens[0]):
+        tokens = tokens[1:]
+    tokens = ['{id}' if _ID_RE.match(token) else token for token in tokens]
+    return '%s /%s' % (method, '/'.join(tokens))
+
+
+_VERSION_RE = re.compile(r'^v[0-9]+\.[0-9]+$')
+_ID_RE = re.compile(r'^(act_)?[0-9][0-9_]*$|^me$')
+
+
+class _EndpointMetrics(object):
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.durations = _Histogram(buckets)
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'duration': self.durations.snapshot(),
+        }
+
+
+class _Histogram(object):
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0
+
+    def observe(self, value):
+        index = 0
+        for bound in self._buckets:
+            if value <= bound:
+                break
+            index += 1
+        self._counts[index] += 1
+        self._sum += value
+
+    def snapshot(self):
+        cumulative = []
+        count = 0
+        for bound, bucket_count in zip(
+            self._buckets + (float('inf'),),
+            self._counts,
+        ):
+            count += bucket_count
+            cumulative.append((bound, count))
+        return {'count': count, 'sum': self._sum, 'buckets': cumulative}
+
+
+def _get_request_size(call):
+    """Returns the size of the url encoded params of a call, leaving out
+    its files."""
+    params = stringify_params(call['params'])
+    return len(urllib.parse.urlencode(params)) if params else 0
+
+
+def _get_endpoint_labels(endpoint):
+    method, path = endpoint.split(' ', 1)
+    return [('method', method), ('endpoint', path)]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (
+            name,
+            value.replace('\\', '\\\\').replace('"', '\\"'),
+        )
+        for name, value in labels
+    )
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _add_histogram(lines, name, labels, histogram):
+    for bound, count in histogram['buckets']:
+        lines.append('%s_bucket%s %s' % (
+            name,
+            _format_labels(labels + [('le', _format_value(bound))]),
+            count,
+        ))
+    lines.append('%s_sum%s %s' % (
+        name,
+        _format_labels(labels),
+        _format_value(histogram['sum']),
+    ))
+    lines.append('%s_count%s %s' % (
+        name,
+        _format_labels(labels),
+        histogram['count'],
+    ))
+
+
+__all__ = ['MetricsCollector', 'get_endpoint_name']
@@ -0,0 +1,141 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+"""
+objectcache module contains the ObjectCache used by FacebookAdsApi to serve
+repeated node reads (api_get() and AbstractCrudObject.get_by_ids()) from
+memory.
+
+Example:
+    >>> api = FacebookAdsApi.init(
+    ...     access_token=token,
+    ...     object_cache=ObjectCache(ttl=300, max_entries=10000),
+    ... )
+    >>> AdAccount('act_123').api_get(fields=[AdAccount.Field.name])
+    >>> # Served from the cache for the next 5 minutes
+    >>> AdAccount('act_123').api_get(fields=[AdAccount.Field.name])
+"""
+
+import collections
+import copy
+import threading
+import time
+
+from facebook_business.utils import jsoncodec
+
+
+class ObjectCache(object):
+
+    """Keeps the decoded responses of node reads, keyed by the object class,
+    the node id, the fields and params read and the API version.
+
+    Entries expire ttl seconds after being stored, and the least recently
+    used ones are evicted beyond max_entries. Unless invalidate_on_write is
+    False, the entries of a node are dropped when the api updates or deletes
+    it (api_update(), api_delete(), remote_update(), remote_delete()), writes
+    made by other processes or other apis being only seen on expiry.
+
+    Each read gets its own copy of the cached data. The cache is thread safe,
+    and is meant for a single access token: share it between apis of the
+    same token only.
+    """
+
+    def __init__(self, ttl=300, max_entries=10000, invalidate_on_write=True):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.invalidate_on_write = invalidate_on_write
+        self._entries = collections.OrderedDict()
+        self._keys_by_node = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(target_class, node_id, fields, params, api_version):
+        """Returns the cache key of a node read."""
+        return (
+            target_class,
+            str(node_id),
+            tuple(sorted(fields or ())),
+            jsoncodec.dumps(params, sort_keys=True) if params else '',
+            api_version,
+        )
+
+    def get(self, key):
+        """Returns a copy of the data stored for key, or None if there is
+        none or it expired."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._unindex(key)
+                self._misses += 1
+                return None
+            self._entries[key] = entry
+            self._hits += 1
+            data = entry[1]
+        return copy.deepcopy(data)
+
+    def set(self, key, data):
+        """Stores a copy of the decoded response data of a node read."""
+        entry = (time.time() + self.ttl, copy.deepcopy(data))
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                self._keys_by_node.setdefault(key[1], set()).add(key)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._unindex(evicted)
+
+    def invalidate(self, node_id):
+        """Drops every entry of the node node_id."""
+        with self._lock:
+            for key in self._keys_by_node.pop(str(node_id), ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_node.clear()
+
+    def get_stats(self):
+        """Returns the number of hits, misses and entries of the cache."""
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': len(self._entries),
+            }
+
+    def _unindex(self, key):
+        keys = self._keys_by_node.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_node[key[1]]
+
+
+__all__ = ['ObjectCache']
@@ -0,0 +1,203 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+retry module contains the RetryPolicy used by FacebookAdsApi to retry failed
+calls.
+
+Example:
+    >>> api = FacebookAdsApi.init(
+    ...     access_token=token,
+    ...     retry_policy=RetryPolicy(max_attempts=5, backoff_cap=30),
+    ... )
+"""
+
+import random
+
+from facebook_business.utils import api_utils, jsoncodec
+
+
+class RetryPolicy(object):
+
+    """Decides whether a failed call is retried, and how long to wait first.
+    Delays grow exponentially from backoff_base up to backoff_cap. With
+    jitter, each delay is drawn uniformly between 0 and that bound (the "full
+    jitter" strategy), which spreads out the retries of concurrent clients.
+    When the response tells how long to wait (Retry-After, or the
+    estimated_time_to_regain_access of X-Business-Use-Case-Usage), the call
+    is not retried before then, nor at all if that is over max_throttle_wait.
+    Calls whose method is not in retry_methods, such as the POST calls
+    creating objects and batch calls, may have been applied despite failing,
+    so they are only retried when rate limited (throttling_codes).
+    """
+
+    # Rate limiting errors, returned for calls which were not applied, see
+    # https://developers.facebook.com/docs/graph-api/overview/rate-limiting
+    DEFAULT_THROTTLING_CODES = frozenset([
+        4,  # API Too Many Calls
+        17,  # API User Too Many Calls
+        32,  # Page-level throttling
+        341,  # Application limit reached
+        613,  # Calls within one hour exceeded
+        80000, 80001, 80002, 80003, 80004, 80005, 80006, 80008, 80009,
+        80014,  # Business use case rate limits
+    ])
+
+    # Errors worth retrying, see
+    # https://developers.facebook.com/docs/graph-api/using-graph-api/error-handling
+    DEFAULT_RETRYABLE_CODES = frozenset([
+        1,  # API Unknown
+        2,  # API Service
+    ]) | DEFAULT_THROTTLING_CODES
+
+    DEFAULT_RETRYABLE_HTTP_STATUSES = frozenset([502, 503, 504])
+
+    # Idempotent methods, whose calls can be sent again whatever the error
+    DEFAULT_RETRY_METHODS = frozenset(['GET', 'DELETE'])
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_base=1.0,
+        backoff_cap=60.0,
+        jitter=True,
+        retryable_codes=DEFAULT_RETRYABLE_CODES,
+        retryable_subcodes=(),
+        retryable_http_statuses=DEFAULT_RETRYABLE_HTTP_STATUSES,
+        retry_transient=True,
+        max_throttle_wait=300.0,
+        retry_methods=DEFAULT_RETRY_METHODS,
+        throttling_codes=DEFAULT_THROTTLING_CODES,
+    ):
+        """Initializes the policy.
+        Args:
+            max_attempts (optional): The maximum number of attempts of a call,
+                the first one included.
+            backoff_base (optional): The delay, in seconds, before the first
+                retry. It doubles with each retry.
+            backoff_cap (optional): The maximum delay, in seconds, between two
+                attempts.
+            jitter (optional): Whether to randomize delays.
+            retryable_codes (optional): The Graph API error codes to retry.
+            retryable_subcodes (optional): The Graph API error subcodes to
+                retry, whatever their code.
+            retryable_http_statuses (optional): The http statuses to retry.
+            retry_transient (optional): Whether to retry the errors that the
+                response flags as transient (FacebookResponse.is_transient).
+            max_throttle_wait (optional): The longest wait, in seconds, asked
+                for by a throttled response that is still worth retrying.
+            retry_methods (optional): The http methods of the calls retried
+                on any retryable error.
+            throttling_codes (optional): The Graph API error codes on which
+                the calls of other methods are retried.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_subcodes = frozenset(retryable_subcodes)
+        self.retryable_http_statuses = frozenset(retryable_http_statuses)
+        self.retry_transient = retry_transient
+        self.max_throttle_wait = max_throttle_wait
+        self.retry_methods = frozenset(
+            method.upper() for method in retry_methods
+        )
+        self.throttling_codes = frozenset(throttling_codes)
+
+    def is_retryable(self, response):
+        """Returns whether the failed FacebookResponse is worth retrying."""
+        error = _get_error(response)
+        method = _get_method(response)
+        if method is not None and method.upper() not in self.retry_methods:
+            return error.get('code') in self.throttling_codes
+        if self.retry_transient and response.is_transient():
+            return True
+        if response.status() in self.retryable_http_statuses:
+            return True
+        return (
+            error.get('code') in self.retryable_codes or
+            error.get('error_subcode') in self.retryable_subcodes
+        )
+
+    def get_backoff(self, attempt):
+        """Returns the delay, in seconds, after the given failed attempt
+        (starting at 1), regardless of the response."""
+        delay = min(
+            self.backoff_cap,
+            self.backoff_base * (2 ** (attempt - 1)),
+        )
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def get_throttle_wait(self, response):
+        """Returns the wait, in seconds, asked for by the response, or None
+        if it does not ask for any."""
+        waits = []
+        headers = response.headers()
+        retry_after = api_utils.get_header(headers, 'Retry-After')
+        if retry_after is not None:
+            try:
+                waits.append(float(retry_after))
+            except ValueError:
+                # An http date, which the Graph API does not send
+                pass
+        usage = api_utils.get_header(headers, 'X-Business-Use-Case-Usage')
+        if usage is not None:
+            try:
+                usage = jsoncodec.loads(usage)
+                for entries in usage.values():
+                    for entry in entries:
+                        minutes = entry.get('estimated_time_to_regain_access')
+                        if minutes:
+                            waits.append(float(minutes) * 60)
+            except (AttributeError, TypeError, ValueError):
+                pass
+        return max(waits) if waits else None
+
+    def get_retry_delay(self, response, attempt):
+        """Returns the delay, in seconds, before retrying the call whose
+        given attempt (starting at 1) failed with response, or None if it
+        should not be retried."""
+        if attempt >= self.max_attempts or not self.is_retryable(response):
+            return None
+        delay = self.get_backoff(attempt)
+        throttle_wait = self.get_throttle_wait(response)
+        if throttle_wait is not None:
+            if throttle_wait > self.max_throttle_wait:
+                return None
+            delay = max(delay, throttle_wait)
+        return delay
+
+
+def _get_method(response):
+    """Returns the http method of the call of response, if known."""
+    call = response._call or {}
+    return call.get('method')
+
+
+def _get_error(response):
+    body = response.json()
+    if isinstance(body, dict) and isinstance(body.get('error'), dict):
+        return body['error']
+    return {}
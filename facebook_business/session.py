@@ -26,6 +26,12 @@ import hashlib
 import hmac
 import requests
 import os
+import socket
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection
+
+from facebook_business.transport import RequestsTransport
 
 
 class FacebookSession(object):
@@ -33,24 +39,80 @@ class FacebookSession(object):
     FacebookSession manages the the Graph API authentication and https
     connection.
 
+    Connections are kept alive and pooled per host: pool_connections is the
+    number of hosts whose pool is kept, and pool_maxsize the number of
+    connections kept per host, which should be at least the number of threads
+    making calls through the session. Connections in excess are closed after
+    their call, unless pool_block is set, in which case calls wait for a
+    pooled connection to be free.
+
+    Thread safety: a session, and the FacebookAdsApi using it, can be shared
+    by the threads of a worker pool to make calls, as long as its attributes
+    (access_token, proxies, timeout, requests settings, etc.) are not changed
+    while calls are in flight. Cursor and FacebookAdsApiBatch objects are not
+    thread safe and should be used by one thread at a time.
+
     Attributes:
         GRAPH (class): The graph url without an ending forward-slash.
+        GRAPH_VIDEO (class): The graph url used to upload videos.
         app_id: The application id.
         app_secret: The application secret.
         access_token: The access token.
         appsecret_proof: The application secret proof.
         proxies: Object containing proxies for 'http' and 'https'
+        keep_alive: Whether connections are kept alive between calls.
         requests: The python requests object through which calls to the api can
             be made.
+        transport: The Transport sending the http requests of the calls (see
+            the transport module), by default through requests.
     """
     GRAPH = 'https://graph.facebook.com'
 
+    GRAPH_VIDEO = 'https://graph-video.facebook.com'
+
+    DEFAULT_POOL_CONNECTIONS = 10
+
+    DEFAULT_POOL_MAXSIZE = 10
+
+    # The idle time before the first TCP keep-alive probe, and the interval
+    # between probes, in seconds
+    TCP_KEEPALIVE_IDLE = 60
+
+    TCP_KEEPALIVE_INTERVAL = 30
+
     def __init__(self, app_id=None, app_secret=None, access_token=None,
-                 proxies=None, timeout=None, debug=False):
+                 proxies=None, timeout=None, debug=False,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 host_pool_maxsize=None, max_retries=0, keep_alive=True,
+                 tcp_keepalive=False, transport=None):
         """
         Initializes and populates the instance attributes with app_id,
         app_secret, access_token, appsecret_proof, proxies, timeout and requests
         given arguments app_id, app_secret, access_token, proxies and timeout.
+
+        The connection pools are set with:
+            pool_connections: The number of per host pools to keep.
+            pool_maxsize: The number of connections to keep per host.
+            pool_block: Whether calls wait for a free connection rather than
+                opening one which won't be kept once the pool is full.
+            host_pool_maxsize: A mapping of urls (e.g. GRAPH_VIDEO) to their
+                own pool_maxsize.
+            max_retries: The retries of connection failures, as a number or
+                an urllib3 Retry object, passed to requests' HTTPAdapter.
+                Failed calls are retried by FacebookAdsApi retry policies.
+            keep_alive: Whether to keep connections open between calls, and
+                so reuse their TCP and TLS sessions.
+            tcp_keepalive: Whether to send TCP keep-alive probes on idle
+                pooled connections, so that they are not dropped by NATs and
+                firewalls. The probes start after TCP_KEEPALIVE_IDLE seconds
+                and are sent every TCP_KEEPALIVE_INTERVAL seconds where the
+                platform allows setting them, the OS defaults applying
+                otherwise (2 hours of idle time on Linux).
+
+        transport is a Transport class, or any callable taking the session and
+        returning a Transport, RequestsTransport by default. The pool settings
+        only apply to RequestsTransport.
         """
         self.app_id = app_id
         self.app_secret = app_secret
@@ -58,7 +120,33 @@ class FacebookSession(object):
         self.proxies = proxies
         self.timeout = timeout
         self.debug = debug
+        self.keep_alive = keep_alive
         self.requests = requests.Session()
+
+        socket_options = None
+        if tcp_keepalive:
+            socket_options = (
+                HTTPConnection.default_socket_options +
+                self._get_keepalive_options()
+            )
+        adapter_options = {
+            'pool_connections': pool_connections,
+            'pool_block': pool_block,
+            'max_retries': max_retries,
+            'socket_options': socket_options,
+        }
+        for prefix in ('https://', 'http://'):
+            self.requests.mount(prefix, _PoolAdapter(
+                pool_maxsize=pool_maxsize,
+                **adapter_options
+            ))
+        for url, maxsize in (host_pool_maxsize or {}).items():
+            self.requests.mount(url, _PoolAdapter(
+                pool_maxsize=maxsize,
+                **adapter_options
+            ))
+        if not keep_alive:
+            self.requests.headers['Connection'] = 'close'
         self.requests.verify = os.path.join(
             os.path.dirname(__file__),
             'fb_ca_chain_bundle.crt',
@@ -73,6 +161,27 @@ class FacebookSession(object):
         if self.proxies:
             self.requests.proxies.update(self.proxies)
 
+        self.transport = (transport or RequestsTransport)(self)
+
+    def _get_keepalive_options(self):
+        options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        # TCP_KEEPIDLE is named TCP_KEEPALIVE on macOS
+        idle = (
+            getattr(socket, 'TCP_KEEPIDLE', None) or
+            getattr(socket, 'TCP_KEEPALIVE', None)
+        )
+        if idle is not None:
+            options.append(
+                (socket.IPPROTO_TCP, idle, self.TCP_KEEPALIVE_IDLE),
+            )
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            options.append((
+                socket.IPPROTO_TCP,
+                socket.TCP_KEEPINTVL,
+                self.TCP_KEEPALIVE_INTERVAL,
+            ))
+        return options
+
     def _gen_appsecret_proof(self):
         h = hmac.new(
             self.app_secret.encode('utf-8'),
@@ -83,4 +192,20 @@ class FacebookSession(object):
         self.appsecret_proof = h.hexdigest()
         return self.appsecret_proof
 
+
+class _PoolAdapter(HTTPAdapter):
+    """HTTPAdapter passing socket options to its connection pools."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['_socket_options']
+
+    def __init__(self, socket_options=None, **kwargs):
+        self._socket_options = socket_options
+        super(_PoolAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if getattr(self, '_socket_options', None) is not None:
+            kwargs['socket_options'] = self._socket_options
+        super(_PoolAdapter, self).init_poolmanager(*args, **kwargs)
+
+
 __all__ = ['FacebookSession']
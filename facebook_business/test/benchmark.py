@@ -0,0 +1,1038 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+'''
+Benchmarks for the hot paths of the Python Facebook Business SDK.
+
+They don't require an access token or network access.
+
+How to run:
+    python -m facebook_business.test.benchmark [benchmark_name ...]
+
+The results can be saved to a baseline file with --save, and compared to it
+with --compare. The timings depend on the host, so the comparison only fails
+if a benchmark got slower than the baseline times --tolerance when the
+baseline was saved on the same host and Python, and only reports it
+otherwise. Regressions are therefore caught by saving a baseline before a
+change and comparing to it after:
+    python -m facebook_business.test.benchmark --save baseline.json
+    python -m facebook_business.test.benchmark --compare baseline.json
+The tracked benchmark_baseline.json, recorded on another machine, is only a
+reference, which tox -e benchmark reports the ratios to.
+'''
+
+from contextlib import contextmanager
+import argparse
+import importlib
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from facebook_business import api
+from facebook_business.batchexecutor import BatchExecutor
+from facebook_business.retry import RetryPolicy
+from facebook_business import session
+from facebook_business import transport
+from facebook_business.adobjects.ad import Ad
+from facebook_business.adobjects.adcreative import AdCreative
+from facebook_business.adobjects.adset import AdSet
+from facebook_business.adobjects.adsinsights import AdsInsights
+from facebook_business.adobjects.advideo import AdVideo
+from facebook_business.adobjects.customaudience import CustomAudience
+from facebook_business.adobjects.objectparser import ObjectParser
+from facebook_business.adobjects.serverside.user_data import UserData
+from facebook_business.test.graphserver import GraphServer
+from facebook_business.utils import jsoncodec, urls
+from facebook_business.video_uploader import VideoUploader
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """Registers a benchmark. It returns a mapping of metric names to
+    values, 'seconds' being the best time of one operation."""
+    BENCHMARKS.append(func)
+    return func
+
+
+def best_time(operation, repeat=5, number=10):
+    """Returns the best time, in seconds, of a single call to operation."""
+    timings = timeit.repeat(operation, repeat=repeat, number=number)
+    return min(timings) / number
+
+
+@contextmanager
+def count_json_loads():
+    """Counts the json.loads calls made within the block."""
+    calls = []
+    original_loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        calls.append(args)
+        return original_loads(*args, **kwargs)
+
+    json.loads = counting_loads
+    try:
+        yield calls
+    finally:
+        json.loads = original_loads
+
+
+@contextmanager
+def count_imports():
+    """Counts the importlib.import_module calls made within the block."""
+    calls = []
+    original_import_module = importlib.import_module
+
+    def counting_import_module(*args, **kwargs):
+        calls.append(args)
+        return original_import_module(*args, **kwargs)
+
+    importlib.import_module = counting_import_module
+    try:
+        yield calls
+    finally:
+        importlib.import_module = original_import_module
+
+
+def insights_page(rows):
+    """Returns the JSON body of an insights page holding rows rows."""
+    return json.dumps({
+        'data': [
+            {
+                'account_id': '1234567890',
+                'campaign_id': str(6000000000 + index),
+                'date_start': '2020-06-01',
+                'date_stop': '2020-06-01',
+                'impressions': str(index * 13),
+                'clicks': str(index),
+                'spend': '%d.%02d' % (index, index % 100),
+                'actions': [
+                    {'action_type': 'link_click', 'value': str(index)},
+                    {'action_type': 'post_engagement', 'value': str(index)},
+                ],
+            }
+            for index in range(rows)
+        ],
+        'paging': {
+            'cursors': {'before': 'MAZDZD', 'after': 'MjQZD'},
+        },
+    })
+
+
+def large_targeting():
+    """Returns an ad set targeting with many locations and interests."""
+    return {
+        'age_min': 18,
+        'age_max': 65,
+        'geo_locations': {
+            'countries': ['US', 'CA', 'GB'],
+            'location_types': ['home', 'recent'],
+            'cities': [
+                {'key': str(2400000 + i), 'radius': 10,
+                 'distance_unit': 'mile'}
+                for i in range(40)
+            ],
+        },
+        'flexible_spec': [{'interests': [
+            {'id': str(6000000000000 + i), 'name': u'Int\xe9r\xeat %d' % i}
+            for i in range(60)
+        ]}],
+        'publisher_platforms': ['facebook', 'instagram'],
+    }
+
+
+@benchmark
+def response_parsing():
+    """FacebookResponse: the checks made by FacebookAdsApi.call on a
+    ~1MB insights page, then the caller's json()."""
+    body = insights_page(3000)
+
+    def operation():
+        response = api.FacebookResponse(body=body, http_status=200, call={})
+        if response.is_failure():
+            raise response.error()
+        response.json()
+
+    with count_json_loads() as calls:
+        operation()
+    return {
+        'seconds': best_time(operation),
+        'json_loads': len(calls),
+        'body_bytes': len(body),
+    }
+
+
+@benchmark
+def error_response_parsing():
+    """FacebookResponse: a transient error response down to its
+    FacebookRequestError."""
+    body = json.dumps({'error': {
+        'message': 'An unknown error occurred',
+        'code': 1,
+        'is_transient': False,
+    }})
+
+    def operation():
+        response = api.FacebookResponse(body=body, http_status=500, call={})
+        response.is_transient()
+        response.error()
+
+    with count_json_loads() as calls:
+        operation()
+    return {
+        'seconds': best_time(operation, number=1000),
+        'json_loads': len(calls),
+    }
+
+
+@benchmark
+def json_codecs():
+    """Decoding then sort_keys encoding of an insights page with each
+    installed JSON codec."""
+    body = insights_page(3000)
+    metrics = {}
+    for name in sorted(jsoncodec.CODECS):
+        try:
+            codec = jsoncodec.CODECS[name]()
+        except ImportError:
+            continue
+
+        def operation():
+            codec.dumps(codec.loads(body), sort_keys=True)
+
+        metrics[name + '_ms'] = '%.3f' % (best_time(operation) * 1000)
+    metrics['seconds'] = best_time(
+        lambda: jsoncodec.dumps(jsoncodec.loads(body), sort_keys=True),
+    )
+    return metrics
+
+
+class PagedEdgeApi(object):
+    """Stands for FacebookAdsApi, serving pages of an edge with a fixed
+    latency."""
+
+    def __init__(self, pages, rows, latency=0, bodies=None):
+        if bodies is None:
+            bodies = []
+            for page in range(pages):
+                body = {'data': [
+                    {'id': str(page * rows + index), 'name': 'Ad %d' % index}
+                    for index in range(rows)
+                ]}
+                if page + 1 < pages:
+                    body['paging'] = {
+                        'next': 'https://next?page=%d' % (page + 1),
+                    }
+                bodies.append(json.dumps(body))
+        self._bodies = bodies
+        self._latency = latency
+
+    def call(self, method, path, params=None):
+        time.sleep(self._latency)
+        page = 0 if isinstance(path, tuple) else int(path.rsplit('=', 1)[1])
+        return api.FacebookResponse(body=self._bodies[page], http_status=200)
+
+    def cursor(self, prefetch=False, raw=False, target_class=Ad):
+        return api.Cursor(
+            target_objects_class=target_class,
+            api=self,
+            node_id='act_1',
+            endpoint='ads',
+            prefetch=prefetch,
+            raw=raw,
+        )
+
+
+@benchmark
+def cursor_iteration():
+    """Cursor: iterating over a single 10k rows page."""
+    edge = PagedEdgeApi(pages=1, rows=10000)
+
+    def operation():
+        for _ in edge.cursor():
+            pass
+
+    return {'seconds': best_time(operation, repeat=3, number=1)}
+
+
+@benchmark
+def cursor_prefetch():
+    """Cursor: 5 pages of 200 rows served with 50ms of latency, with 0.25ms
+    of processing per row, without then with prefetch."""
+    edge = PagedEdgeApi(pages=5, rows=200, latency=0.05)
+
+    def crawl(prefetch):
+        for _ in edge.cursor(prefetch=prefetch):
+            time.sleep(0.00025)
+
+    return {
+        'seconds': best_time(lambda: crawl(True), repeat=3, number=1),
+        'no_prefetch_ms': '%.3f' % (
+            best_time(lambda: crawl(False), repeat=3, number=1) * 1000),
+    }
+
+
+@benchmark
+def cursor_raw_rows():
+    """Cursor: rows per second over a 3000 rows insights page, building
+    AdsInsights objects then in raw mode."""
+    rows = 3000
+    edge = PagedEdgeApi(pages=1, rows=rows, bodies=[insights_page(rows)])
+
+    def crawl(raw):
+        for _ in edge.cursor(raw=raw, target_class=AdsInsights):
+            pass
+
+    objects_seconds = best_time(lambda: crawl(False), repeat=3, number=1)
+    raw_seconds = best_time(lambda: crawl(True), repeat=3, number=1)
+    return {
+        'seconds': raw_seconds,
+        'objects_rows_per_s': int(rows / objects_seconds),
+        'raw_rows_per_s': int(rows / raw_seconds),
+    }
+
+
+@benchmark
+def object_instantiation():
+    """AbstractObject: instantiating Ad, AdSet and AdsInsights objects then
+    setting the data of a typical response row."""
+    rows = {
+        Ad: {
+            'id': '6000000000001',
+            'name': 'Ad 1',
+            'status': 'ACTIVE',
+            'effective_status': 'ACTIVE',
+            'bid_amount': '150',
+            'adlabels': [{'id': '1', 'name': 'label'}],
+            'created_time': '2020-06-01T00:00:00+0000',
+        },
+        AdSet: {
+            'id': '6000000000002',
+            'name': 'AdSet 1',
+            'status': 'PAUSED',
+            'billing_event': 'IMPRESSIONS',
+            'daily_budget': '1000',
+            'is_dynamic_creative': 'false',
+            'targeting': {'geo_locations': {'countries': ['US']}},
+        },
+        AdsInsights: {
+            'account_id': '1234567890',
+            'impressions': '1000',
+            'clicks': '10',
+            'spend': '12.34',
+            'date_start': '2020-06-01',
+            'actions': [{'action_type': 'link_click', 'value': '10'}],
+        },
+    }
+    metrics = {}
+    for target_class, row in sorted(rows.items(), key=lambda i: i[0].__name__):
+        def operation():
+            target_class()._set_data(row)
+
+        metrics[target_class.__name__ + '_us'] = '%.1f' % (
+            best_time(operation, number=200) * 1e6)
+    metrics['seconds'] = best_time(
+        lambda: [target_class()._set_data(row)
+                 for target_class, row in rows.items()],
+        number=200,
+    )
+    return metrics
+
+
+@benchmark
+def nested_objects():
+    """AbstractObject: setting the data of an AdCreative with an
+    object_story_spec and of an AdSet with a targeting, both deserialized
+    into nested objects."""
+    creative = {
+        'id': '6000000000003',
+        'object_story_spec': {
+            'page_id': '1234567890',
+            'link_data': {
+                'link': 'https://www.example.com',
+                'message': 'Message',
+                'call_to_action': {
+                    'type': 'LEARN_MORE',
+                    'value': {'link': 'https://www.example.com'},
+                },
+                'child_attachments': [
+                    {'link': 'https://www.example.com/1', 'name': 'One'},
+                    {'link': 'https://www.example.com/2', 'name': 'Two'},
+                ],
+            },
+        },
+    }
+    ad_set = {
+        'id': '6000000000002',
+        'targeting': {
+            'age_min': 18,
+            'geo_locations': {'countries': ['US'], 'location_types': ['home']},
+            'flexible_spec': [{'interests': [{'id': '1', 'name': 'Sports'}]}],
+        },
+    }
+
+    def operation():
+        AdCreative()._set_data(creative)
+        AdSet()._set_data(ad_set)
+
+    operation()
+    with count_imports() as calls:
+        operation()
+    return {
+        'seconds': best_time(operation, number=200),
+        'import_module_calls': len(calls),
+    }
+
+
+@benchmark
+def batch_encoding():
+    """FacebookAdsApiBatch: adding 50 ad set updates with a large targeting
+    to a batch, encoding each call."""
+    fb_api = api.FacebookAdsApi(session.FacebookSession(access_token='token'))
+    targeting = large_targeting()
+    requests = [
+        AdSet(str(6000000000000 + i), api=fb_api).api_update(
+            params={
+                'name': 'AdSet %d' % i,
+                'status': AdSet.Status.paused,
+                'daily_budget': 1000,
+                'targeting': targeting,
+            },
+            pending=True,
+        )
+        for i in range(50)
+    ]
+
+    def operation():
+        batch = fb_api.new_batch()
+        for request in requests:
+            batch.add_request(request)
+
+    seconds = best_time(operation, number=20)
+    return {
+        'seconds': seconds,
+        'calls_per_s': int(len(requests) / seconds),
+    }
+
+
+@benchmark
+def quote_short_values():
+    """urls.quote_with_encoding: quoting the short values which most params
+    hold, ids, field names and small JSON lists."""
+    values = [
+        '6000000000001',
+        23843000000000,
+        'name',
+        'effective_status',
+        'act_1234567890',
+        '["ACTIVE","PAUSED"]',
+        'id,name,status',
+        'AdSet 1',
+    ] * 25
+
+    def operation():
+        for value in values:
+            urls.quote_with_encoding(value)
+
+    seconds = best_time(operation, number=200)
+    return {
+        'seconds': seconds,
+        'us_per_value': '%.2f' % (seconds / len(values) * 1e6),
+    }
+
+
+@benchmark
+def param_encoding():
+    """FacebookAdsApi: JSON encoding of the top level params of an ad set
+    creation, as done by every call."""
+    params = {
+        'name': 'AdSet 1',
+        'campaign_id': '6000000000001',
+        'status': AdSet.Status.paused,
+        'daily_budget': 1000,
+        'billing_event': AdSet.BillingEvent.impressions,
+        'optimization_goal': AdSet.OptimizationGoal.reach,
+        'targeting': large_targeting(),
+        'promoted_object': {'page_id': '1234567890'},
+        'is_dynamic_creative': False,
+    }
+
+    def operation():
+        api._top_level_param_json_encode(params)
+
+    return {'seconds': best_time(operation, number=200)}
+
+
+@benchmark
+def object_parser():
+    """ObjectParser.parse_multiple: building the objects of a decoded
+    3000 rows page of AdsInsights, then of Ad."""
+    rows = 3000
+    insights = json.loads(insights_page(rows))
+    ads = {'data': [
+        {
+            'id': str(6000000000000 + index),
+            'name': 'Ad %d' % index,
+            'status': 'ACTIVE',
+            'adset_id': '6000000000002',
+            'created_time': '2020-06-01T00:00:00+0000',
+        }
+        for index in range(rows)
+    ]}
+    insights_parser = ObjectParser(target_class=AdsInsights)
+    ad_parser = ObjectParser(target_class=Ad)
+    insights_seconds = best_time(
+        lambda: insights_parser.parse_multiple(insights),
+        repeat=3,
+        number=1,
+    )
+    ad_seconds = best_time(
+        lambda: ad_parser.parse_multiple(ads),
+        repeat=3,
+        number=1,
+    )
+    return {
+        'seconds': insights_seconds,
+        'insights_rows_per_s': int(rows / insights_seconds),
+        'ad_rows_per_s': int(rows / ad_seconds),
+    }
+
+
+@benchmark
+def typechecker_nested():
+    """TypeChecker.get_typed_value: converting a large ad set targeting
+    into nested objects."""
+    checker = AdSet._get_field_checker()
+    targeting = large_targeting()
+
+    def operation():
+        checker.get_typed_value('targeting', targeting)
+
+    return {'seconds': best_time(operation, number=100)}
+
+
+@benchmark
+def export_all_data():
+    """AbstractObject.export_all_data: exporting an ad set with a large
+    targeting held in nested objects."""
+    ad_set = AdSet('6000000000002')
+    ad_set._set_data({
+        'name': 'AdSet 1',
+        'status': 'PAUSED',
+        'daily_budget': '1000',
+        'targeting': large_targeting(),
+    })
+
+    def operation():
+        ad_set.export_all_data()
+
+    return {'seconds': best_time(operation, number=100)}
+
+
+@benchmark
+def custom_audience_hashing():
+    """CustomAudience.format_params: normalizing and hashing 10k emails."""
+    users = [' User.%d@Example.com ' % index for index in range(10000)]
+
+    def operation():
+        CustomAudience.format_params(CustomAudience.Schema.email_hash, users)
+
+    seconds = best_time(operation, repeat=3, number=1)
+    return {
+        'seconds': seconds,
+        'users_per_s': int(len(users) / seconds),
+    }
+
+
+@benchmark
+def user_data_normalize():
+    """UserData.normalize: normalizing and hashing the customer
+    information of a Conversions API event."""
+    user_data = UserData(
+        email='Joe.Smith@Example.com',
+        phone='+1 (650) 555-1212',
+        first_name='Joe',
+        last_name='Smith',
+        city='Menlo Park',
+        state='CA',
+        zip_code='94025',
+        country_code='US',
+        date_of_birth='19900101',
+        client_ip_address='192.0.2.1',
+        client_user_agent='Mozilla/5.0',
+        fbc='fb.1.1554763741205.AbCdEfGhIjKlMnOpQrStUvWxYz1234567890',
+        fbp='fb.1.1558571054389.1098115397',
+    )
+
+    def operation():
+        user_data.normalize()
+
+    return {'seconds': best_time(operation, number=1000)}
+
+
+class InProcessTransport(transport.Transport):
+    """Answers every request with the same body, without any network."""
+
+    def __init__(self, session, body='{"id": "1", "name": "Ad 1"}'):
+        self._response = transport.TransportResponse(200, {}, body)
+
+    def send(self, method, url, **kwargs):
+        return self._response
+
+
+@benchmark
+def api_call():
+    """FacebookAdsApi.call: the SDK overhead of a GET and of a POST, sent
+    through an in-process transport."""
+    fb_session = session.FacebookSession(
+        access_token='token',
+        transport=InProcessTransport,
+    )
+    fb_api = api.FacebookAdsApi(fb_session)
+    params = {'fields': ['id', 'name'], 'limit': 25}
+
+    def get():
+        fb_api.call('GET', ('6000000000001',), params=params)
+
+    def post():
+        fb_api.call('POST', ('act_1', 'ads'), params={
+            'name': 'Ad 1',
+            'status': 'PAUSED',
+            'creative': {'creative_id': '1'},
+        })
+
+    return {
+        'seconds': best_time(get, number=1000),
+        'post_us': '%.1f' % (best_time(post, number=1000) * 1e6),
+    }
+
+
+class _KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers every GET with a small Graph node after 5ms, keeping the
+    connection open."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(0.005)
+        payload = b'{"id": "1"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CountingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Local Graph stand-in counting the connections it accepts."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(
+            self,
+            ('127.0.0.1', 0),
+            _KeepAliveHandler,
+        )
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return BaseHTTPServer.HTTPServer.get_request(self)
+
+
+@benchmark
+def connection_pool():
+    """FacebookSession: 32 threads making 25 calls each through one api to a
+    local server, with the default pool of 10 connections then with a pool
+    of 32."""
+    threads = 32
+    calls = 25
+    server = _CountingServer()
+    server_thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs={'poll_interval': 0.05},
+    )
+    server_thread.daemon = True
+    server_thread.start()
+
+    def crawl(pool_maxsize):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            pool_maxsize=pool_maxsize,
+        )
+        fb_session.GRAPH = 'http://%s:%s' % server.server_address
+        fb_api = api.FacebookAdsApi(fb_session)
+
+        def worker(index):
+            for call in range(calls):
+                fb_api.call('GET', ('1',))
+                # Uneven processing, leaving connections idle
+                time.sleep(0.002 * ((index + call) % 5))
+
+        workers = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(threads)
+        ]
+        server.connections = 0
+        start = time.time()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        fb_session.requests.close()
+        return time.time() - start, server.connections
+
+    try:
+        default_seconds, default_connections = crawl(10)
+        seconds, connections = crawl(threads)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        'seconds': seconds / (threads * calls),
+        'default_pool_ms': '%.3f' % (
+            default_seconds / (threads * calls) * 1000),
+        'default_pool_connections': default_connections,
+        'connections': connections,
+    }
+
+
+class _LatencyTransport(transport.Transport):
+    """Answers every call, or every call of a batch, with a success after
+    20ms, like a remote Graph API would."""
+
+    def __init__(self, session):
+        pass
+
+    def send(self, method, url, data=None, **kwargs):
+        time.sleep(0.02)
+        if data and 'batch' in data:
+            body = json.dumps(
+                [{'code': 200, 'body': '{"success": true}'}] *
+                len(json.loads(data['batch'])),
+            )
+        else:
+            body = '{"success": true}'
+        return transport.TransportResponse(200, {}, body)
+
+
+@benchmark
+def batch_executor():
+    """BatchExecutor: pausing 1000 ads with 4 workers, compared to single
+    calls, to batches executed one after the other and to auto batching,
+    with 20ms of latency per http request."""
+    ads = 1000
+    fb_session = session.FacebookSession(
+        access_token='token',
+        transport=_LatencyTransport,
+    )
+    fb_api = api.FacebookAdsApi(fb_session)
+
+    def pause_requests(count):
+        return (
+            Ad(str(6000000000000 + index), api=fb_api).api_update(
+                params={'status': Ad.Status.paused},
+                pending=True,
+            )
+            for index in range(count)
+        )
+
+    def single_calls():
+        for request in pause_requests(25):
+            request.execute()
+
+    def sequential_batches():
+        for _ in BatchExecutor(fb_api, max_workers=1).execute(
+                pause_requests(ads)):
+            pass
+
+    def auto_batch():
+        with fb_api.auto_batch():
+            for request in pause_requests(ads):
+                request.execute()
+
+    def executor():
+        for _ in BatchExecutor(fb_api, max_workers=4).execute(
+                pause_requests(ads)):
+            pass
+
+    return {
+        'seconds': best_time(executor, repeat=3, number=1) / ads,
+        'single_calls_ms': '%.3f' % (
+            best_time(single_calls, repeat=1, number=1) / 25 * 1000),
+        'sequential_batches_ms': '%.3f' % (
+            best_time(sequential_batches, repeat=3, number=1) / ads * 1000),
+        'auto_batch_ms': '%.3f' % (
+            best_time(auto_batch, repeat=3, number=1) / ads * 1000),
+    }
+
+
+class _OverloadedTransport(transport.Transport):
+    """Answers batches of up to 20 calls after 20ms, and times out on larger
+    batches after 50ms, leaving the responses to their calls empty as the
+    Graph API does."""
+
+    def __init__(self, session):
+        self.batch_calls = 0
+
+    def send(self, method, url, data=None, **kwargs):
+        self.batch_calls += 1
+        calls = len(json.loads(data['batch']))
+        if calls > 20:
+            time.sleep(0.05)
+            body = json.dumps([None] * calls)
+        else:
+            time.sleep(0.02)
+            body = json.dumps(
+                [{'code': 200, 'body': '{"success": true}'}] * calls,
+            )
+        return transport.TransportResponse(200, {}, body)
+
+
+@benchmark
+def adaptive_batch_size():
+    """BatchExecutor: pausing 300 ads through batches timing out past 20
+    calls, with a fixed batch size of 50 then in adaptive mode."""
+    ads = 300
+
+    def pause(adaptive):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=_OverloadedTransport,
+        )
+        fb_api = api.FacebookAdsApi(fb_session)
+        executor = BatchExecutor(
+            fb_api,
+            max_workers=1,
+            retry_policy=RetryPolicy(max_attempts=5, backoff_base=0),
+            adaptive=adaptive,
+        )
+        requests = (
+            Ad(str(6000000000000 + index), api=fb_api).api_update(
+                params={'status': Ad.Status.paused},
+                pending=True,
+            )
+            for index in range(ads)
+        )
+        start = time.time()
+        failures = sum(
+            not result.is_success() for result in executor.execute(requests)
+        )
+        return (
+            time.time() - start,
+            fb_session.transport.batch_calls,
+            failures,
+        )
+
+    fixed_seconds, fixed_batch_calls, fixed_failures = pause(False)
+    seconds, batch_calls, failures = pause(True)
+    return {
+        'seconds': seconds / ads,
+        'fixed_ms': '%.3f' % (fixed_seconds / ads * 1000),
+        'fixed_batch_calls': fixed_batch_calls,
+        'fixed_failures': fixed_failures,
+        'batch_calls': batch_calls,
+        'failures': failures,
+    }
+
+
+@benchmark
+def batch_execute():
+    """FacebookAdsApiBatch.execute: a batch of 50 node reads sent to a
+    local Graph API stand-in, down to their parsed objects."""
+    with GraphServer() as server:
+        fb_api = api.FacebookAdsApi(server.create_session())
+
+        def operation():
+            batch = fb_api.new_batch()
+            futures = [
+                batch.add_request(
+                    Ad(str(6000000000000 + index), api=fb_api).api_get(
+                        fields=[Ad.Field.name, Ad.Field.status],
+                        pending=True,
+                    ),
+                )
+                for index in range(50)
+            ]
+            batch.execute()
+            for future in futures:
+                future.result()
+
+        seconds = best_time(operation, repeat=3, number=5)
+    return {
+        'seconds': seconds,
+        'calls_per_s': int(50 / seconds),
+    }
+
+
+@benchmark
+def cursor_local_server():
+    """Cursor: iterating over 10k ads served in pages of 500 by a local
+    Graph API stand-in."""
+    rows = 10000
+    with GraphServer(edge_size=rows) as server:
+        fb_api = api.FacebookAdsApi(server.create_session())
+
+        def operation():
+            cursor = api.Cursor(
+                target_objects_class=Ad,
+                fields=[Ad.Field.name, Ad.Field.status],
+                params={'limit': 500},
+                api=fb_api,
+                node_id='act_1',
+                endpoint='ads',
+            )
+            for _ in cursor:
+                pass
+
+        seconds = best_time(operation, repeat=3, number=1)
+    return {
+        'seconds': seconds,
+        'rows_per_s': int(rows / seconds),
+    }
+
+
+@benchmark
+def video_upload():
+    """VideoUploader: chunked upload of an 8MB video in 1MB chunks to a
+    local Graph API stand-in."""
+    size = 8 * 1024 * 1024
+    directory = tempfile.mkdtemp()
+    filepath = os.path.join(directory, 'video.mp4')
+    with open(filepath, 'wb') as video_file:
+        video_file.write(b'\0' * size)
+    # VideoUploader logs the deprecation of parent ids
+    logging.disable(logging.WARNING)
+    try:
+        with GraphServer(video_chunk_size=1024 * 1024) as server:
+            fb_api = api.FacebookAdsApi(server.create_session())
+
+            def operation():
+                video = AdVideo(api=fb_api)
+                video._parent_id = 'act_1'
+                video[AdVideo.Field.filepath] = filepath
+                VideoUploader().upload(video)
+
+            seconds = best_time(operation, repeat=3, number=1)
+    finally:
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(directory)
+    return {
+        'seconds': seconds,
+        'mb_per_s': '%.1f' % (size / seconds / 1024 / 1024),
+    }
+
+
+def get_host():
+    return '%s %s %s %s' % (
+        platform.node(),
+        platform.machine(),
+        platform.python_implementation(),
+        platform.python_version(),
+    )
+
+
+def load_baseline(path):
+    with open(path, 'r') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as baseline_file:
+        json.dump(
+            {
+                'host': get_host(),
+                'python': platform.python_version(),
+                'seconds': results,
+            },
+            baseline_file,
+            indent=1,
+            sort_keys=True,
+        )
+        baseline_file.write('\n')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m facebook_business.test.benchmark',
+    )
+    parser.add_argument('names', nargs='*', metavar='benchmark_name')
+    parser.add_argument('--save', metavar='PATH',
+                        help='save the results to a baseline file')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare the results to a baseline file')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='slowdown ratio over a baseline saved on '
+                             'this host failing --compare (default: 1.5)')
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.compare) if args.compare else {}
+    # Timings saved on another host or Python aren't comparable: report the
+    # slowdowns but only fail on the ones over a baseline saved here.
+    strict = baseline.get('host') == get_host()
+    if args.compare and not strict:
+        print('The baseline was not saved on this host and Python, the '
+              'slowdowns are only reported.')
+    baseline = baseline.get('seconds', {})
+    selected = [func for func in BENCHMARKS
+                if not args.names or func.__name__ in args.names]
+    results = {}
+    regressions = []
+    for func in selected:
+        metrics = func()
+        seconds = results[func.__name__] = metrics.pop('seconds')
+        if func.__name__ in baseline:
+            ratio = seconds / baseline[func.__name__]
+            metrics['vs_baseline'] = 'x%.2f' % ratio
+            if ratio > args.tolerance:
+                regressions.append(func.__name__)
+        print('%-28s %12.3f ms/op  %s' % (
+            func.__name__,
+            seconds * 1000,
+            '  '.join('%s=%s' % item for item in sorted(metrics.items())),
+        ))
+
+    if args.save:
+        save_baseline(args.save, results)
+    if regressions:
+        print('Slower than the baseline by more than x%.2f: %s' % (
+            args.tolerance, ', '.join(regressions)))
+        if strict:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,407 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+'''
+Local stand-in for the Graph API, serving synthetic responses so that the
+SDK can be tested, benchmarked and load tested without an access token or
+network access.
+
+It serves:
+    GET /<id>: a node with the requested fields. Their status is ACTIVE,
+        valid for ads, ad sets, campaigns and creatives, or the video_status
+        of the videos uploaded to the server.
+    GET /<id>/insights: pages of insights rows.
+    GET /<id>/<edge>: pages of objects with the requested fields, and their
+        total_count in the summary.
+    POST / with a batch param: the responses of each call of the batch.
+    POST /<id>/advideos: the start, transfer and finish phases of chunked
+        video uploads, as driven by VideoUploader.
+    POST /<id>: {"success": true}, POST /<id>/<edge>: a new object id,
+    DELETE /<id>: {"success": true}.
+
+Example:
+    >>> with GraphServer(latency=0.02) as server:
+    ...     api = FacebookAdsApi(server.create_session())
+    ...     for ad in AdAccount('act_1', api=api).get_ads(fields=['name']):
+    ...         print(ad['name'])
+'''
+
+import json
+import re
+import threading
+import time
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves import urllib
+
+from facebook_business import session
+from facebook_business import transport
+
+
+class GraphServer(object):
+
+    """Serves the synthetic Graph API on a local port, from a background
+    thread, until stop() is called."""
+
+    def __init__(
+        self,
+        latency=0,
+        edge_size=1000,
+        page_size=25,
+        video_chunk_size=1024 * 1024,
+        record=False,
+    ):
+        """Initializes the server.
+        Args:
+            latency (optional): The delay, in seconds, of each response,
+                batch calls included.
+            edge_size (optional): The number of objects of every edge.
+            page_size (optional): The default number of objects per page,
+                the limit param of the calls taking precedence.
+            video_chunk_size (optional): The size of the video chunks asked
+                for in the transfer phase.
+            record (optional): Whether to keep the (method, path, params) of
+                the requests in received, batches counting as one request.
+        """
+        self.latency = latency
+        self.edge_size = edge_size
+        self.page_size = page_size
+        self.video_chunk_size = video_chunk_size
+        self.record = record
+        self.requests = 0
+        self.received_bytes = 0
+        self.received = []
+        self._upload_sessions = {}
+        self._video_ids = set()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        return 'http://%s:%s' % self._server.server_address
+
+    def start(self):
+        self._server = _ThreadingServer(self)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.05},
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def create_session(self, **kwargs):
+        """Returns a FacebookSession whose calls, video uploads included, go
+        to this server. kwargs are passed to FacebookSession, a transport
+        among them having to send its requests with self.transport."""
+        kwargs.setdefault('access_token', 'token')
+        kwargs.setdefault('transport', self.transport)
+        return session.FacebookSession(**kwargs)
+
+    def transport(self, fb_session):
+        """Transport factory sending the requests of fb_session to this
+        server."""
+        return _LocalTransport(fb_session, self.url)
+
+    def respond(self, method, path, params):
+        """Returns the (http status, JSON body) of a call.
+        Args:
+            method: The HTTP method name.
+            path: The path of the call, with or without API version.
+            params: A mapping of the query string and form params to their
+                values.
+        """
+        tokens = [token for token in path.split('/') if token]
+        if tokens and re.match(r'^v[0-9]+\.[0-9]+$', tokens[0]):
+            tokens = tokens[1:]
+        if method == 'POST' and not tokens and 'batch' in params:
+            return 200, self._respond_batch(json.loads(params['batch']))
+        if not tokens or len(tokens) > 2:
+            return 400, _error('Unknown path', 100)
+        node_id = tokens[0]
+        edge = tokens[1] if len(tokens) > 1 else None
+
+        if method == 'GET':
+            if edge is None:
+                return 200, self._get_node(node_id, params)
+            return 200, self._get_edge(path, edge, params)
+        if method == 'DELETE' and edge is None:
+            return 200, {'success': True}
+        if method == 'POST':
+            if edge == 'advideos' and 'upload_phase' in params:
+                return self._upload_video(node_id, params)
+            if edge is None:
+                return 200, {'success': True}
+            with self._lock:
+                self._created += 1
+                new_id = str(7000000000000 + self._created)
+            return 200, {'id': new_id}
+        return 400, _error('Unsupported method', 100)
+
+    def _get_node(self, node_id, params):
+        node = {'id': node_id}
+        for field in _get_fields(params):
+            if field == 'status':
+                node[field] = _get_status(node_id in self._video_ids)
+            elif field != 'id':
+                node[field] = '%s of %s' % (field, node_id)
+        return node
+
+    def _get_edge(self, path, edge, params):
+        limit = int(params.get('limit') or self.page_size)
+        offset = int(params.get('after') or 0)
+        end = min(offset + limit, self.edge_size)
+        if edge == 'insights':
+            rows = [_insights_row(index) for index in range(offset, end)]
+        else:
+            fields = _get_fields(params)
+            rows = []
+            for index in range(offset, end):
+                row = {'id': str(6000000000000 + index)}
+                for field in fields:
+                    if field == 'status':
+                        row[field] = _get_status(edge == 'advideos')
+                    elif field != 'id':
+                        row[field] = '%s %d' % (field, index)
+                rows.append(row)
+        body = {
+            'data': rows,
+            'paging': {'cursors': {'before': str(offset), 'after': str(end)}},
+        }
+        if end < self.edge_size:
+            # Like the Graph API, the next page URL holds the params of the
+            # call, access token included
+            query = dict(params)
+            query.update({'limit': limit, 'after': end})
+            body['paging']['next'] = '%s/%s?%s' % (
+                self.url,
+                path.lstrip('/'),
+                urllib.parse.urlencode(sorted(query.items())),
+            )
+        if 'summary' in params:
+            body['summary'] = {'total_count': self.edge_size}
+        return body
+
+    def _respond_batch(self, calls):
+        responses = []
+        for call in calls:
+            relative_url = call['relative_url']
+            path, _, query = relative_url.partition('?')
+            params = _parse_query(query)
+            params.update(_parse_query(call.get('body', '')))
+            status, body = self.respond(call['method'], path, params)
+            responses.append({
+                'code': status,
+                'headers': [
+                    {'name': 'Content-Type', 'value': 'application/json'},
+                ],
+                'body': json.dumps(body),
+            })
+        return responses
+
+    def _upload_video(self, account_id, params):
+        phase = params['upload_phase']
+        if phase == 'start':
+            file_size = int(params['file_size'])
+            with self._lock:
+                session_id = str(len(self._upload_sessions) + 1)
+                self._upload_sessions[session_id] = file_size
+                video_id = str(8000000000000 + int(session_id))
+                self._video_ids.add(video_id)
+            return 200, {
+                'upload_session_id': session_id,
+                'video_id': video_id,
+                'start_offset': '0',
+                'end_offset': str(min(self.video_chunk_size, file_size)),
+            }
+        file_size = self._upload_sessions.get(params.get('upload_session_id'))
+        if file_size is None:
+            return 400, _error('Invalid upload session', 6000)
+        if phase == 'transfer':
+            start = min(
+                int(params['start_offset']) + self.video_chunk_size,
+                file_size,
+            )
+            return 200, {
+                'start_offset': str(start),
+                'end_offset': str(min(start + self.video_chunk_size,
+                                      file_size)),
+            }
+        if phase == 'finish':
+            return 200, {'success': True}
+        return 400, _error('Invalid upload phase', 100)
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written separately, which would otherwise
+    # wait for the delayed ACK of the client on kept alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self._respond()
+
+    def do_DELETE(self):
+        self._respond()
+
+    def _respond(self):
+        graph = self.server.graph
+        path, _, query = self.path.partition('?')
+        params = _parse_query(query)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        content_type = self.headers.get('Content-Type') or ''
+        if content_type.startswith('multipart/form-data'):
+            params.update(_parse_multipart(body, content_type))
+        elif body:
+            params.update(_parse_query(body.decode('utf-8')))
+        with graph._lock:
+            graph.requests += 1
+            graph.received_bytes += len(body)
+            if graph.record:
+                graph.received.append((self.command, path, params))
+        if graph.latency:
+            time.sleep(graph.latency)
+
+        status, response = graph.respond(self.command, path, params)
+        payload = json.dumps(response).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, graph):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        self.graph = graph
+
+
+class _LocalTransport(transport.RequestsTransport):
+    """RequestsTransport sending the calls to the Graph API hosts to a local
+    server."""
+
+    def __init__(self, fb_session, url):
+        super(_LocalTransport, self).__init__(fb_session)
+        self._hosts = (
+            session.FacebookSession.GRAPH,
+            session.FacebookSession.GRAPH_VIDEO,
+            fb_session.GRAPH,
+        )
+        self._url = url
+
+    def send(self, method, url, **kwargs):
+        for host in self._hosts:
+            if url.startswith(host):
+                url = self._url + url[len(host):]
+                break
+        return super(_LocalTransport, self).send(method, url, **kwargs)
+
+
+def _get_status(video):
+    if video:
+        return {'video_status': 'ready'}
+    return 'ACTIVE'
+
+
+def _parse_query(query):
+    return dict(
+        (key, values[-1])
+        for key, values in urllib.parse.parse_qs(query).items()
+    )
+
+
+def _parse_multipart(body, content_type):
+    """Returns the fields of a multipart form, files standing for their
+    size."""
+    boundary = content_type.split('boundary=')[-1].strip('"')
+    fields = {}
+    for part in body.split(b'--' + boundary.encode('utf-8')):
+        headers, _, value = part.partition(b'\r\n\r\n')
+        match = re.search(br'name="([^"]*)"', headers)
+        if match is None:
+            continue
+        name = match.group(1).decode('utf-8')
+        value = value[:-2] if value.endswith(b'\r\n') else value
+        if b'filename=' in headers:
+            fields[name] = len(value)
+        else:
+            fields[name] = value.decode('utf-8')
+    return fields
+
+
+def _get_fields(params):
+    fields = params.get('fields') or ''
+    if fields.startswith('['):
+        return json.loads(fields)
+    return [field for field in fields.split(',') if field]
+
+
+def _insights_row(index):
+    return {
+        'account_id': '1234567890',
+        'campaign_id': str(6000000000 + index),
+        'date_start': '2020-06-01',
+        'date_stop': '2020-06-01',
+        'impressions': str(index * 13),
+        'clicks': str(index),
+        'spend': '%d.%02d' % (index, index % 100),
+        'actions': [
+            {'action_type': 'link_click', 'value': str(index)},
+            {'action_type': 'post_engagement', 'value': str(index)},
+        ],
+    }
+
+
+def _error(message, code):
+    return {'error': {
+        'message': message,
+        'code': code,
+        'type': 'OAuthException',
+    }}
+
+
+__all__ = ['GraphServer']
@@ -31,6 +31,15 @@ import inspect
 import six
 import re
 import hashlib
+import os
+import socket
+import ssl
+import requests
+import shutil
+import tempfile
+import threading
+import time
+import warnings
 from six.moves import urllib
 from sys import version_info
 from .. import api
@@ -39,15 +48,43 @@ from .. import exceptions
 from .. import session
 from .. import utils
 from facebook_business import apiconfig
+from facebook_business.batchexecutor import BatchExecutor, BatchResult
+from facebook_business.hooks import RequestHook
+from facebook_business.httpcache import DiskStorage, ETagCache, MemoryStorage
+from facebook_business.metrics import MetricsCollector, get_endpoint_name
+from facebook_business.objectcache import ObjectCache
+from facebook_business.test.graphserver import GraphServer
+from facebook_business.video_uploader import VideoUploader
+from facebook_business.retry import RetryPolicy
+from facebook_business.throttler import Throttler
+from facebook_business import transport
 from facebook_business.adobjects import (
     abstractcrudobject,
     ad,
     adaccount,
     adcreative,
+    adset,
+    advideo,
     customaudience,
+    objectparser,
     productcatalog
 )
-from facebook_business.utils import version
+from facebook_business import typechecker
+from facebook_business.typechecker import TypeChecker
+from facebook_business.utils import jsoncodec, version
+
+try:
+    from facebook_business import asyncapi
+    # Run with the tests below
+    from facebook_business.test.unit_async import AsyncCoroutinesTestCase
+except (ImportError, SyntaxError):
+    # aiohttp is missing or the interpreter lacks async/await support.
+    asyncapi = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 
 class CustomAudienceTestCase(unittest.TestCase):
@@ -222,6 +259,127 @@ class EdgeIteratorTestCase(unittest.TestCase):
         assert len(obj) == 1 and obj[0]['account_id'] == 'act_345'
 
 
+class CursorPagingTestCase(unittest.TestCase):
+
+    class PagesApi(object):
+        """Serves pages of ids, the last page has no paging.next."""
+
+        def __init__(self, pages, fail_on_page=None):
+            self.pages = pages
+            self.fail_on_page = fail_on_page
+            self.threads = []
+
+        def call(self, method, path, params=None):
+            self.threads.append(threading.current_thread())
+            if isinstance(path, tuple):
+                index = 0
+            else:
+                index = int(path.rsplit('=', 1)[1])
+            if index == self.fail_on_page:
+                raise exceptions.FacebookRequestError(
+                    'Call was not successful', {}, 500, {}, '{}',
+                )
+            body = {'data': [{'id': fbid} for fbid in self.pages[index]]}
+            if index + 1 < len(self.pages):
+                body['paging'] = {'next': 'https://next?page=%d' % (index + 1)}
+            return api.FacebookResponse(http_status=200, body=json.dumps(body))
+
+    def cursor(self, fake_api, prefetch=False):
+        return api.Cursor(
+            target_objects_class=ad.Ad,
+            api=fake_api,
+            node_id='act_1',
+            endpoint='ads',
+            prefetch=prefetch,
+        )
+
+    def test_iterates_over_pages(self):
+        fake_api = self.PagesApi([['1', '2'], ['3'], ['4', '5']])
+        ids = [obj['id'] for obj in self.cursor(fake_api)]
+        self.assertEqual(ids, ['1', '2', '3', '4', '5'])
+        self.assertEqual(len(fake_api.threads), 3)
+
+    def test_queue_access(self):
+        cursor = self.cursor(self.PagesApi([['1', '2', '3']]))
+        cursor.load_next_page()
+        self.assertEqual(len(cursor), 3)
+        self.assertEqual(cursor[0]['id'], '1')
+        self.assertEqual([obj['id'] for obj in cursor[1:]], ['2', '3'])
+        next(cursor)
+        self.assertEqual(cursor[0]['id'], '2')
+
+    def test_prefetch(self):
+        fake_api = self.PagesApi([['1', '2'], ['3'], ['4', '5']])
+        cursor = self.cursor(fake_api, prefetch=True)
+        ids = [obj['id'] for obj in cursor]
+        self.assertEqual(ids, ['1', '2', '3', '4', '5'])
+        self.assertEqual(len(fake_api.threads), 3)
+        self.assertIs(fake_api.threads[0], threading.current_thread())
+        for thread in fake_api.threads[1:]:
+            self.assertIsNot(thread, threading.current_thread())
+
+    def test_set_prefetch_on_loaded_cursor(self):
+        fake_api = self.PagesApi([['1'], ['2']])
+        cursor = self.cursor(fake_api)
+        cursor.load_next_page()
+        cursor.set_prefetch()
+        self.assertEqual([obj['id'] for obj in cursor], ['1', '2'])
+        self.assertIsNot(fake_api.threads[1], threading.current_thread())
+
+    def test_raw(self):
+        fake_api = self.PagesApi([['1', '2'], ['3']])
+        cursor = api.Cursor(
+            target_objects_class=ad.Ad,
+            api=fake_api,
+            node_id='act_1',
+            endpoint='ads',
+            raw=True,
+        )
+        self.assertEqual(list(cursor), [{'id': '1'}, {'id': '2'}, {'id': '3'}])
+
+    def test_raw_edge_request(self):
+        fake_api = self.PagesApi([['1', '2']])
+        request = api.FacebookRequest(
+            node_id='act_1',
+            method='GET',
+            endpoint='/ads',
+            api=fake_api,
+            target_class=ad.Ad,
+            api_type='EDGE',
+        )
+        cursor = request.execute(raw=True)
+        self.assertEqual(list(cursor), [{'id': '1'}, {'id': '2'}])
+
+    def test_prefetch_error_is_raised_when_page_is_needed(self):
+        fake_api = self.PagesApi([['1'], ['2']], fail_on_page=1)
+        cursor = self.cursor(fake_api, prefetch=True)
+        self.assertEqual(next(cursor)['id'], '1')
+        self.assertRaises(exceptions.FacebookRequestError, next, cursor)
+
+    def test_prefetch_error_is_retried(self):
+        fake_api = self.PagesApi([['1'], ['2'], ['3']], fail_on_page=1)
+        cursor = self.cursor(fake_api, prefetch=True)
+        self.assertEqual(next(cursor)['id'], '1')
+        self.assertRaises(exceptions.FacebookRequestError, next, cursor)
+        fake_api.fail_on_page = None
+        self.assertEqual([obj['id'] for obj in cursor], ['2', '3'])
+
+
+class ObjectParserTestCase(unittest.TestCase):
+
+    def test_parse_multiple_raw(self):
+        parser = objectparser.ObjectParser(target_class=ad.Ad)
+        rows = [{'id': '1', 'name': 'foo'}, {'id': '2'}]
+        self.assertIs(parser.parse_multiple({'data': rows}, raw=True), rows)
+        self.assertEqual(
+            parser.parse_multiple({'data': {'id': '1'}}, raw=True),
+            [{'id': '1'}],
+        )
+        objs = parser.parse_multiple({'data': rows})
+        self.assertIsInstance(objs[0], ad.Ad)
+        self.assertEqual(objs[0]['name'], 'foo')
+
+
 class AbstractCrudObjectTestCase(unittest.TestCase):
     def test_all_aco_has_id_field(self):
         # Some objects do not have FBIDs or don't need checking (ACO)
@@ -347,6 +505,98 @@ class AbstractObjectTestCase(unittest.TestCase):
         except TypeError as e:
             self.fail('Cannot call __repr__ on AbstractObject\n %s' % e)
 
+    def test_field_checker_is_shared_per_class(self):
+        checker = ad.Ad()._field_checker
+        assert ad.Ad()._field_checker is checker
+        assert adset.AdSet()._field_checker is not checker
+        assert ad.Ad._get_field_checker() is checker
+
+    def test_field_enums_leave_out_class_attributes(self):
+        checker = ad.Ad._get_field_checker()
+        assert checker.is_type('Status', ad.Ad.Status.active)
+        assert not checker.is_type('Status', ad.Ad.__module__)
+        assert not checker.is_type('Status', ['ACTIVE'])
+
+    def test_set_data_coerces_fields(self):
+        obj = ad.Ad()
+        obj._set_data({
+            'targeting': {'age_min': 18},
+            'adlabels': [{'id': '1', 'name': 'label'}],
+        })
+        assert obj['targeting'].__class__.__name__ == 'Targeting'
+        assert obj['targeting']['age_min'] == 18
+        assert obj['adlabels'] == [{'id': '1', 'name': 'label'}]
+
+
+class TypeCheckerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.checker = TypeChecker(
+            {
+                'count': 'int',
+                'ratio': 'float',
+                'enabled': 'bool',
+                'ids': 'list<string>',
+                'scores': 'map<string, int>',
+                'weights': 'map<float>',
+                'status': 'Status',
+            },
+            {'Status': ['ACTIVE', 'PAUSED']},
+        )
+
+    def test_get_typed_value(self):
+        assert self.checker.get_typed_value('count', u'12') == u'12'
+        assert self.checker.get_typed_value('ratio', u'1.5') == 1.5
+        assert self.checker.get_typed_value('enabled', u'0') is False
+        assert self.checker.get_typed_value('ids', u'1') == [u'1']
+        assert self.checker.get_typed_value(
+            'scores', {'a': u'1'}) == {'a': u'1'}
+        assert self.checker.get_typed_value('unknown', u'1') == u'1'
+        assert self.checker.get_typed_value('count', None) is None
+
+    def test_is_type(self):
+        assert self.checker.is_type('list<int>', [1, 2])
+        assert not self.checker.is_type('list<int>', [1, 'a'])
+        assert self.checker.is_type('map<string, int>', {'a': 1})
+        assert not self.checker.is_type('map<string, int>', {'a': 'b'})
+        assert self.checker.is_type('Status', 'PAUSED')
+        assert not self.checker.is_type('Status', 'DELETED')
+        assert not self.checker.is_type('Status', {})
+
+    def test_type_strings_are_compiled_once(self):
+        self.checker.get_typed_value('ids', [u'1'])
+        converter = self.checker._converters['ids']
+        check = self.checker._type_checks['list<string>']
+        self.checker.get_typed_value('ids', [u'2'])
+        assert self.checker._converters['ids'] is converter
+        assert self.checker._type_checks['list<string>'] is check
+
+    def test_ad_object_modules_are_resolved_once(self):
+        imports = []
+        original_import_module = typechecker.importlib.import_module
+
+        def counting_import_module(name):
+            imports.append(name)
+            return original_import_module(name)
+
+        typechecker._ad_object_modules.pop('Targeting', None)
+        typechecker._ad_object_modules.pop('NotAnAdObject', None)
+        typechecker.importlib.import_module = counting_import_module
+        try:
+            for _ in range(2):
+                assert self.checker._type_is_ad_object('Targeting')
+                assert not self.checker._type_is_ad_object('NotAnAdObject')
+                targeting = TypeChecker({}, {})._create_field_object(
+                    'Targeting', {'age_min': 18})
+                assert targeting['age_min'] == 18
+                with self.assertRaises(ImportError):
+                    self.checker._create_field_object('NotAnAdObject', {})
+        finally:
+            typechecker.importlib.import_module = original_import_module
+        assert sorted(imports) == [
+            'facebook_business.adobjects.notanadobject',
+            'facebook_business.adobjects.targeting',
+        ]
+
 
 class SessionTestCase(unittest.TestCase):
 
@@ -379,6 +629,64 @@ class SessionTestCase(unittest.TestCase):
             self.gen_appsecret_proof(access_token, app_secret)
         )
 
+    def test_default_pools(self):
+        fb_session = session.FacebookSession(access_token='token')
+        adapter = fb_session.requests.get_adapter(fb_session.GRAPH)
+        self.assertEqual(adapter._pool_connections, 10)
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertFalse(adapter._pool_block)
+        self.assertEqual(adapter.max_retries.total, 0)
+        self.assertEqual(
+            fb_session.requests.headers['Connection'],
+            'keep-alive',
+        )
+
+    def test_pool_settings(self):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            pool_connections=2,
+            pool_maxsize=32,
+            pool_block=True,
+            host_pool_maxsize={session.FacebookSession.GRAPH_VIDEO: 4},
+            max_retries=3,
+            keep_alive=False,
+            tcp_keepalive=True,
+        )
+        adapter = fb_session.requests.get_adapter(
+            fb_session.GRAPH + '/v7.0/me',
+        )
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(adapter.max_retries.total, 3)
+        socket_options = adapter.poolmanager.connection_pool_kw[
+            'socket_options']
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+                      socket_options)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            self.assertIn((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60),
+                          socket_options)
+            self.assertIn((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 30),
+                          socket_options)
+        video_adapter = fb_session.requests.get_adapter(
+            fb_session.GRAPH_VIDEO + '/v7.0/act_1/advideos',
+        )
+        self.assertEqual(video_adapter._pool_maxsize, 4)
+        self.assertEqual(fb_session.requests.headers['Connection'], 'close')
+
+    def test_init_pool_settings(self):
+        default_api = api.FacebookAdsApi.get_default_api()
+        fb_api = api.FacebookAdsApi.init(
+            access_token='token',
+            pool_maxsize=50,
+            crash_log=False,
+        )
+        api.FacebookAdsApi.set_default_api(default_api)
+        adapter = fb_api._session.requests.get_adapter(
+            fb_api._session.GRAPH,
+        )
+        self.assertEqual(adapter._pool_maxsize, 50)
+
 
 class ProductCatalogTestCase(unittest.TestCase):
     def test_b64_encode_is_correct(self):
@@ -429,6 +737,19 @@ class UrlsUtilsTestCase(unittest.TestCase):
             urllib.parse.quote('1234')
         )
 
+    def test_quote_with_encoding_all_characters(self):
+        s = u''.join(six.unichr(code) for code in range(0x300))
+        self.assertEqual(
+            utils.urls.quote_with_encoding(s),
+            urllib.parse.quote(s.encode("utf-8"))
+        )
+
+    def test_quote_with_encoding_nothing_to_quote(self):
+        for s in ['', 'effective_status', 'act_123/ads', 'a-b.c~d', 'a b']:
+            quoted = utils.urls.quote_with_encoding(s)
+            self.assertEqual(quoted, urllib.parse.quote(s))
+            self.assertIsInstance(quoted, str)
+
     def test_quote_with_encoding_other_than_string_and_integer(self):
         s = [1, 2]
         self.assertRaises(
@@ -472,6 +793,204 @@ class FacebookAdsApiBatchTestCase(unittest.TestCase):
             'relative_url': 'some/path?'+'key=' + utils.urls.quote_with_encoding(u'vàlué')
         })
 
+    def test_add_request_keeps_params(self):
+        default_api = api.FacebookAdsApi.get_default_api()
+        batch = api.FacebookAdsApiBatch(default_api)
+        targeting = {'geo_locations': {'countries': ['US']}}
+        request = adset.AdSet('1', api=default_api).api_update(
+            params={'targeting': targeting},
+            pending=True,
+        )
+        request.add_fields(['name'])
+        batch.add_request(request)
+        self.assertEqual(request._params, {'targeting': targeting})
+        self.assertEqual(targeting, {'geo_locations': {'countries': ['US']}})
+        self.assertEqual(
+            sorted(batch._batch[0]['body'].split('&')),
+            ['fields=name', 'targeting=' + utils.urls.quote_with_encoding(
+                '{"geo_locations": {"countries": ["US"]}}')],
+        )
+
+    def test_add_dependent_calls(self):
+        default_api = api.FacebookAdsApi.get_default_api()
+        batch = api.FacebookAdsApiBatch(default_api)
+        batch.add('POST', 'act_1/campaigns', params={'name': 'Campaign'},
+                  name='campaign', omit_response_on_success=False)
+        campaign_id = batch.result_reference('campaign')
+        self.assertEqual(campaign_id, '{result=campaign:$.id}')
+        batch.add('POST', 'act_1/adsets', params={
+            'campaign_id': campaign_id,
+            'promoted_object': {'page_id': '{result=page:$.data.0.id}'},
+        }, depends_on='campaign')
+        self.assertEqual(batch._batch[0], {
+            'method': 'POST',
+            'relative_url': 'act_1/campaigns',
+            'body': 'name=Campaign',
+            'name': 'campaign',
+            'omit_response_on_success': False,
+        })
+        self.assertEqual(batch._batch[1]['depends_on'], 'campaign')
+        self.assertEqual(
+            sorted(batch._batch[1]['body'].split('&')),
+            [
+                'campaign_id={result=campaign:$.id}',
+                'promoted_object=' +
+                utils.urls.quote_with_encoding('{"page_id": "') +
+                '{result=page:$.data.0.id}' +
+                utils.urls.quote_with_encoding('"}'),
+            ],
+        )
+
+        request = api.FacebookRequest('act_1', 'POST', '/ads', api=default_api)
+        request.add_to_batch(batch, depends_on='adset', name='ad')
+        self.assertEqual(batch._batch[2]['name'], 'ad')
+        self.assertEqual(batch._batch[2]['depends_on'], 'adset')
+
+    def test_execute_dependent_calls(self):
+        body = [
+            None,
+            {"body": json.dumps({"error": {
+                "message": "This could happen if a dependent request failed "
+                           "or the entire request timed out.",
+            }}), "code": 500},
+        ]
+        fake_api = self.FakeApi(body)
+        batch = api.FacebookAdsApiBatch(fake_api)
+        responses = []
+        batch.add('POST', 'act_1/campaigns', name='campaign',
+                  success=responses.append, omit_response_on_success=True)
+        batch.add('POST', 'act_1/adsets', depends_on='campaign',
+                  failure=responses.append,
+                  transient_error=self.fail)
+        self.assertIsNone(batch.execute())
+        omitted, dependent = responses
+        self.assertTrue(omitted.is_success())
+        self.assertIsNone(omitted.json())
+        self.assertTrue(dependent.is_transient())
+
+    def test_execute_dependency_failure(self):
+        body = [
+            None,
+            {"body": json.dumps({"error": {
+                "message": "This could happen if a dependent request failed "
+                           "or the entire request timed out.",
+            }}), "code": 500},
+        ]
+        class RetryingApi(self.FakeApi):
+            calls = 0
+
+            def get_retry_policy(self):
+                return RetryPolicy(backoff_base=0)
+
+            def call(self, *args, **kwargs):
+                self.calls += 1
+                return super(RetryingApi, self).call(*args, **kwargs)
+
+        fake_api = RetryingApi(body)
+        batch = api.FacebookAdsApiBatch(fake_api)
+        responses = []
+        parent = batch.add('GET', 'act_1', name='account',
+                           failure=responses.append, transient_error=self.fail)
+        batch.add('POST', 'act_1/adsets', params={
+            'name': batch.result_reference('account', '$.name'),
+        }, failure=responses.append, transient_error=self.fail)
+        self.assertEqual(parent['omit_response_on_success'], False)
+        self.assertIsNone(batch.execute())
+        self.assertEqual(fake_api.calls, 1)
+        timed_out, dependent = responses
+        self.assertTrue(timed_out.is_failure())
+        self.assertTrue(timed_out.is_transient())
+        self.assertTrue(dependent.is_transient())
+
+    def test_execute_deduplicates_gets(self):
+        body = [
+            {"body": json.dumps({"id": "1"}), "code": 200},
+            {"body": json.dumps({"id": "2"}), "code": 200},
+            {"body": json.dumps({"success": True}), "code": 200},
+            {"body": json.dumps({"success": True}), "code": 200},
+        ]
+        fake_api = self.FakeApi(body)
+        batch = api.FacebookAdsApiBatch(fake_api)
+        responses = []
+        for node_id in ('1', '2', '1', '1'):
+            batch.add('GET', node_id, params={'fields': 'id'},
+                      success=responses.append)
+        batch.add('GET', '1', params={'fields': 'id'},
+                  headers={'If-None-Match': 'etag'}, success=responses.append)
+        batch.add('POST', '1', params={'name': 'Ad'}, success=responses.append)
+        self.assertEqual(len(batch), 6)
+        self.assertIsNone(batch.execute())
+        self.assertEqual(
+            [call['relative_url'] for call in fake_api.params['batch']],
+            ['1?fields=id', '2?fields=id', '1?fields=id', '1'],
+        )
+        self.assertEqual(
+            [response.json() for response in responses],
+            [{'id': '1'}, {'id': '2'}, {'id': '1'}, {'id': '1'},
+             {'success': True}, {'success': True}],
+        )
+        self.assertIs(responses[0], responses[2])
+
+        fake_api = self.FakeApi(body[:2])
+        batch = api.FacebookAdsApiBatch(fake_api, deduplicate=False)
+        batch.add('GET', '1')
+        batch.add('GET', '1')
+        batch.execute()
+        self.assertEqual(len(fake_api.params['batch']), 2)
+
+    def test_futures(self):
+        body = [
+            {"body": json.dumps({"id": "1", "name": "Ad 1"}), "code": 200},
+            {"body": json.dumps({"error": {"code": 100}}), "code": 400},
+            {"body": json.dumps({"success": True}), "code": 200},
+        ]
+        fake_api = self.FakeApi(body)
+        batch = api.FacebookAdsApiBatch(fake_api)
+        found = batch.add_request(
+            ad.Ad('1', api=fake_api).api_get(fields=['name'], pending=True),
+        )
+        unknown = batch.add_request(
+            ad.Ad('2', api=fake_api).api_get(fields=['name'], pending=True),
+        )
+        batch.add('POST', '3', params={'name': 'Ad 3'})
+        updated = batch._futures[-1]
+        self.assertIsInstance(found, api.FacebookBatchFuture)
+        self.assertFalse(found.done())
+        self.assertIsNone(found.response())
+        self.assertRaises(exceptions.FacebookUnavailablePropertyException,
+                          found.result)
+
+        self.assertIsNone(batch.execute())
+        self.assertTrue(found.done())
+        self.assertIsNone(found.exception())
+        self.assertIsInstance(found.result(), ad.Ad)
+        self.assertEqual(found.result()['name'], 'Ad 1')
+        self.assertIs(found.result(), found.result())
+        self.assertEqual(unknown.exception().api_error_code(), 100)
+        self.assertRaises(exceptions.FacebookRequestError, unknown.result)
+        self.assertIsInstance(updated.result(), api.FacebookResponse)
+
+    def test_futures_failed_batch(self):
+        class FailingApi(object):
+            def call(self, method, path, params, files):
+                raise IOError('connection reset')
+
+        failing_api = FailingApi()
+        batch = api.FacebookAdsApiBatch(failing_api)
+        futures = [
+            batch.add_request(
+                ad.Ad(node_id, api=failing_api).api_get(pending=True),
+            )
+            for node_id in ('1', '2')
+        ]
+        self.assertRaises(IOError, batch.execute)
+        for future in futures:
+            self.assertTrue(future.done())
+            six.assertRaisesRegex(
+                self, IOError, 'connection reset', future.result,
+            )
+            self.assertRaises(IOError, future.exception)
+
     class FakeApi(object):
         def __init__(self, body):
             self.body = body
@@ -570,6 +1089,134 @@ class FacebookAdsApiBatchTestCase(unittest.TestCase):
         self.assertEqual(len(new_batch), 1)  # one failure is transient
 
 
+class JsonCodecTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        apiconfig.ads_api_config['JSON_CODEC'] = 'json'
+        super(JsonCodecTestCase, self).tearDown()
+
+    def test_default_codec(self):
+        codec = utils.jsoncodec.get_codec()
+        self.assertIsInstance(codec, utils.jsoncodec.JsonCodec)
+        self.assertEqual(codec.name, 'json')
+
+    def test_top_level_param_json_encode(self):
+        expected = {
+            'fields': '["b", "a"]',
+            'targeting': '{"age_min": 18, "geo": {"countries": ["US"]}}',
+            'flag': 'true',
+            'name': 'foo',
+        }
+        for name in utils.jsoncodec.CODECS:
+            apiconfig.ads_api_config['JSON_CODEC'] = name
+            params = api._top_level_param_json_encode({
+                'fields': ['b', 'a'],
+                'targeting': {'geo': {'countries': ['US']}, 'age_min': 18},
+                'flag': True,
+                'name': 'foo',
+            })
+            if name == 'json':
+                # The output of json.dumps() is kept as is
+                self.assertEqual(params, expected)
+            # Other codecs may leave out the whitespace
+            self.assertEqual(
+                dict((key, value.replace(' ', ''))
+                     for key, value in params.items()),
+                dict((key, value.replace(' ', ''))
+                     for key, value in expected.items()),
+            )
+
+    def test_response_decoding(self):
+        for name in utils.jsoncodec.CODECS:
+            apiconfig.ads_api_config['JSON_CODEC'] = name
+            resp = api.FacebookResponse(
+                http_status=200,
+                body='{"data": [{"id": "1"}], "paging": {}}',
+            )
+            self.assertEqual(resp.json(), {'data': [{'id': '1'}], 'paging': {}})
+            self.assertTrue(resp.is_success())
+
+    def test_custom_codec(self):
+        class UpperCodec(utils.jsoncodec.JsonCodec):
+            def dumps(self, obj, sort_keys=False):
+                return 'ENCODED'
+
+        apiconfig.ads_api_config['JSON_CODEC'] = UpperCodec()
+        self.assertEqual(
+            api._top_level_param_json_encode({'fields': ['a']}),
+            {'fields': 'ENCODED'},
+        )
+
+    def test_unknown_codec(self):
+        apiconfig.ads_api_config['JSON_CODEC'] = 'yaml'
+        self.assertRaises(ValueError, utils.jsoncodec.get_codec)
+
+    def test_missing_codec_falls_back(self):
+        class MissingCodec(utils.jsoncodec.JsonCodec):
+            name = 'missing'
+
+            def __init__(self):
+                raise ImportError('No module named missing')
+
+        utils.jsoncodec.CODECS['missing'] = MissingCodec
+        apiconfig.ads_api_config['JSON_CODEC'] = 'missing'
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                codec = utils.jsoncodec.get_codec()
+        finally:
+            del utils.jsoncodec.CODECS['missing']
+            utils.jsoncodec._codecs.pop('missing', None)
+        self.assertEqual(codec.name, 'json')
+        self.assertEqual(len(caught), 1)
+
+    def test_api_codec(self):
+        class RecordingCodec(utils.jsoncodec.JsonCodec):
+            def __init__(self):
+                self.decoded = []
+
+            def loads(self, data):
+                self.decoded.append(data)
+                return super(RecordingCodec, self).loads(data)
+
+            def dumps(self, obj, sort_keys=False):
+                return 'ENCODED'
+
+        codec = RecordingCodec()
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=_StubTransport,
+        )
+        fb_api = api.FacebookAdsApi(fb_session, json_codec=codec)
+        other_api = api.FacebookAdsApi(fb_session)
+        self.assertIs(fb_api.get_json_codec(), codec)
+        self.assertEqual(
+            fb_api.call('GET', ('1',), params={'fields': ['id']}).json(),
+            {'id': '1'},
+        )
+        other_api.call('GET', ('1',), params={'fields': ['id']}).json()
+        self.assertEqual(codec.decoded, ['{"id": "1"}'])
+        (_, _, kwargs), (_, _, other_kwargs) = fb_session.transport.sent
+        self.assertEqual(kwargs['params'], {'fields': 'ENCODED'})
+        self.assertEqual(other_kwargs['params'], {'fields': '["id"]'})
+
+    def test_init_codec(self):
+        default_api = api.FacebookAdsApi.get_default_api()
+        try:
+            fb_api = api.FacebookAdsApi.init(
+                access_token='token',
+                json_codec='ujson',
+                crash_log=False,
+            )
+        finally:
+            api.FacebookAdsApi.set_default_api(default_api)
+        self.assertEqual(apiconfig.ads_api_config['JSON_CODEC'], 'json')
+        self.assertIsNot(
+            fb_api.get_json_codec(),
+            utils.jsoncodec.get_codec(),
+        )
+
+
 class VersionUtilsTestCase(unittest.TestCase):
 
     def test_api_version_is_pulled(self):
@@ -726,8 +1373,9 @@ class FacebookResponseTestCase(unittest.TestCase):
                 body=json.dumps({"error": {"is_transient": False, "message": message}})
             )
             self.assertTrue(resp.is_transient())
+            # The transient flag is tracked aside, the body is left untouched
             self.assertEqual(
-                json.loads(resp._body), {"error": {"is_transient": True, "message": message}})
+                resp.json(), {"error": {"is_transient": False, "message": message}})
             self.assertTrue(resp.error().api_transient_error())
 
     def test_evaluate_if_transient_not_json(self):
@@ -744,6 +1392,27 @@ class FacebookResponseTestCase(unittest.TestCase):
         )
         self.assertFalse(resp.is_transient())
 
+    def test_json_is_decoded_once(self):
+        class CountingCodec(utils.jsoncodec.JsonCodec):
+            def __init__(self):
+                self.calls = 0
+
+            def loads(self, data):
+                self.calls += 1
+                return super(CountingCodec, self).loads(data)
+
+        codec = CountingCodec()
+        resp = api.FacebookResponse(
+            http_status=500, call={},
+            body=json.dumps({"error": {"message": "An unknown error occurred"}}),
+            json_codec=codec,
+        )
+        self.assertTrue(resp.is_failure())
+        self.assertTrue(resp.is_transient())
+        self.assertIs(resp.json(), resp.json())
+        resp.error()
+        self.assertEqual(codec.calls, 1)
+
     def test_evaluate_if_transient_failure_but_wrong_message(self):
         resp = api.FacebookResponse(
             http_status=500,
@@ -752,5 +1421,1482 @@ class FacebookResponseTestCase(unittest.TestCase):
         self.assertFalse(resp.is_transient())
 
 
+class _CannedResponse(object):
+
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(body)
+        self.headers = headers or {}
+        self.request = None
+
+
+class _CannedRequests(object):
+    """Stands for the requests session of a FacebookSession, returning
+    canned responses in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.sent.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+
+    transient_error = _CannedResponse(500, {'error': {
+        'message': 'An unknown error occurred',
+        'code': 1,
+    }})
+
+    def make_api(self, responses, retry_policy):
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.requests = _CannedRequests(responses)
+        return api.FacebookAdsApi(fb_session, retry_policy=retry_policy)
+
+    def test_backoff(self):
+        policy = RetryPolicy(max_attempts=10, backoff_base=1, backoff_cap=5,
+                             jitter=False)
+        self.assertEqual(
+            [policy.get_backoff(attempt) for attempt in range(1, 6)],
+            [1, 2, 4, 5, 5],
+        )
+        policy.jitter = True
+        for attempt in range(1, 6):
+            self.assertTrue(0 <= policy.get_backoff(attempt) <= 5)
+
+    def test_get_retry_delay(self):
+        policy = RetryPolicy(max_attempts=3, backoff_base=1, jitter=False)
+        transient = api.FacebookResponse(
+            body=self.transient_error.text,
+            http_status=500,
+        )
+        self.assertEqual(policy.get_retry_delay(transient, 1), 1)
+        self.assertEqual(policy.get_retry_delay(transient, 2), 2)
+        self.assertIsNone(policy.get_retry_delay(transient, 3))
+
+        bad_parameter = api.FacebookResponse(
+            body=json.dumps({'error': {'message': 'Invalid', 'code': 100}}),
+            http_status=400,
+        )
+        self.assertIsNone(policy.get_retry_delay(bad_parameter, 1))
+        policy = RetryPolicy(retryable_subcodes=[33], jitter=False)
+        subcode = api.FacebookResponse(
+            body=json.dumps({'error': {'code': 100, 'error_subcode': 33}}),
+            http_status=400,
+        )
+        self.assertEqual(policy.get_retry_delay(subcode, 1), 1)
+
+    def test_writes_are_retried_when_throttled_only(self):
+        policy = RetryPolicy(backoff_base=1, jitter=False)
+        for method, status, code, retried in [
+            ('GET', 503, 1, True),
+            ('DELETE', 502, 2, True),
+            ('POST', 503, 1, False),
+            ('POST', 500, 2, False),
+            ('POST', 400, 17, True),
+            ('POST', 400, 80004, True),
+        ]:
+            response = api.FacebookResponse(
+                body=json.dumps({'error': {'code': code}}),
+                http_status=status,
+                call={'method': method},
+            )
+            self.assertEqual(
+                policy.get_retry_delay(response, 1) is not None,
+                retried,
+                (method, status, code),
+            )
+        policy = RetryPolicy(retry_methods=['get', 'post'])
+        self.assertTrue(policy.is_retryable(api.FacebookResponse(
+            body=self.transient_error.text,
+            http_status=500,
+            call={'method': 'POST'},
+        )))
+
+    def test_create_is_not_retried(self):
+        fb_api = self.make_api(
+            [self.transient_error, _CannedResponse(200, {'id': '42'})],
+            RetryPolicy(backoff_base=0),
+        )
+        with self.assertRaises(exceptions.FacebookRequestError):
+            fb_api.call('POST', ('act_1', 'campaigns'), params={'name': 'C'})
+        self.assertEqual(len(fb_api._session.requests.sent), 1)
+
+    def test_throttle_wait(self):
+        policy = RetryPolicy(backoff_base=1, jitter=False,
+                             max_throttle_wait=600)
+        retry_after = api.FacebookResponse(
+            body=self.transient_error.text,
+            http_status=503,
+            headers={'retry-after': '7'},
+        )
+        self.assertEqual(policy.get_retry_delay(retry_after, 1), 7)
+        usage = json.dumps({'123': [{
+            'type': 'ads_management',
+            'estimated_time_to_regain_access': 20,
+        }]})
+        throttled = api.FacebookResponse(
+            body=json.dumps({'error': {'code': 80004}}),
+            http_status=400,
+            headers=[{'name': 'X-Business-Use-Case-Usage', 'value': usage}],
+        )
+        self.assertEqual(policy.get_throttle_wait(throttled), 1200)
+        self.assertIsNone(policy.get_retry_delay(throttled, 1))
+
+    def test_call_is_retried(self):
+        fb_api = self.make_api(
+            [self.transient_error, _CannedResponse(200, {'id': '42'})],
+            RetryPolicy(backoff_base=0),
+        )
+        response = fb_api.call('GET', ('42',))
+        self.assertEqual(response.json(), {'id': '42'})
+        self.assertEqual(fb_api.get_num_requests_attempted(), 2)
+        self.assertEqual(fb_api.get_num_requests_succeeded(), 1)
+
+    def test_call_raises_once_attempts_are_exhausted(self):
+        fb_api = self.make_api(
+            [self.transient_error] * 3,
+            RetryPolicy(max_attempts=2, backoff_base=0),
+        )
+        with self.assertRaises(exceptions.FacebookRequestError):
+            fb_api.call('GET', ('42',))
+        self.assertEqual(len(fb_api._session.requests.sent), 2)
+
+    def test_call_is_not_retried_without_policy(self):
+        fb_api = self.make_api([self.transient_error] * 2, None)
+        with self.assertRaises(exceptions.FacebookRequestError):
+            fb_api.call('GET', ('42',))
+        self.assertEqual(len(fb_api._session.requests.sent), 1)
+
+    def test_batch_is_retried(self):
+        transient = {'code': 500, 'body': self.transient_error.text}
+        fb_api = self.make_api(
+            [
+                _CannedResponse(200, [{'code': 200, 'body': '{"id": "1"}'},
+                                      transient]),
+                _CannedResponse(200, [{'code': 200, 'body': '{"id": "2"}'}]),
+            ],
+            RetryPolicy(backoff_base=0),
+        )
+        succeeded = []
+        transient_errors = []
+        batch = fb_api.new_batch()
+        for node_id in ('1', '2'):
+            batch.add(
+                'GET',
+                (node_id,),
+                success=lambda response: succeeded.append(response.json()),
+                transient_error=transient_errors.append,
+            )
+        self.assertIsNone(batch.execute())
+        self.assertEqual(succeeded, [{'id': '1'}, {'id': '2'}])
+        self.assertEqual(transient_errors, [])
+        sent = fb_api._session.requests.sent
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(json.loads(sent[1][2]['data']['batch']),
+                         [{'method': 'GET', 'relative_url': '2'}])
+
+    def test_batch_returns_calls_still_failing(self):
+        transient = {'code': 500, 'body': self.transient_error.text}
+        fb_api = self.make_api(
+            [_CannedResponse(200, [transient])] * 2,
+            RetryPolicy(max_attempts=2, backoff_base=0),
+        )
+        transient_errors = []
+        batch = fb_api.new_batch()
+        batch.add('GET', ('1',), transient_error=transient_errors.append)
+        retry_batch = batch.execute()
+        self.assertEqual(len(retry_batch), 1)
+        self.assertEqual(len(transient_errors), 1)
+        self.assertEqual(len(fb_api._session.requests.sent), 2)
+
+
+class ThrottlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.throttler = Throttler(threshold=50, max_delay=10, max_wait=60,
+                                   window=100)
+        self.throttler._now = lambda: self.now
+
+    def response(self, path, **headers):
+        return api.FacebookResponse(
+            body='{"id": "1"}',
+            http_status=200,
+            headers=dict(
+                (name.replace('_', '-'), json.dumps(value))
+                for name, value in headers.items()
+            ),
+            call={'path': path},
+        )
+
+    def test_app_usage(self):
+        self.throttler.update(self.response(
+            'https://graph.facebook.com/v7.0/act_1/ads',
+            X_App_Usage={'call_count': 75, 'total_cputime': 10,
+                         'total_time': 5},
+        ))
+        self.assertEqual(self.throttler.get_usages(), {('app',): 75})
+        self.assertEqual(self.throttler.get_delay(('act_2', 'ads')), 5)
+        self.assertEqual(
+            self.throttler.get_delay(('act_2', 'ads'), include_app=False),
+            0,
+        )
+        # Usage decreases over the window
+        self.now += 60
+        self.assertEqual(self.throttler.get_usages(), {('app',): 30})
+        self.assertEqual(self.throttler.get_delay(('act_2', 'ads')), 0)
+
+    def test_ad_account_usage(self):
+        self.throttler.update(self.response(
+            'https://graph.facebook.com/v7.0/act_1/ads?limit=25',
+            X_Ad_Account_Usage={'acc_id_util_pct': 100,
+                                'reset_time_duration': 30},
+        ))
+        self.assertEqual(
+            self.throttler.get_usages(),
+            {('ad_account', '1'): 100},
+        )
+        self.assertEqual(self.throttler.get_delay(('act_1', 'ads')), 30)
+        self.assertEqual(self.throttler.get_delay('act_1/campaigns'), 30)
+        self.assertEqual(self.throttler.get_delay(('act_2', 'ads')), 0)
+
+    def test_business_use_case_usage(self):
+        self.throttler.update(self.response(
+            'https://graph.facebook.com/v7.0/act_1/insights',
+            X_Business_Use_Case_Usage={'1': [{
+                'type': 'ads_insights',
+                'call_count': 100,
+                'total_cputime': 20,
+                'total_time': 20,
+                'estimated_time_to_regain_access': 5,
+            }]},
+        ))
+        self.assertEqual(
+            self.throttler.get_usages(),
+            {('business_use_case', '1', 'ads_insights'): 100},
+        )
+        # Blocked for 5 minutes, waiting for max_wait at most
+        self.assertEqual(self.throttler.get_delay(('act_1', 'insights')), 60)
+        self.now += 290
+        self.assertEqual(self.throttler.get_delay(('act_1', 'insights')), 10)
+
+    def test_usages_run_out(self):
+        for account_id in range(1000):
+            self.throttler.update(self.response(
+                'https://graph.facebook.com/v7.0/act_%d/ads' % account_id,
+                X_Ad_Account_Usage={'acc_id_util_pct': 90},
+            ))
+        self.assertEqual(len(self.throttler.get_usages()), 1000)
+        self.assertEqual(self.throttler.get_delay(('act_999', 'ads')), 8)
+        self.now += 100
+        self.throttler.update(self.response(
+            'https://graph.facebook.com/v7.0/act_1/ads',
+            X_Ad_Account_Usage={'acc_id_util_pct': 60},
+        ))
+        self.assertEqual(
+            self.throttler.get_usages(),
+            {('ad_account', '1'): 60},
+        )
+        self.assertEqual(self.throttler.get_delay(('act_999', 'ads')), 0)
+
+    def test_api_calls_update_the_throttler(self):
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.requests = _CannedRequests([
+            _CannedResponse(200, {'id': '1'}, headers={
+                'x-app-usage': json.dumps({'call_count': 40}),
+            }),
+            _CannedResponse(200, [{
+                'code': 200,
+                'body': '{"id": "2"}',
+                'headers': [{
+                    'name': 'X-Ad-Account-Usage',
+                    'value': json.dumps({'acc_id_util_pct': 20}),
+                }],
+            }]),
+        ])
+        fb_api = api.FacebookAdsApi(fb_session, throttler=self.throttler)
+        fb_api.call('GET', ('act_1',))
+        batch = fb_api.new_batch()
+        batch.add('GET', ('act_2', 'ads'))
+        batch.execute()
+        self.assertEqual(self.throttler.get_usages(), {
+            ('app',): 40,
+            ('ad_account', '2'): 20,
+        })
+
+
+class _StubTransport(transport.Transport):
+
+    def __init__(self, session):
+        self.session = session
+        self.sent = []
+
+    def send(self, method, url, **kwargs):
+        self.sent.append((method, url, kwargs))
+        return transport.TransportResponse(200, {}, '{"id": "1"}')
+
+
+class TransportTestCase(unittest.TestCase):
+
+    def test_default_transport(self):
+        fb_session = session.FacebookSession(access_token='token')
+        self.assertIsInstance(fb_session.transport,
+                              transport.RequestsTransport)
+
+    def test_custom_transport(self):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=_StubTransport,
+        )
+        self.assertIs(fb_session.transport.session, fb_session)
+        fb_api = api.FacebookAdsApi(fb_session)
+        self.assertEqual(fb_api.call('GET', ('1',)).json(), {'id': '1'})
+        fb_api.call('POST', ('1',), params={'name': 'foo'})
+        (get_method, get_url, get_kwargs), (post_method, _, post_kwargs) = \
+            fb_session.transport.sent
+        self.assertEqual(get_method, 'GET')
+        self.assertTrue(get_url.endswith('/1'))
+        self.assertEqual(get_kwargs['params'], {})
+        self.assertNotIn('data', get_kwargs)
+        self.assertEqual(post_method, 'POST')
+        self.assertEqual(post_kwargs['data'], {'name': 'foo'})
+        self.assertNotIn('params', post_kwargs)
+
+    def test_transport_must_implement_send(self):
+        class IncompleteTransport(transport.Transport):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteTransport()
+
+
+class _BatchTransport(transport.Transport):
+    """Answers batch calls, failing the calls to the 'bad' node and those to
+    the nodes in transient as many times as their count, and leaving empty
+    the responses to the nodes in timeouts likewise. Other calls get an empty
+    edge."""
+
+    def __init__(self, session, latency=0):
+        self.session = session
+        self.latency = latency
+        self.transient = {}
+        self.timeouts = {}
+        self.batch_sizes = []
+        self.single_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def send(self, method, url, data=None, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        if not data or 'batch' not in data:
+            with self.lock:
+                self.in_flight -= 1
+                self.single_calls.append((method, url))
+            return transport.TransportResponse(200, {}, '{"data": []}')
+        calls = json.loads(data['batch'])
+        responses = []
+        with self.lock:
+            self.in_flight -= 1
+            self.batch_sizes.append(len(calls))
+            for call in calls:
+                node_id = call['relative_url'].split('/')[0]
+                if self.timeouts.get(node_id):
+                    self.timeouts[node_id] -= 1
+                    responses.append(None)
+                    continue
+                if self.transient.get(node_id):
+                    self.transient[node_id] -= 1
+                    body = {'error': {'message': 'Please retry',
+                                      'code': 2, 'is_transient': True}}
+                    code = 500
+                elif node_id == 'bad':
+                    body = {'error': {'message': 'Invalid', 'code': 100}}
+                    code = 400
+                else:
+                    body = {'success': True}
+                    code = 200
+                responses.append({'code': code, 'body': json.dumps(body)})
+        return transport.TransportResponse(200, {}, json.dumps(responses))
+
+
+class RecordReplayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = GraphServer(edge_size=30).start()
+        self.addCleanup(self.server.stop)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cassette = os.path.join(directory, 'cassette.json')
+
+    def make_calls(self, fb_api):
+        account = adaccount.AdAccount('act_1', api=fb_api)
+        ads = [obj['name'] for obj in account.get_ads(fields=['name'])]
+        obj = ad.Ad('1', api=fb_api).api_get(fields=['name'])
+        return ads, obj['name']
+
+    def test_record_and_replay(self):
+        recording_session = self.server.create_session(
+            access_token='SECRET_TOKEN',
+            transport=lambda fb_session: transport.RecordingTransport(
+                fb_session,
+                self.cassette,
+                transport=self.server.transport,
+            ),
+        )
+        recorded = self.make_calls(api.FacebookAdsApi(recording_session))
+        recording_session.transport.close()
+        self.assertEqual(self.server.requests, 3)
+        with open(self.cassette) as cassette_file:
+            self.assertNotIn('SECRET_TOKEN', cassette_file.read())
+
+        replay_session = session.FacebookSession(
+            access_token='token',
+            transport=lambda fb_session: transport.ReplayTransport(
+                fb_session,
+                self.cassette,
+            ),
+        )
+        fb_api = api.FacebookAdsApi(replay_session)
+        self.assertEqual(self.make_calls(fb_api), recorded)
+        # Replayed any number of times
+        self.assertEqual(self.make_calls(fb_api), recorded)
+        self.assertEqual(self.server.requests, 3)
+        with self.assertRaises(exceptions.FacebookError):
+            ad.Ad('2', api=fb_api).api_get(fields=['name'])
+
+    def test_secrets_not_recorded(self):
+        next_url = (
+            'https://graph.facebook.com/v7.0/act_1/ads'
+            '?access_token=SECRET_TOKEN&after=MjQ'
+        )
+
+        class PagingTransport(transport.Transport):
+            def __init__(self, fb_session):
+                pass
+
+            def send(self, method, url, **kwargs):
+                return transport.TransportResponse(
+                    200,
+                    {},
+                    json.dumps({'data': [], 'paging': {'next': next_url}}),
+                )
+
+        recording_session = session.FacebookSession(
+            access_token='SECRET_TOKEN',
+            transport=lambda fb_session: transport.RecordingTransport(
+                fb_session,
+                self.cassette,
+                transport=PagingTransport,
+            ),
+        )
+        recording_session.transport.send('GET', next_url)
+        recording_session.transport.close()
+        with open(self.cassette) as cassette_file:
+            self.assertNotIn('SECRET_TOKEN', cassette_file.read())
+
+        replay = transport.ReplayTransport(None, self.cassette)
+        response = replay.send(
+            'GET',
+            next_url.replace('SECRET_TOKEN', 'OTHER_TOKEN'),
+        )
+        self.assertEqual(
+            json.loads(response.text)['paging']['next'],
+            next_url.replace('SECRET_TOKEN', transport.REDACTED),
+        )
+
+
+class GraphServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = GraphServer(edge_size=60, video_chunk_size=1000).start()
+        self.addCleanup(self.server.stop)
+        self.api = api.FacebookAdsApi(self.server.create_session())
+
+    def test_edges(self):
+        account = adaccount.AdAccount('act_1', api=self.api)
+        ads = account.get_ads(fields=['name'])
+        self.assertEqual(ads.total(), 60)
+        ads = list(ads)
+        self.assertEqual(len(ads), 60)
+        self.assertEqual(ads[59]['name'], 'name 59')
+        insights = list(account.get_insights(params={'limit': 50}))
+        self.assertEqual(len(insights), 60)
+        self.assertEqual(self.server.requests, 5)
+
+    def test_batch(self):
+        batch = self.api.new_batch()
+        futures = [
+            batch.add_request(
+                ad.Ad(str(index), api=self.api).api_get(fields=['name'],
+                                                        pending=True),
+            )
+            for index in range(3)
+        ]
+        batch.execute()
+        self.assertEqual(
+            [future.result()['name'] for future in futures],
+            ['name of 0', 'name of 1', 'name of 2'],
+        )
+        self.assertEqual(self.server.requests, 1)
+
+    def test_video_upload(self):
+        filepath = os.path.join(os.path.dirname(__file__), 'test.png')
+        video = advideo.AdVideo(api=self.api)
+        video._parent_id = 'act_1'
+        video[advideo.AdVideo.Field.filepath] = filepath
+        body = VideoUploader().upload(video)
+        self.assertEqual(body, {'id': '8000000000001'})
+        chunks = (os.path.getsize(filepath) + 999) // 1000
+        # start, transfer of each chunk, finish
+        self.assertEqual(self.server.requests, chunks + 2)
+
+    def test_valid_status(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            obj = ad.Ad('1', api=self.api).api_get(fields=['status'])
+            ads = adaccount.AdAccount('act_1', api=self.api).get_ads(
+                fields=['status'],
+            )
+            self.assertEqual(ads[0]['status'], ad.Ad.Status.active)
+        self.assertEqual(obj['status'], ad.Ad.Status.active)
+        self.assertEqual(
+            [w for w in caught if issubclass(w.category, UserWarning)],
+            [],
+        )
+
+
+class _RecordingHook(RequestHook):
+
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, call):
+        call['headers']['X-Trace'] = 'trace'
+        self.events.append('before_request')
+
+    def after_response(self, call, fb_response, duration):
+        self.events.append(('after_response', fb_response.status()))
+
+    def on_error(self, call, error, duration):
+        self.events.append(('on_error', error.api_error_code()))
+
+    def on_retry(self, call, fb_response, attempt, delay):
+        self.events.append(('on_retry', attempt))
+
+    def on_batch(self, calls):
+        self.events.append(('on_batch', len(calls)))
+
+
+class RequestHookTestCase(unittest.TestCase):
+
+    transient_error = RetryPolicyTestCase.transient_error
+
+    def make_api(self, responses, hooks):
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.requests = _CannedRequests(responses)
+        return api.FacebookAdsApi(
+            fb_session,
+            retry_policy=RetryPolicy(max_attempts=2, backoff_base=0,
+                                     jitter=False),
+            hooks=hooks,
+        )
+
+    def test_lifecycle(self):
+        hook = _RecordingHook()
+        fb_api = self.make_api([
+            self.transient_error,
+            _CannedResponse(200, {'id': '1'}),
+            self.transient_error,
+            self.transient_error,
+        ], [hook])
+
+        fb_api.call('GET', ('1',))
+        self.assertRaises(
+            exceptions.FacebookRequestError,
+            fb_api.call, 'GET', ('1',),
+        )
+
+        self.assertEqual(hook.events, [
+            'before_request', ('after_response', 500), ('on_retry', 1),
+            'before_request', ('after_response', 200),
+            'before_request', ('after_response', 500), ('on_retry', 1),
+            'before_request', ('after_response', 500), ('on_error', 1),
+        ])
+        sent = fb_api._session.requests.sent
+        self.assertEqual(sent[0][2]['headers']['X-Trace'], 'trace')
+
+    def test_batch(self):
+        hook = _RecordingHook()
+        fb_api = self.make_api([
+            _CannedResponse(200, [{'code': 200, 'body': '{"id": "1"}'}] * 2),
+        ], [])
+        fb_api.add_hook(hook)
+        batch = fb_api.new_batch()
+        batch.add('GET', ('1',))
+        batch.add('GET', ('2',))
+        batch.execute()
+        self.assertEqual(hook.events, [
+            ('on_batch', 2), 'before_request', ('after_response', 200),
+        ])
+        fb_api.remove_hook(hook)
+        self.assertEqual(fb_api.get_hooks(), [])
+
+
+class MetricsCollectorTestCase(unittest.TestCase):
+
+    def test_endpoint_name(self):
+        self.assertEqual(
+            get_endpoint_name(
+                'GET',
+                'https://graph.facebook.com/v7.0/act_123/ads',
+            ),
+            'GET /{id}/ads',
+        )
+        self.assertEqual(
+            get_endpoint_name('POST', 'https://graph.facebook.com/v7.0/'),
+            'POST /',
+        )
+        self.assertEqual(
+            get_endpoint_name('GET', 'https://graph.facebook.com/v7.0/me'),
+            'GET /{id}',
+        )
+
+    def test_collect(self):
+        metrics = MetricsCollector()
+        fb_api = RequestHookTestCase('test_lifecycle').make_api([
+            RetryPolicyTestCase.transient_error,
+            _CannedResponse(200, {'data': []}),
+        ], [metrics])
+        fb_api.call('GET', ('act_1', 'ads'), params={'limit': 10})
+        metrics.on_throttle(None, 0.5)
+        metrics.on_batch([{}] * 3)
+
+        snapshot = metrics.snapshot()
+        ads = snapshot['endpoints']['GET /{id}/ads']
+        self.assertEqual(ads['requests'], 2)
+        self.assertEqual(ads['retries'], 1)
+        self.assertEqual(ads['errors'], 0)
+        self.assertEqual(ads['request_bytes'], 2 * len('limit=10'))
+        self.assertEqual(ads['duration']['count'], 2)
+        self.assertEqual(ads['duration']['buckets'][-1], (float('inf'), 2))
+        self.assertEqual(snapshot['batch_size']['sum'], 3)
+        self.assertEqual(snapshot['throttle'], {'waits': 1, 'seconds': 0.5})
+
+        text = metrics.to_prometheus()
+        self.assertIn(
+            'facebook_business_requests_total'
+            '{method="GET",endpoint="/{id}/ads"} 2\n',
+            text,
+        )
+        self.assertIn(
+            'facebook_business_request_duration_seconds_bucket'
+            '{method="GET",endpoint="/{id}/ads",le="+Inf"} 2\n',
+            text,
+        )
+        self.assertIn('facebook_business_batch_size_bucket{le="5"} 1\n', text)
+        self.assertIn('facebook_business_throttle_wait_seconds_total 0.5\n',
+                      text)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['endpoints'], {})
+
+
+class ETagCacheTestCase(unittest.TestCase):
+
+    def make_api(self, responses, etag_cache):
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.requests = _CannedRequests(responses)
+        return api.FacebookAdsApi(fb_session, etag_cache=etag_cache)
+
+    def check_conditional_get(self, etag_cache):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1'}, {'ETag': '"abc"'}),
+            _CannedResponse(304, '', {'ETag': '"abc"'}),
+        ], etag_cache)
+
+        first = fb_api.call('GET', ('1',), params={'fields': 'name'})
+        second = fb_api.call('GET', ('1',), params={'fields': 'name'})
+
+        sent = fb_api._session.requests.sent
+        self.assertNotIn('If-None-Match', sent[0][2]['headers'])
+        self.assertEqual(sent[1][2]['headers']['If-None-Match'], '"abc"')
+        self.assertEqual(second.status(), 304)
+        self.assertEqual(second.json(), first.json())
+        self.assertIs(second._json_codec, fb_api.get_json_codec())
+        self.assertEqual(fb_api.get_num_requests_succeeded(), 2)
+
+    def test_memory_storage(self):
+        self.check_conditional_get(ETagCache())
+
+    def test_disk_storage(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.check_conditional_get(ETagCache(DiskStorage(directory)))
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_disk_storage_without_token(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        etag_cache = ETagCache(DiskStorage(directory))
+        fb_api = self.make_api([
+            _CannedResponse(200, {'data': []}, {'ETag': '"abc"'}),
+            _CannedResponse(304, '', {'ETag': '"abc"'}),
+        ], etag_cache)
+        next_url = (
+            'https://graph.facebook.com/v7.0/act_1/ads'
+            '?limit=25&access_token=SECRET_TOKEN&after=MjQ'
+        )
+
+        fb_api.call('GET', next_url)
+        second = fb_api.call('GET', next_url)
+
+        self.assertEqual(second.json(), {'data': []})
+        for filename in os.listdir(directory):
+            with open(os.path.join(directory, filename)) as entry_file:
+                self.assertNotIn('SECRET_TOKEN', entry_file.read())
+        self.assertNotEqual(
+            etag_cache.get_key(fb_api._session, next_url, {}),
+            etag_cache.get_key(
+                fb_api._session,
+                next_url.replace('SECRET_TOKEN', 'OTHER_TOKEN'),
+                {},
+            ),
+        )
+
+    def test_evicted_before_not_modified(self):
+        class EvictingCache(ETagCache):
+            def prepare(self, *args):
+                key = super(EvictingCache, self).prepare(*args)
+                self.storage.delete(key)
+                return key
+
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1'}, {'ETag': '"abc"'}),
+            _CannedResponse(304, '', {'ETag': '"abc"'}),
+            _CannedResponse(200, {'id': '1', 'name': 'foo'},
+                            {'ETag': '"def"'}),
+        ], EvictingCache())
+
+        fb_api.call('GET', ('1',), params={'fields': 'name'})
+        second = fb_api.call('GET', ('1',), params={'fields': 'name'})
+
+        sent = fb_api._session.requests.sent
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(sent[1][2]['headers']['If-None-Match'], '"abc"')
+        self.assertNotIn('If-None-Match', sent[2][2]['headers'])
+        self.assertEqual(second.status(), 200)
+        self.assertEqual(second.json(), {'id': '1', 'name': 'foo'})
+
+    def test_not_cached(self):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1'}, {'ETag': '"abc"'}),
+            _CannedResponse(200, {'id': '1'}),
+            _CannedResponse(200, {'id': '1'}),
+            _CannedResponse(200, {'id': '1'}),
+        ], ETagCache())
+
+        fb_api.call('GET', ('1',), params={'fields': 'name'})
+        # Other params, other method, other access token
+        fb_api.call('GET', ('1',), params={'fields': 'id'})
+        fb_api.call('POST', ('1',), params={'fields': 'name'})
+        fb_api._session.access_token = 'other'
+        fb_api.call('GET', ('1',), params={'fields': 'name'})
+
+        for _, _, kwargs in fb_api._session.requests.sent:
+            self.assertNotIn('If-None-Match', kwargs['headers'])
+
+    def test_memory_storage_eviction(self):
+        storage = MemoryStorage(max_entries=2)
+        storage.set('a', ('1', 'a'))
+        storage.set('b', ('2', 'b'))
+        storage.get('a')
+        storage.set('c', ('3', 'c'))
+        self.assertEqual(len(storage), 2)
+        self.assertIsNone(storage.get('b'))
+        self.assertEqual(storage.get('a'), ('1', 'a'))
+
+
+class ObjectCacheTestCase(unittest.TestCase):
+
+    def make_api(self, responses, object_cache):
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.requests = _CannedRequests(responses)
+        return api.FacebookAdsApi(fb_session, object_cache=object_cache)
+
+    def test_api_get(self):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1', 'name': 'foo'}),
+            _CannedResponse(200, {'id': '1', 'status': 'PAUSED'}),
+        ], ObjectCache())
+
+        first = ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+        first[ad.Ad.Field.name] = 'changed locally'
+        second = ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+        ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.status])
+
+        self.assertEqual(len(fb_api._session.requests.sent), 2)
+        self.assertEqual(second[ad.Ad.Field.name], 'foo')
+        self.assertEqual(
+            fb_api.get_object_cache().get_stats(),
+            {'hits': 1, 'misses': 2, 'entries': 2},
+        )
+
+    def test_invalidate_on_write(self):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1', 'name': 'foo'}),
+            _CannedResponse(200, {'success': True}),
+            _CannedResponse(200, {'id': '1', 'name': 'bar'}),
+        ], ObjectCache())
+
+        ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+        ad.Ad('1', api=fb_api).api_update(params={'name': 'bar'})
+        updated = ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+
+        self.assertEqual(len(fb_api._session.requests.sent), 3)
+        self.assertEqual(updated[ad.Ad.Field.name], 'bar')
+
+    def test_ttl(self):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1', 'name': 'foo'}),
+            _CannedResponse(200, {'id': '1', 'name': 'foo'}),
+        ], ObjectCache(ttl=0))
+
+        ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+        ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+
+        self.assertEqual(len(fb_api._session.requests.sent), 2)
+
+    def test_lru_eviction(self):
+        object_cache = ObjectCache(max_entries=2)
+        keys = [
+            object_cache.get_key(ad.Ad, fbid, ['name'], None, 'v1.0')
+            for fbid in ('1', '2', '3')
+        ]
+        object_cache.set(keys[0], {'id': '1'})
+        object_cache.set(keys[1], {'id': '2'})
+        object_cache.get(keys[0])
+        object_cache.set(keys[2], {'id': '3'})
+
+        self.assertIsNone(object_cache.get(keys[1]))
+        self.assertEqual(object_cache.get(keys[0]), {'id': '1'})
+        object_cache.invalidate('1')
+        self.assertEqual(len(object_cache), 1)
+
+    def test_get_by_ids(self):
+        fb_api = self.make_api([
+            _CannedResponse(200, {'id': '1', 'name': 'foo'}),
+            _CannedResponse(200, {'2': {'id': '2', 'name': 'bar'}}),
+        ], ObjectCache())
+
+        ad.Ad('1', api=fb_api).api_get(fields=[ad.Ad.Field.name])
+        ads = ad.Ad.get_by_ids(['1', '2'], fields=[ad.Ad.Field.name],
+                               api=fb_api)
+        ad.Ad.get_by_ids(['2'], fields=[ad.Ad.Field.name], api=fb_api)
+
+        sent = fb_api._session.requests.sent
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(sent[1][2]['params']['ids'], '2')
+        self.assertEqual(
+            [(obj['id'], obj[ad.Ad.Field.name]) for obj in ads],
+            [('1', 'foo'), ('2', 'bar')],
+        )
+
+    def test_get_by_ids_with_duck_typed_api(self):
+        class CallOnlyApi(object):
+            def call(self, method, path, params=None):
+                return api.FacebookResponse(
+                    body='{"1": {"id": "1"}}',
+                    http_status=200,
+                )
+
+        ads = ad.Ad.get_by_ids(['1'], api=CallOnlyApi())
+        self.assertEqual([obj['id'] for obj in ads], ['1'])
+
+
+class CoalesceReadsTestCase(unittest.TestCase):
+
+    def make_api(self, coalesce_reads=True):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=lambda fb_session: _BatchTransport(fb_session, 0.2),
+        )
+        self.transport = fb_session.transport
+        return api.FacebookAdsApi(fb_session, coalesce_reads=coalesce_reads)
+
+    def call_concurrently(self, fb_api, calls):
+        responses = [None] * len(calls)
+
+        def call(index, path, params):
+            responses[index] = fb_api.call('GET', path, params=params)
+
+        threads = [
+            threading.Thread(target=call, args=(index,) + calls[index])
+            for index in range(len(calls))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_identical_reads(self):
+        fb_api = self.make_api()
+        responses = self.call_concurrently(
+            fb_api,
+            [(('1', 'ads'), {'fields': 'name'})] * 8,
+        )
+        self.assertEqual(len(self.transport.single_calls), 1)
+        self.assertTrue(all(response is responses[0]
+                            for response in responses))
+        self.assertEqual(fb_api.get_num_requests_succeeded(), 8)
+
+        # Only calls in flight are coalesced
+        fb_api.call('GET', ('1', 'ads'), params={'fields': 'name'})
+        self.assertEqual(len(self.transport.single_calls), 2)
+
+    def test_different_reads(self):
+        fb_api = self.make_api()
+        self.call_concurrently(fb_api, [
+            (('1', 'ads'), {'fields': 'name'}),
+            (('1', 'ads'), {'fields': 'id'}),
+            (('2', 'ads'), {'fields': 'name'}),
+        ])
+        self.assertEqual(len(self.transport.single_calls), 3)
+
+    def test_disabled(self):
+        fb_api = self.make_api(coalesce_reads=False)
+        self.call_concurrently(
+            fb_api,
+            [(('1', 'ads'), {'fields': 'name'})] * 3,
+        )
+        self.assertEqual(len(self.transport.single_calls), 3)
+
+
+class DefaultApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.default_api = api.FacebookAdsApi.get_default_api()
+        self.api = api.FacebookAdsApi(
+            session.FacebookSession(access_token='token'),
+        )
+
+    def test_use(self):
+        other_api = api.FacebookAdsApi(
+            session.FacebookSession(access_token='other'),
+        )
+        with api.FacebookAdsApi.use(self.api) as used_api:
+            self.assertIs(used_api, self.api)
+            self.assertIs(api.FacebookAdsApi.get_default_api(), self.api)
+            self.assertIs(ad.Ad('42')._api, self.api)
+            with api.FacebookAdsApi.use(other_api):
+                self.assertIs(api.FacebookAdsApi.get_default_api(), other_api)
+            self.assertIs(api.FacebookAdsApi.get_default_api(), self.api)
+        self.assertIs(api.FacebookAdsApi.get_default_api(), self.default_api)
+
+    def test_use_per_thread(self):
+        seen = {}
+        entered = threading.Event()
+        checked = threading.Event()
+
+        def run(name, fb_api):
+            with api.FacebookAdsApi.use(fb_api):
+                entered.wait()
+                seen[name] = api.FacebookAdsApi.get_default_api()
+                checked.set()
+
+        thread = threading.Thread(target=run, args=('thread', self.api))
+        thread.start()
+        entered.set()
+        checked.wait()
+        seen['main'] = api.FacebookAdsApi.get_default_api()
+        thread.join()
+        self.assertIs(seen['thread'], self.api)
+        self.assertIs(seen['main'], self.default_api)
+
+    def test_request_counters(self):
+        def count():
+            for _ in range(1000):
+                self.api._count_request_attempt()
+
+        threads = [threading.Thread(target=count) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.api.get_num_requests_attempted(), 8000)
+
+
+class BatchExecutorTestCase(unittest.TestCase):
+
+    def make_api(self, latency=0):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=lambda fb_session: _BatchTransport(fb_session, latency),
+        )
+        self.transport = fb_session.transport
+        return api.FacebookAdsApi(fb_session)
+
+    def make_requests(self, fb_api, node_ids):
+        return [
+            ad.Ad(node_id, api=fb_api).api_update(
+                params={'status': ad.Ad.Status.paused},
+                pending=True,
+            )
+            for node_id in node_ids
+        ]
+
+    def test_chunks(self):
+        fb_api = self.make_api()
+        node_ids = [str(i) for i in range(120)]
+        executor = BatchExecutor(fb_api, max_workers=2)
+        results = list(executor.execute(
+            iter(self.make_requests(fb_api, node_ids)),
+        ))
+        self.assertEqual(sorted(self.transport.batch_sizes), [20, 50, 50])
+        self.assertEqual(
+            [result.request._node_id for result in results],
+            node_ids,
+        )
+        self.assertTrue(all(result.is_success() for result in results))
+        self.assertIsInstance(results[0].result(), ad.Ad)
+
+    def test_result_without_response(self):
+        fb_api = self.make_api()
+        request = ad.Ad(42, api=fb_api).api_get(pending=True)
+        result = BatchResult(request)
+        self.assertEqual(repr(result), '<BatchResult failure 42/>')
+        self.assertFalse(result.is_success())
+        self.assertIsInstance(result.error(), exceptions.FacebookError)
+        self.assertRaises(exceptions.FacebookError, result.result)
+
+    def test_bounded_concurrency(self):
+        fb_api = self.make_api(latency=0.02)
+        executor = BatchExecutor(fb_api, batch_size=5, max_workers=3)
+        results = list(executor.execute(
+            self.make_requests(fb_api, [str(i) for i in range(60)]),
+        ))
+        self.assertEqual(len(results), 60)
+        self.assertEqual(len(self.transport.batch_sizes), 12)
+        self.assertTrue(1 < self.transport.max_in_flight <= 3)
+
+    def test_resubmit_transient_errors(self):
+        fb_api = self.make_api()
+        self.transport.transient = {'2': 1, '3': 5}
+        executor = BatchExecutor(
+            fb_api,
+            retry_policy=RetryPolicy(max_attempts=3, backoff_base=0),
+        )
+        results = list(executor.execute(
+            self.make_requests(fb_api, ['1', '2', '3']),
+        ))
+        self.assertEqual(self.transport.batch_sizes, [3, 2, 1])
+        self.assertEqual(
+            [result.is_success() for result in results],
+            [True, True, False],
+        )
+        self.assertTrue(results[2].response.is_transient())
+
+    def test_resubmit_with_api_retry_policy(self):
+        fb_api = self.make_api()
+        fb_api.set_retry_policy(RetryPolicy(max_attempts=3, backoff_base=0))
+        self.transport.transient = {'1': 1, '3': 5}
+        requests = self.make_requests(fb_api, ['1', '2'])
+        requests.append(ad.Ad('3', api=fb_api).api_get(pending=True))
+        executor = BatchExecutor(
+            fb_api,
+            retry_policy=RetryPolicy(max_attempts=3, backoff_base=0),
+        )
+        results = list(executor.execute(requests))
+        # The api retries the GET call, and the executor re-submits the
+        # update, which the api does not retry
+        self.assertEqual(self.transport.batch_sizes, [3, 1, 1, 1])
+        self.assertEqual(self.transport.transient, {'1': 0, '3': 2})
+        self.assertEqual(
+            [result.is_success() for result in results],
+            [True, True, False],
+        )
+
+    def test_failures(self):
+        fb_api = self.make_api()
+        results = list(BatchExecutor(fb_api).execute(
+            self.make_requests(fb_api, ['1', 'bad']),
+        ))
+        self.assertTrue(results[0].is_success())
+        self.assertFalse(results[1].is_success())
+        self.assertEqual(results[1].error().api_error_code(), 100)
+        with self.assertRaises(exceptions.FacebookRequestError):
+            results[1].result()
+
+    def test_batch_call_failure(self):
+        fb_api = self.make_api()
+        requests = self.make_requests(fb_api, ['1', '2'])
+
+        def fail(*args, **kwargs):
+            raise socket.timeout('timed out')
+
+        self.transport.send = fail
+        results = list(BatchExecutor(fb_api).execute(requests))
+        for result in results:
+            self.assertFalse(result.is_success())
+            self.assertIsInstance(result.error(), socket.timeout)
+            self.assertRaises(socket.timeout, result.result)
+
+    def test_batch_size(self):
+        self.assertRaises(ValueError, BatchExecutor, api.FacebookAdsApi(None),
+                          batch_size=51)
+
+    def test_adaptive_batch_size(self):
+        fb_api = self.make_api()
+        self.transport.timeouts = {'0': 1}
+        executor = BatchExecutor(
+            fb_api,
+            batch_size=8,
+            max_workers=1,
+            retry_policy=RetryPolicy(backoff_base=0),
+            adaptive=True,
+        )
+        self.assertEqual(executor.get_batch_size(), 8)
+        results = list(executor.execute(
+            self.make_requests(fb_api, [str(i) for i in range(40)]),
+        ))
+        self.assertTrue(all(result.is_success() for result in results))
+        # The timeout halves the size, the re-submitted call grows it by one
+        self.assertEqual(self.transport.batch_sizes[:3], [8, 1, 5])
+        self.assertEqual(sum(self.transport.batch_sizes), 41)
+
+    def test_adaptive_batch_size_bounds(self):
+        fb_api = self.make_api()
+        executor = BatchExecutor(fb_api, batch_size=10, adaptive=True,
+                                 min_batch_size=3, target_duration=1)
+        sizer = executor._sizer
+        sizer.shrink()
+        self.assertEqual(executor.get_batch_size(), 5)
+        sizer.shrink()
+        sizer.shrink()
+        self.assertEqual(executor.get_batch_size(), 3)
+        sizer.grow(2)
+        self.assertEqual(executor.get_batch_size(), 3)
+        for _ in range(10):
+            sizer.grow(0.5)
+        self.assertEqual(executor.get_batch_size(), 10)
+        self.assertEqual(
+            BatchExecutor(fb_api, batch_size=10).get_batch_size(),
+            10,
+        )
+        self.assertRaises(ValueError, BatchExecutor, fb_api, batch_size=10,
+                          adaptive=True, min_batch_size=11)
+
+
+class AutoBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        fb_session = session.FacebookSession(
+            access_token='token',
+            transport=_BatchTransport,
+        )
+        self.transport = fb_session.transport
+        self.api = api.FacebookAdsApi(fb_session)
+
+    def pause(self, node_id):
+        return ad.Ad(node_id, api=self.api).api_update(
+            params={'status': ad.Ad.Status.paused},
+        )
+
+    def test_batches(self):
+        with self.api.auto_batch(max_size=2) as auto_batch:
+            self.assertIs(self.api.get_auto_batch(), auto_batch)
+            futures = [self.pause(str(i)) for i in range(5)]
+            self.assertEqual(self.transport.batch_sizes, [2, 2])
+        self.assertIsNone(self.api.get_auto_batch())
+        self.assertEqual(self.transport.batch_sizes, [2, 2, 1])
+        for future in futures:
+            self.assertIsInstance(future, api.FacebookBatchFuture)
+            self.assertIsInstance(future.result(), ad.Ad)
+        self.assertIsInstance(self.pause('6'), ad.Ad)
+        self.assertEqual(len(self.transport.single_calls), 1)
+
+    def test_result_executes_batch(self):
+        with self.api.auto_batch():
+            self.pause('1')
+            future = self.pause('bad')
+            self.assertFalse(future.done())
+            with self.assertRaises(exceptions.FacebookRequestError):
+                future.result()
+            self.assertEqual(self.transport.batch_sizes, [2])
+            self.pause('2')
+        self.assertEqual(self.transport.batch_sizes, [2, 1])
+
+    def test_remote_create(self):
+        with self.api.auto_batch():
+            ad_object = ad.Ad(parent_id='act_1', api=self.api)
+            ad_object[ad.Ad.Field.name] = 'Ad'
+            self.assertIs(ad_object.remote_create(), ad_object)
+            self.assertEqual(self.transport.batch_sizes, [1])
+
+    def test_remote_read(self):
+        with self.api.auto_batch():
+            ad_object = ad.Ad('1', api=self.api).remote_read()
+            self.assertIsInstance(ad_object, ad.Ad)
+            self.assertEqual(self.transport.batch_sizes, [1])
+
+    def test_remote_update(self):
+        with self.api.auto_batch():
+            ad_object = ad.Ad('bad', api=self.api)
+            ad_object[ad.Ad.Field.name] = 'Ad'
+            with self.assertRaises(exceptions.FacebookRequestError):
+                ad_object.remote_update()
+            ad_object = ad.Ad('1', api=self.api)
+            ad_object[ad.Ad.Field.name] = 'Ad'
+            self.assertIs(ad_object.remote_update(), ad_object)
+            self.assertEqual(ad_object.export_changed_data(), {})
+        self.assertEqual(self.transport.batch_sizes, [1, 1])
+
+    def test_remote_delete(self):
+        with self.api.auto_batch():
+            ad_object = ad.Ad('bad', api=self.api)
+            with self.assertRaises(exceptions.FacebookRequestError):
+                ad_object.remote_delete()
+            self.assertEqual(ad_object.get_id(), 'bad')
+            ad_object = ad.Ad('1', api=self.api)
+            ad_object.remote_delete()
+            self.assertNotIn('id', ad_object.export_all_data())
+        self.assertEqual(self.transport.batch_sizes, [1, 1])
+
+    def test_max_delay(self):
+        with self.api.auto_batch(max_delay_ms=10):
+            future = self.pause('1')
+            for _ in range(100):
+                if future.done():
+                    break
+                time.sleep(0.01)
+            self.assertEqual(self.transport.batch_sizes, [1])
+        self.assertTrue(future.result())
+
+    def test_failed_batch(self):
+        class FailingTransport(transport.Transport):
+            def __init__(self, session):
+                pass
+
+            def send(self, method, url, **kwargs):
+                raise OSError('connection reset')
+
+        fb_api = api.FacebookAdsApi(session.FacebookSession(
+            access_token='token',
+            transport=FailingTransport,
+        ))
+        with fb_api.auto_batch(max_size=2):
+            futures = [
+                ad.Ad(node_id, api=fb_api).api_update(
+                    params={'status': ad.Ad.Status.paused},
+                )
+                for node_id in ('1', '2', '3')
+            ]
+        with fb_api.auto_batch(max_delay_ms=10):
+            delayed = ad.Ad('4', api=fb_api).api_delete()
+            for _ in range(100):
+                if delayed.done():
+                    break
+                time.sleep(0.01)
+            self.assertTrue(delayed.done())
+        for future in futures + [delayed]:
+            six.assertRaisesRegex(
+                self, OSError, 'connection reset', future.result,
+            )
+
+    def test_not_batched(self):
+        with self.api.auto_batch():
+            cursor = adaccount.AdAccount('act_1', api=self.api).get_ads()
+            self.assertIsInstance(cursor, api.Cursor)
+
+            def other_thread():
+                self.pause('2')
+
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            self.assertEqual(len(self.transport.single_calls), 2)
+            self.assertEqual(self.transport.batch_sizes, [])
+
+    def test_nested(self):
+        with self.api.auto_batch() as outer:
+            with self.api.auto_batch() as inner:
+                self.assertIs(self.api.get_auto_batch(), inner)
+                self.pause('1')
+            self.assertEqual(self.transport.batch_sizes, [1])
+            self.assertIs(self.api.get_auto_batch(), outer)
+
+    def test_max_size(self):
+        self.assertRaises(ValueError, self.api.auto_batch, max_size=51)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not available')
+class HTTPXTransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = GraphServer(record=True).start()
+        self.addCleanup(self.server.stop)
+        with warnings.catch_warnings():
+            # h2 may not be installed
+            warnings.simplefilter('ignore')
+            self.session = session.FacebookSession(
+                access_token='token',
+                transport=transport.HTTPXTransport,
+            )
+        self.session.GRAPH = self.server.url
+        self.api = api.FacebookAdsApi(self.session)
+
+    def tearDown(self):
+        self.session.transport.close()
+
+    def test_get(self):
+        response = self.api.call('GET', ('42',), params={'fields': ['name']})
+        self.assertEqual(response.json(), {'id': '42', 'name': 'name of 42'})
+        method, path, params = self.server.received[0]
+        self.assertEqual(params['access_token'], 'token')
+        self.assertEqual(params['fields'], '["name"]')
+
+    def test_post(self):
+        response = self.api.call('POST', ('42',), params={'name': 'foo',
+                                                          'count': 2})
+        self.assertEqual(response.json(), {'success': True})
+        self.assertEqual(self.server.received, [
+            ('POST', '/v7.0/42',
+             {'access_token': 'token', 'name': 'foo', 'count': '2'}),
+        ])
+
+    def test_failure(self):
+        with self.assertRaises(exceptions.FacebookRequestError) as context:
+            self.api.call('GET', ('42', 'ads', 'unknown'))
+        self.assertEqual(context.exception.api_error_code(), 100)
+
+    def test_ca_bundle(self):
+        self.session.requests.verify = requests.certs.where()
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            response = self.api.call('GET', ('42',))
+        self.assertEqual(response.json()['id'], '42')
+        self.assertIsInstance(self.session.transport._get_verify(),
+                              ssl.SSLContext)
+        self.session.requests.verify = False
+        self.assertIs(self.session.transport._get_verify(), False)
+
+
+@unittest.skipIf(asyncapi is None, 'aiohttp is not available')
+class AsyncFacebookAdsApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        import asyncio
+        self.server = GraphServer(edge_size=3, page_size=2,
+                                  record=True).start()
+        self.addCleanup(self.server.stop)
+        fb_session = session.FacebookSession(access_token='token')
+        fb_session.GRAPH = self.server.url
+        self.api = asyncapi.AsyncFacebookAdsApi(fb_session)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.api.close())
+        self.loop.close()
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def test_call(self):
+        response = self.run_async(
+            self.api.call('GET', ('42',), params={'fields': ['name']}),
+        )
+        self.assertEqual(response.json(), {'id': '42', 'name': 'name of 42'})
+        method, path, params = self.server.received[0]
+        self.assertEqual(path, '/v7.0/42')
+        self.assertEqual(params['access_token'], 'token')
+        self.assertEqual(params['fields'], '["name"]')
+        self.assertEqual(self.api.get_num_requests_succeeded(), 1)
+
+    def test_call_failure(self):
+        with self.assertRaises(exceptions.FacebookRequestError) as context:
+            self.run_async(self.api.call('GET', ('42', 'ads', 'unknown')))
+        self.assertEqual(context.exception.api_error_code(), 100)
+
+    def test_retries(self):
+        hook = _RecordingHook()
+        fb_api = asyncapi.AsyncFacebookAdsApi(
+            self.api._session,
+            retry_policy=RetryPolicy(max_attempts=2, backoff_base=0,
+                                     retryable_codes=[100]),
+            hooks=[hook],
+        )
+        with self.assertRaises(exceptions.FacebookRequestError):
+            self.run_async(fb_api.call('GET', ('42', 'ads', 'unknown')))
+        self.run_async(fb_api.close())
+        self.assertEqual(len(self.server.received), 2)
+        self.assertEqual(hook.events, [
+            'before_request', ('after_response', 400), ('on_retry', 1),
+            'before_request', ('after_response', 400), ('on_error', 100),
+        ])
+
+    def test_node_read(self):
+        obj = self.run_async(ad.Ad('42', api=self.api).api_get(fields=['name']))
+        self.assertIsInstance(obj, ad.Ad)
+        self.assertEqual(obj['name'], 'name of 42')
+
+    def test_edge_iteration(self):
+        account = adaccount.AdAccount('act_1', api=self.api)
+        cursor = self.run_async(account.get_ads(fields=['id']))
+        self.assertIsInstance(cursor, asyncapi.AsyncCursor)
+        ids = []
+        while True:
+            try:
+                ids.append(self.run_async(cursor.__anext__()).get_id())
+            except StopAsyncIteration:
+                break
+        self.assertEqual(ids, ['6000000000000', '6000000000001',
+                               '6000000000002'])
+        self.assertEqual(len(self.server.received), 2)
+        self.assertRaises(TypeError, iter, cursor)
+
+    def test_batch_futures(self):
+        import asyncio
+        batch = self.api.new_batch()
+        self.assertIsInstance(batch, asyncapi.AsyncFacebookAdsApiBatch)
+        found = batch.add_request(
+            ad.Ad('42', api=self.api).api_get(fields=['name'], pending=True),
+        )
+        unknown = batch.add_request(api.FacebookRequest(
+            node_id='42',
+            method='DELETE',
+            endpoint='/ads',
+            api=self.api,
+            target_class=ad.Ad,
+        ))
+        waiting = asyncio.ensure_future(found, loop=self.loop)
+        self.assertIsNone(self.run_async(batch.execute()))
+        self.assertEqual(len(self.server.received), 1)
+        obj = self.run_async(waiting)
+        self.assertIsInstance(obj, ad.Ad)
+        self.assertEqual(obj['name'], 'name of 42')
+        with self.assertRaises(exceptions.FacebookRequestError):
+            self.run_async(unknown)
+
+    def test_sync_entry_points(self):
+        ad_object = ad.Ad('42', api=self.api)
+        ad_object[ad.Ad.Field.name] = 'foo'
+        self.assertRaises(TypeError, ad_object.remote_update)
+        self.assertRaises(TypeError, ad_object.remote_read)
+        self.assertRaises(TypeError, ad.Ad.get_by_ids, ['42'], api=self.api)
+        account = adaccount.AdAccount('act_1', api=self.api)
+        self.assertRaises(TypeError, account.iterate_edge, ad.Ad)
+        video = advideo.AdVideo(parent_id='act_1', api=self.api)
+        video[advideo.AdVideo.Field.filepath] = __file__
+        self.assertRaises(TypeError, video.remote_create)
+        self.assertEqual(self.server.received, [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+'''
+Unit tests of the asyncapi module written as coroutines, kept out of unit.py
+for it to compile on Python 2. They are run along with the other unit tests:
+    python -m facebook_business.test.unit
+'''
+
+import asyncio
+import unittest
+
+from facebook_business import asyncapi
+from facebook_business import session
+from facebook_business.test.graphserver import GraphServer
+
+
+class AsyncCoroutinesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = GraphServer().start()
+        self.addCleanup(self.server.stop)
+        # aiohttp sends the calls of AsyncFacebookAdsApi, not the transport
+        # of the session
+        self.session = session.FacebookSession(access_token='token')
+        self.session.GRAPH = self.server.url
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def test_coalesce_reads(self):
+        fb_api = asyncapi.AsyncFacebookAdsApi(
+            self.session,
+            coalesce_reads=True,
+        )
+
+        async def read():
+            async with fb_api:
+                return await asyncio.gather(*[
+                    fb_api.call('GET', ('42',), params={'fields': ['name']})
+                    for _ in range(5)
+                ])
+
+        responses = self.run_async(read())
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(responses[4].json(), responses[0].json())
+        self.assertEqual(responses[4].json()['id'], '42')
+        self.assertEqual(fb_api.get_num_requests_succeeded(), 5)
+
+    def test_use_per_task(self):
+        apis = [asyncapi.AsyncFacebookAdsApi(self.session) for _ in range(2)]
+
+        async def run(fb_api):
+            with asyncapi.AsyncFacebookAdsApi.use(fb_api):
+                await asyncio.sleep(0)
+                return asyncapi.AsyncFacebookAdsApi.get_default_api()
+
+        async def run_all():
+            return await asyncio.gather(*[run(fb_api) for fb_api in apis])
+
+        self.assertEqual(self.run_async(run_all()), apis)
+
+
+if __name__ == '__main__':
+    unittest.main()
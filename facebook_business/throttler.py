@@ -0,0 +1,272 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+throttler module contains the Throttler used by FacebookAdsApi to pace its
+calls according to the rate limit usage reported by the Graph API.
+
+Example:
+    >>> api = FacebookAdsApi.init(access_token=token, throttler=Throttler())
+"""
+
+import threading
+import time
+
+from six.moves import urllib
+
+from facebook_business.utils import api_utils, jsoncodec
+
+
+class Throttler(object):
+
+    """Keeps a model of the rate limit usage reported in the X-App-Usage,
+    X-Ad-Account-Usage and X-Business-Use-Case-Usage response headers, and
+    tells how long to wait before a call to stay under the limits.
+
+    Usage is tracked per scope: the app, each ad account, and each business
+    use case (a business object id and a type such as 'ads_management').
+    A call is paced by the scopes it falls in: the app, the ad account in its
+    path, and the business use cases of the ids in its path.
+
+    Usages are percentages of the limit over a rolling window, so they are
+    assumed to decrease linearly over that window once reported. Below
+    threshold calls are not delayed. Above it, the delay grows linearly up to
+    max_delay at 100%. When a scope is blocked (estimated_time_to_regain_access
+    or reset_time_duration), calls wait for it to be lifted, for max_wait
+    seconds at most.
+
+    The throttler is thread safe and can be shared by several apis using the
+    same app. The usages of the scopes which are neither blocked nor used any
+    more after a window are forgotten.
+    """
+
+    APP = 'app'
+    AD_ACCOUNT = 'ad_account'
+    BUSINESS_USE_CASE = 'business_use_case'
+
+    # The interval, in seconds, between two removals of the usages which
+    # ran out
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        threshold=75.0,
+        max_delay=10.0,
+        max_wait=300.0,
+        window=3600.0,
+    ):
+        """Initializes the throttler.
+        Args:
+            threshold (optional): The usage, in percent, above which calls
+                are delayed.
+            max_delay (optional): The delay, in seconds, of a call when the
+                usage reaches 100%.
+            max_wait (optional): The longest wait, in seconds, for a blocked
+                scope to be lifted.
+            window (optional): The time, in seconds, the usage takes to go
+                back to 0 once reported.
+        """
+        self.threshold = threshold
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.window = window
+        self._lock = threading.Lock()
+        # The scopes of an object, e.g. ('ad_account', '123') or
+        # ('business_use_case', '123'), and the app scope ('app',) ->
+        # {scope: (usage, reported at, blocked until)}
+        self._usages = {}
+        self._next_prune = 0
+
+    def update(self, response):
+        """Records the usage reported in the headers of a FacebookResponse."""
+        headers = response.headers()
+        now = self._now()
+        updates = {}
+
+        app_usage = _load_header(headers, 'X-App-Usage')
+        if isinstance(app_usage, dict):
+            updates[(self.APP,)] = (_max_usage(app_usage), 0)
+
+        account_usage = _load_header(headers, 'X-Ad-Account-Usage')
+        account_id = _get_account_id(_get_call_path(response))
+        if isinstance(account_usage, dict) and account_id is not None:
+            usage = _to_float(account_usage.get('acc_id_util_pct'))
+            blocked_for = 0
+            if usage >= 100:
+                blocked_for = _to_float(
+                    account_usage.get('reset_time_duration'))
+            updates[(self.AD_ACCOUNT, account_id)] = (usage, blocked_for)
+
+        business_usage = _load_header(headers, 'X-Business-Use-Case-Usage')
+        if isinstance(business_usage, dict):
+            for object_id, entries in business_usage.items():
+                if not isinstance(entries, list):
+                    continue
+                for entry in entries:
+                    if not isinstance(entry, dict):
+                        continue
+                    scope = (
+                        self.BUSINESS_USE_CASE,
+                        str(object_id),
+                        entry.get('type'),
+                    )
+                    blocked_for = 60 * _to_float(
+                        entry.get('estimated_time_to_regain_access'))
+                    updates[scope] = (_max_usage(entry), blocked_for)
+
+        if updates:
+            with self._lock:
+                for scope, (usage, blocked_for) in updates.items():
+                    self._usages.setdefault(scope[:2], {})[scope] = (
+                        usage,
+                        now,
+                        now + blocked_for,
+                    )
+                if now >= self._next_prune:
+                    self._prune(now)
+                    self._next_prune = now + self.PRUNE_INTERVAL
+
+    def get_delay(self, path, include_app=True):
+        """Returns the delay, in seconds, before making a call to path, a
+        full URL, a relative URL or a tuple of path tokens.
+        Args:
+            path: The path of the call.
+            include_app (optional): Whether to pace the call by the app usage
+                too, rather than only by the ad account and business use case
+                usages.
+        """
+        keys = self._get_scopes(path, include_app)
+        now = self._now()
+        delay = 0
+        with self._lock:
+            entries = [
+                entry
+                for key in keys
+                for entry in self._usages.get(key, {}).values()
+            ]
+        for usage, reported_at, blocked_until in entries:
+            if blocked_until > now:
+                delay = max(delay, min(blocked_until - now, self.max_wait))
+                continue
+            usage = self._decay(usage, now - reported_at)
+            if usage > self.threshold:
+                delay = max(delay, self.max_delay * min(
+                    1.0,
+                    (usage - self.threshold) / (100.0 - self.threshold),
+                ))
+        return delay
+
+    def get_usages(self):
+        """Returns the current estimated usage of each scope, in percent,
+        keyed by tuples such as ('app',), ('ad_account', '123') or
+        ('business_use_case', '123', 'ads_management')."""
+        now = self._now()
+        with self._lock:
+            return dict(
+                (scope, self._decay(usage, now - reported_at))
+                for scopes in self._usages.values()
+                for scope, (usage, reported_at, _) in scopes.items()
+            )
+
+    def _prune(self, now):
+        """Removes the usages which are not blocked and have decayed to 0.
+        Must be called with the lock held."""
+        if self.window <= 0:
+            return
+        for key, scopes in list(self._usages.items()):
+            for scope, (_, reported_at, blocked_until) in list(scopes.items()):
+                if blocked_until <= now and now - reported_at >= self.window:
+                    del scopes[scope]
+            if not scopes:
+                del self._usages[key]
+
+    def _decay(self, usage, elapsed):
+        if self.window <= 0:
+            return usage
+        return usage * max(0.0, 1.0 - float(elapsed) / self.window)
+
+    def _get_scopes(self, path, include_app):
+        """Returns the keys of self._usages pacing a call to path."""
+        scopes = set([(self.APP,)]) if include_app else set()
+        ids = _get_path_ids(path)
+        for object_id in ids:
+            scopes.add((self.AD_ACCOUNT, object_id))
+            scopes.add((self.BUSINESS_USE_CASE, object_id))
+        return scopes
+
+    def _now(self):
+        return time.time()
+
+
+def _load_header(headers, name):
+    value = api_utils.get_header(headers, name)
+    if not value:
+        return None
+    try:
+        return jsoncodec.loads(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _max_usage(usage):
+    return max(
+        _to_float(usage.get('call_count')),
+        _to_float(usage.get('total_cputime')),
+        _to_float(usage.get('total_time')),
+    )
+
+
+def _get_call_path(response):
+    call = response._call or {}
+    return call.get('path') or call.get('relative_url')
+
+
+def _get_path_tokens(path):
+    if path is None:
+        return []
+    if not isinstance(path, (tuple, list)):
+        path = urllib.parse.urlparse(path).path.split('/')
+    return [str(token) for token in path]
+
+
+def _get_path_ids(path):
+    """Returns the numeric ids of a path, ad account ids without 'act_'."""
+    ids = []
+    for token in _get_path_tokens(path):
+        if token.startswith('act_'):
+            token = token[len('act_'):]
+        if token.isdigit():
+            ids.append(token)
+    return ids
+
+
+def _get_account_id(path):
+    """Returns the id, without 'act_', of the ad account of a path."""
+    for token in _get_path_tokens(path):
+        if token.startswith('act_') and token[len('act_'):].isdigit():
+            return token[len('act_'):]
+    return None
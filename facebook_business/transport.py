@@ -0,0 +1,456 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+transport module contains the classes sending the http requests of
+FacebookAdsApi calls.
+
+A transport is set on the FacebookSession, with a class or any callable taking
+the session and returning a Transport:
+    >>> FacebookAdsApi.init(access_token=token, transport=HTTPXTransport)
+
+    RequestsTransport (default): sends requests with the session's requests
+        object, over HTTP/1.1.
+    HTTPXTransport: sends requests with httpx, multiplexing them over HTTP/2
+        connections. It requires the `httpx` and `h2` packages:
+            pip install facebook_business[http2]
+    RecordingTransport: sends requests with another transport and records
+        the exchanges to a cassette file.
+    ReplayTransport: answers requests with the responses recorded in a
+        cassette file, without any network access.
+
+Example:
+    >>> session = FacebookSession(
+    ...     access_token=token,
+    ...     transport=functools.partial(RecordingTransport, path='calls.json'),
+    ... )
+    >>> api = FacebookAdsApi(session)
+    >>> # ... make calls
+    >>> session.transport.close()
+    >>> # Later, offline
+    >>> api = FacebookAdsApi.init(
+    ...     access_token=token,
+    ...     transport=functools.partial(ReplayTransport, path='calls.json'),
+    ... )
+"""
+
+from abc import ABCMeta, abstractmethod
+
+import collections
+import json
+import os
+import re
+import ssl
+import threading
+import time
+import warnings
+
+import six
+
+from facebook_business.exceptions import FacebookError
+from facebook_business.utils import urls
+
+
+@six.add_metaclass(ABCMeta)
+class Transport(object):
+
+    """Interface of the transports. A transport is shared by all the threads
+    using its session, so send() must be thread safe."""
+
+    @abstractmethod
+    def send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        files=None,
+        timeout=None,
+    ):
+        """Sends an http request.
+        Args:
+            method: The HTTP method name (e.g. 'GET').
+            url: The full URL.
+            params (optional): A mapping of query string parameters, to add to
+                those of the session (access_token, appsecret_proof).
+            data (optional): A mapping of form parameters.
+            headers (optional): A mapping of request headers.
+            files (optional): A mapping of names to open files, sent as a
+                multipart form along with data.
+            timeout (optional): A requests style timeout: None, a number of
+                seconds, or a (connect, read) tuple.
+        Returns:
+            An object with status_code, headers and text attributes, like
+            TransportResponse or requests.Response.
+        """
+        pass
+
+    def close(self):
+        """Releases the connections of the transport."""
+        pass
+
+
+class TransportResponse(object):
+
+    """The http response returned by a transport."""
+
+    def __init__(self, status_code, headers, text, request=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.request = request
+
+
+class RequestsTransport(Transport):
+
+    """Sends requests through the requests Session of a FacebookSession,
+    which holds the access token, proxies, CA bundle and connection pools."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        files=None,
+        timeout=None,
+    ):
+        kwargs = {}
+        if params is not None:
+            kwargs['params'] = params
+        if data is not None:
+            kwargs['data'] = data
+        return self._session.requests.request(
+            method,
+            url,
+            headers=headers,
+            files=files,
+            timeout=timeout,
+            **kwargs
+        )
+
+    def close(self):
+        self._session.requests.close()
+
+
+class HTTPXTransport(Transport):
+
+    """Sends requests with an httpx Client over HTTP/2, so that concurrent
+    calls share a few multiplexed connections instead of one connection each.
+    It uses the access token, proxies and CA bundle of the FacebookSession,
+    but not its requests connection pools. Falls back to HTTP/1.1 with a
+    warning if the h2 package is not installed.
+    """
+
+    def __init__(
+        self,
+        session,
+        http2=True,
+        max_connections=10,
+        max_keepalive_connections=10,
+    ):
+        """Initializes the transport.
+        Args:
+            session: The FacebookSession.
+            http2 (optional): Whether to use HTTP/2.
+            max_connections (optional): The maximum number of connections.
+            max_keepalive_connections (optional): The maximum number of idle
+                connections kept.
+        """
+        import httpx
+        self._httpx = httpx
+        self._session = session
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                warnings.warn(
+                    "The h2 package is not installed, HTTPXTransport falls "
+                    "back to HTTP/1.1.",
+                )
+                http2 = False
+        self._http2 = http2
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    kwargs = {}
+                    proxies = self._session.proxies or {}
+                    proxy = proxies.get('https') or proxies.get('http')
+                    if proxy:
+                        kwargs['proxy'] = proxy
+                    self._client = self._httpx.Client(
+                        http2=self._http2,
+                        limits=self._limits,
+                        verify=self._get_verify(),
+                        **kwargs
+                    )
+        return self._client
+
+    def _get_verify(self):
+        """Returns the verify setting of the session for httpx, which takes
+        an SSL context rather than the path of a CA bundle."""
+        verify = self._session.requests.verify
+        if not isinstance(verify, six.string_types):
+            return verify
+        if os.path.isdir(verify):
+            return ssl.create_default_context(capath=verify)
+        return ssl.create_default_context(cafile=verify)
+
+    def send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        files=None,
+        timeout=None,
+    ):
+        # Session level params are merged in by requests in RequestsTransport
+        query = stringify_params(self._session.requests.params)
+        query.update(stringify_params(params))
+        response = self._get_client().request(
+            method,
+            url,
+            params=query,
+            data=stringify_params(data) or None,
+            files=files or None,
+            headers=headers,
+            timeout=self._get_timeout(timeout),
+        )
+        return TransportResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            text=response.text,
+            request=response.request,
+        )
+
+    def _get_timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(None, connect=connect, read=read)
+        return self._httpx.Timeout(timeout)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+# Stands for the access token and appsecret proof in recorded responses
+REDACTED = 'REDACTED'
+
+_SECRET_PARAM = re.compile(
+    r'\b(%s)=[^&"\'\s\\]+' % '|'.join(urls.SECRET_PARAMS),
+)
+
+
+class RecordingTransport(Transport):
+
+    """Sends requests with another transport and records the exchanges, to
+    be saved to a cassette file for ReplayTransport. The access token and
+    appsecret proof are not recorded, whether they are session level params
+    or in the paging URLs of the requests and responses, nor are the
+    uploaded files.
+    """
+
+    def __init__(self, session, path, transport=RequestsTransport):
+        """Initializes the transport.
+        Args:
+            session: The FacebookSession.
+            path: The cassette file, written by save() and close().
+            transport (optional): The Transport class, or callable taking the
+                session, sending the requests.
+        """
+        self._transport = transport(session)
+        self._path = path
+        self._exchanges = []
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        files=None,
+        timeout=None,
+    ):
+        response = self._transport.send(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            files=files,
+            timeout=timeout,
+        )
+        exchange = {
+            'request': _get_recorded_request(method, url, params, data),
+            'response': {
+                'status_code': response.status_code,
+                'headers': dict(
+                    (name, value) for name, value in response.headers.items()
+                    if name.lower() != 'set-cookie'
+                ),
+                'text': _redact_secret_params(response.text),
+            },
+        }
+        with self._lock:
+            self._exchanges.append(exchange)
+        return response
+
+    def save(self):
+        """Writes the exchanges recorded so far to the cassette file."""
+        with self._lock:
+            cassette = {'version': 1, 'exchanges': list(self._exchanges)}
+        with open(self._path, 'w') as cassette_file:
+            json.dump(cassette, cassette_file, indent=1, sort_keys=True)
+
+    def close(self):
+        self.save()
+        self._transport.close()
+
+
+class ReplayTransport(Transport):
+
+    """Answers requests with the responses recorded by RecordingTransport.
+    A request is matched on its method, URL, params and form data. The
+    responses recorded for the same request are returned in order, the last
+    one being repeated once they are exhausted, so that a cassette can be
+    replayed any number of times, e.g. by benchmarks.
+    Requests with no recorded response raise a FacebookError.
+    """
+
+    def __init__(self, session, path=None, exchanges=None, latency=0):
+        """Initializes the transport.
+        Args:
+            session: The FacebookSession.
+            path (optional): The cassette file.
+            exchanges (optional): The recorded exchanges, instead of path.
+            latency (optional): The delay, in seconds, of each response.
+        """
+        if exchanges is None:
+            with open(path, 'r') as cassette_file:
+                exchanges = json.load(cassette_file)['exchanges']
+        self._responses = collections.defaultdict(collections.deque)
+        for exchange in exchanges:
+            key = _get_replay_key(exchange['request'])
+            self._responses[key].append(exchange['response'])
+        self._latency = latency
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        files=None,
+        timeout=None,
+    ):
+        key = _get_replay_key(
+            _get_recorded_request(method, url, params, data),
+        )
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise FacebookError(
+                    "No recorded response to %s %s" % (method, url),
+                )
+            response = responses[0]
+            if len(responses) > 1:
+                responses.popleft()
+        if self._latency:
+            time.sleep(self._latency)
+        return TransportResponse(
+            status_code=response['status_code'],
+            headers=response['headers'],
+            text=response['text'],
+        )
+
+
+def _get_recorded_request(method, url, params, data):
+    return {
+        'method': method,
+        'url': urls.split_secret_params(url)[0],
+        'params': _without_secret_params(stringify_params(params)),
+        'data': _without_secret_params(stringify_params(data)),
+    }
+
+
+def _redact_secret_params(text):
+    """Replaces the values of the secret params in the URLs of text, such
+    as the paging URLs of a response."""
+    if not text:
+        return text
+    return _SECRET_PARAM.sub(r'\1=' + REDACTED, text)
+
+
+def _without_secret_params(params):
+    return dict(
+        (key, value) for key, value in params.items()
+        if key not in urls.SECRET_PARAMS
+    )
+
+
+def _get_replay_key(request):
+    return (
+        request['method'],
+        request['url'],
+        tuple(sorted(request['params'].items())),
+        tuple(sorted(request['data'].items())),
+    )
+
+
+def stringify_params(params):
+    """Returns params with string values, leaving out None values like
+    requests does."""
+    return dict(
+        (key, value if isinstance(value, six.string_types) else str(value))
+        for key, value in (params or {}).items()
+        if value is not None
+    )
+
+
+__all__ = [
+    'Transport',
+    'TransportResponse',
+    'RequestsTransport',
+    'HTTPXTransport',
+    'RecordingTransport',
+    'ReplayTransport',
+]
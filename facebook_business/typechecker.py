@@ -34,6 +34,11 @@ class TypeChecker:
     You may change the setting in apiconfig.py. Under STRICT mode, any check
     failures will throw exception. Under non-STRICT mode, failures will result
     in warning messages.
+
+    Type strings are parsed once: the checks of each type and the converters of
+    each key are compiled on first use and cached, so that a TypeChecker shared
+    by all the instances of a class (see AbstractObject._get_field_checker)
+    only pays for parsing once.
     """
 
     primitive_types = set(["unsigned int", "int", "bool", "string", "Object",
@@ -41,31 +46,39 @@ class TypeChecker:
 
     def __init__(self, type_check_info, type_check_enum):
         self._type_check_info = type_check_info
-        self._enum_data = type_check_enum
+        self._enum_data = dict(
+            (enum_type, _compile_enum(values))
+            for enum_type, values in type_check_enum.items()
+        )
+        self._type_checks = {}
+        self._converters = {}
 
     def is_primitive_type(self, type):
         return (type in self.primitive_types) or (type in self._enum_data)
 
     def convert_string_to_prim_type(self, primitive_type, value):
+        return self._compile_prim_type_converter(primitive_type)(value)
+
+    def _compile_prim_type_converter(self, primitive_type):
         if primitive_type in self._enum_data:
-            return value
+            return _identity
         elif primitive_type in ("unsigned int", "int"):
-            return int(value)
+            return int
         elif primitive_type == "bool":
-            if value in ("false", "0", "null"):
-                return False
-            return True
+            return _string_to_bool
         elif primitive_type == "float":
-            return float(value)
+            return float
         elif primitive_type == "datetime":
-            return value
+            return _identity
         elif primitive_type == "string":
-            return str(value)
+            return str
         elif primitive_type == "Object":
-            return value
+            return _identity
         else:
-            raise FacebookBadParameterTypeException('Fail to convert from ' +
-                value.__class__.__name__ + ' to ' + str(primitive_type))
+            def fail(value):
+                raise FacebookBadParameterTypeException('Fail to convert from ' +
+                    value.__class__.__name__ + ' to ' + str(primitive_type))
+            return fail
 
     def get_type(self, param):
         if param not in self._type_check_info:
@@ -85,52 +98,96 @@ class TypeChecker:
     def is_type(self, value_type, value, allow_dict_as_obj=True):
         if value is None or value_type is None:
             return True
+        return self._get_type_check(value_type)(value, allow_dict_as_obj)
+
+    def _get_type_check(self, value_type):
+        check = self._type_checks.get(value_type)
+        if check is None:
+            check = self._compile_type_check(value_type)
+            self._type_checks[value_type] = check
+        return check
 
+    def _compile_type_check(self, value_type):
+        """Returns a check(value, allow_dict_as_obj) callable equivalent to
+        is_type(value_type, ...) for non None values."""
         if value_type in self._enum_data:
-            return value in self._enum_data[value_type]
+            enum_values = self._enum_data[value_type]
+
+            def check_enum(value, allow_dict_as_obj):
+                try:
+                    return value in enum_values
+                except TypeError:
+                    # unhashable values are never enum values
+                    return False
+            return check_enum
         if value_type == 'file':
-            return os.path.isfile(value)
+            return lambda value, allow_dict_as_obj: os.path.isfile(value)
         if value_type == 'list':
-            return isinstance(value, list)
+            return lambda value, allow_dict_as_obj: isinstance(value, list)
 
-        if isinstance(value, dict) and value_type in ['map', 'Object']:
-            return True
-        if isinstance(value, bool):
-            return value_type in ['bool']
-        if isinstance(value, six.string_types):
-            if value_type in ['string', 'unicode', 'file', 'datetime']:
+        dict_is_valid = value_type in ['map', 'Object']
+        bool_is_valid = value_type in ['bool']
+        any_string_is_valid = value_type in ['string', 'unicode', 'datetime']
+        bool_string_is_valid = value_type == 'bool'
+        digit_string_is_valid = value_type in ['int', 'unsigned int', 'float']
+        number_is_valid = value_type in [
+            'int', 'unsigned int', 'float', 'string', 'datetime']
+        if self.is_type_collection(value_type, 'list'):
+            sub_type = self.get_type_from_collection(value_type, 'list')[0]
+            check_collection = self._compile_list_check(sub_type)
+        elif self.is_type_collection(value_type, 'map'):
+            sub_types = self.get_type_from_collection(value_type, 'map')
+            check_collection = self._compile_map_check(sub_types)
+        else:
+            check_collection = None
+        ad_object_marker = '_is' + value_type
+
+        def check(value, allow_dict_as_obj):
+            if isinstance(value, dict) and dict_is_valid:
                 return True
-            elif value_type == 'bool' and value in ['true', 'false']:
+            if isinstance(value, bool):
+                return bool_is_valid
+            if isinstance(value, six.string_types):
+                if any_string_is_valid:
+                    return True
+                elif bool_string_is_valid and value in ['true', 'false']:
+                    return True
+                elif digit_string_is_valid:
+                    return value.isdigit()
+                else:
+                    return False
+            if isinstance(value, (int, float)):
+                return number_is_valid
+
+            if check_collection is not None:
+                return check_collection(value)
+
+            if (type(value).__name__ == value_type or
+                        hasattr(value, ad_object_marker)):
                 return True
-            elif value_type in ['int', 'unsigned int', 'float']:
-                return value.isdigit()
-            else:
-                return False
-        if isinstance(value, (int, float)):
-            return value_type in ['int', 'unsigned int', 'float', 'string', 'datetime']
 
-        if self.is_type_collection(value_type, 'list'):
+            if allow_dict_as_obj and isinstance(value, dict):
+                return self._type_is_ad_object(value_type)
+
+            return False
+        return check
+
+    def _compile_list_check(self, sub_type):
+        def check_list(value):
             if not isinstance(value, list):
                 return False
-            sub_type = self.get_type_from_collection(value_type, 'list')[0]
             return all([self.is_type(sub_type, item) for item in value])
-        if self.is_type_collection(value_type, 'map'):
+        return check_list
+
+    def _compile_map_check(self, sub_types):
+        def check_map(value):
             if not isinstance(value, dict):
                 return False
-            sub_types = self.get_type_from_collection(value_type, 'map')
             sub_type_key = sub_types[0]
             sub_type_value = sub_types[1]
             return all([self.is_type(sub_type_key, k) and
                 self.is_type(sub_type_value, v) for k, v in value.items()])
-
-        if (type(value).__name__ == value_type or
-                    hasattr(value, '_is' + value_type)):
-            return True
-
-        if allow_dict_as_obj and isinstance(value, dict):
-            return self._type_is_ad_object(value_type)
-
-        return False
+        return check_map
 
     def is_type_collection(self, value_type, collection_name):
         return collection_name == value_type[:len(collection_name)]
@@ -157,20 +214,26 @@ class TypeChecker:
         return False
 
     def get_typed_value(self, key, value):
+        converter = self._converters.get(key)
+        if converter is None:
+            converter = self._compile_converter(key)
+            self._converters[key] = converter
+        return converter(value)
+
+    def _compile_converter(self, key):
+        """Returns the callable coercing the values of key to its type."""
         if not self.is_valid_key(key):
-            return value
+            return _identity
         field_type = self.get_type(key)
-        if self.is_type(field_type, value, allow_dict_as_obj=False):
-            return value
+        check = self._get_type_check(field_type)
 
-        if self.is_primitive_type(field_type) and isinstance(value, six.text_type):
-            typed_value = self.convert_string_to_prim_type(field_type, value)
-        elif self.is_type_collection(field_type, "list"):
+        if self.is_type_collection(field_type, "list"):
             sub_type = self.get_type_from_collection(field_type, "list")[0]
-            if isinstance(value, list):
-                typed_value = [self.get_typed_value(sub_type, v) for v in value]
-            else:
-                typed_value = [self.get_typed_value(sub_type, value)]
+
+            def convert(value):
+                if isinstance(value, list):
+                    return [self.get_typed_value(sub_type, v) for v in value]
+                return [self.get_typed_value(sub_type, value)]
         elif self.is_type_collection(field_type, "map"):
             sub_types = self.get_type_from_collection(field_type, "map")
             if len(sub_types) == 2:
@@ -179,28 +242,48 @@ class TypeChecker:
             else:
                 sub_type_key = 'string'
                 sub_type_value = sub_types[0]
-            typed_value = dict(
-                (self.get_typed_value(sub_type_key, k),
-                self.get_typed_value(sub_type_value, v))
-                for (k, v) in value.items()
-            )
-        elif isinstance(value, dict):
-            try:
-                typed_value = self._create_field_object(field_type, value)
-            except:
-                typed_value = value
+
+            def convert(value):
+                return dict(
+                    (self.get_typed_value(sub_type_key, k),
+                    self.get_typed_value(sub_type_value, v))
+                    for (k, v) in value.items()
+                )
         else:
-            typed_value = value
+            def convert(value):
+                if isinstance(value, dict):
+                    try:
+                        return self._create_field_object(field_type, value)
+                    except:
+                        return value
+                return value
+
+        if self.is_primitive_type(field_type):
+            convert_string = self._compile_prim_type_converter(field_type)
+            convert_other = convert
 
-        if not self.is_type(field_type, typed_value):
-            api_utils.warning('Value of ' + key + ' is not be compatible.' +
-                ' Expect ' + field_type + '; got ' + str(type(typed_value)))
-        return typed_value
+            def convert(value):
+                if isinstance(value, six.text_type):
+                    return convert_string(value)
+                return convert_other(value)
+
+        def get_typed_value(value):
+            if value is None or check(value, False):
+                return value
+            typed_value = convert(value)
+            if typed_value is not None and not check(typed_value, True):
+                api_utils.warning('Value of ' + key + ' is not be compatible.' +
+                    ' Expect ' + field_type + '; got ' + str(type(typed_value)))
+            return typed_value
+        return get_typed_value
 
     def _create_field_object(self, field_type, data=None):
-        mod = importlib.import_module(
-            "facebook_business.adobjects." + field_type.lower())
-        if mod is not None and hasattr(mod, field_type):
+        mod = _resolve_ad_object_module(field_type)
+        if mod is None:
+            raise ImportError(
+                "No module named facebook_business.adobjects." +
+                field_type.lower())
+        if hasattr(mod, field_type):
             obj = (getattr(mod, field_type))()
             if data is not None:
                 obj._set_data(data)
@@ -208,9 +291,45 @@ class TypeChecker:
         return None
 
     def _type_is_ad_object(self, value_type):
-        try:
-            mod = importlib.import_module(
-                "facebook_business.adobjects." + value_type.lower())
-            return mod is not None
-        except:
-            return False
+        return _resolve_ad_object_module(value_type) is not None
+
+
+# Modules of the adobjects types, keyed by type name and shared by all the
+# TypeChecker instances. Types that have no module map to None, so that
+# negative lookups are cached as well.
+_ad_object_modules = {}
+
+
+def _resolve_ad_object_module(type_name):
+    """Returns the facebook_business.adobjects module of type_name (e.g. the
+    adcreativeobjectstoryspec module for 'AdCreativeObjectStorySpec'), or
+    None if there is none. Only the first lookup of a type goes through
+    importlib.
+    """
+    try:
+        return _ad_object_modules[type_name]
+    except KeyError:
+        pass
+    try:
+        mod = importlib.import_module(
+            "facebook_business.adobjects." + type_name.lower())
+    except Exception:
+        mod = None
+    _ad_object_modules[type_name] = mod
+    return mod
+
+def _identity(value):
+    return value
+
+
+def _string_to_bool(value):
+    if value in ("false", "0", "null"):
+        return False
+    return True
+
+
+def _compile_enum(values):
+    try:
+        return frozenset(values)
+    except TypeError:
+        return list(values)
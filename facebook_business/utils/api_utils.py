@@ -19,6 +19,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 import warnings
+import six
 from facebook_business import apiconfig
 from facebook_business.exceptions import FacebookBadObjectError
 
@@ -28,3 +29,23 @@ def warning(message):
         raise FacebookBadObjectError(message)
     else:
         warnings.warn(message)
+
+
+def get_header(headers, name):
+    """Returns the value of the header name, ignoring case, or None.
+    headers is a mapping, or a list of {'name': ..., 'value': ...} as in the
+    responses of batch calls.
+    """
+    if not headers:
+        return None
+    if isinstance(headers, list):
+        headers = dict(
+            (header.get('name'), header.get('value')) for header in headers
+        )
+    value = headers.get(name)
+    if value is None and isinstance(headers, dict):
+        lowered = name.lower()
+        for key, header_value in headers.items():
+            if isinstance(key, six.string_types) and key.lower() == lowered:
+                return header_value
+    return value
@@ -0,0 +1,165 @@
+# Copyright 2014 Facebook, Inc.
+
+# You are hereby granted a non-exclusive, worldwide, royalty-free license to
+# use, copy, modify, and distribute this software in source code or binary
+# form for use in connection with the web services and APIs provided by
+# Facebook.
+
+# As with any software that integrates with the Facebook platform, your use
+# of this software is subject to the Facebook Developer Principles and
+# Policies [http://developers.facebook.com/policy/]. This copyright notice
+# shall be included in all copies or substantial portions of the software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+jsoncodec module selects the JSON library used to encode request parameters
+and to decode responses.
+
+The default codec is set with the 'JSON_CODEC' key of
+apiconfig.ads_api_config, and the codec of an api instance with the json_codec
+argument of FacebookAdsApi (or FacebookAdsApi.init), to one of:
+    'json': the standard library (default).
+    'orjson', 'ujson', 'simdjson': the corresponding package, falling back to
+        the standard library with a warning if it is not installed.
+    'auto': the fastest installed package amongst the above.
+    any object implementing loads() and dumps() like JsonCodec.
+"""
+
+import json
+import warnings
+
+import six
+
+from facebook_business import apiconfig
+
+
+class JsonCodec(object):
+    """Standard library codec, with the default output of json.dumps()."""
+
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, sort_keys=False):
+        return json.dumps(obj, sort_keys=sort_keys)
+
+
+class OrjsonCodec(JsonCodec):
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj, sort_keys=False):
+        option = self._orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        try:
+            return self._orjson.dumps(obj, option=option).decode('utf-8')
+        except TypeError:
+            # e.g. integers over 64 bits, which the json module supports
+            return super(OrjsonCodec, self).dumps(obj, sort_keys)
+
+
+class UjsonCodec(JsonCodec):
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj, sort_keys=False):
+        try:
+            return self._ujson.dumps(
+                obj,
+                sort_keys=sort_keys,
+                escape_forward_slashes=False,
+            )
+        except (TypeError, OverflowError):
+            return super(UjsonCodec, self).dumps(obj, sort_keys)
+
+
+class SimdjsonCodec(JsonCodec):
+    """pysimdjson only decodes, encoding is left to the json module."""
+
+    name = 'simdjson'
+
+    def __init__(self):
+        import simdjson
+        self._simdjson = simdjson
+
+    def loads(self, data):
+        return self._simdjson.loads(data)
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    SimdjsonCodec.name: SimdjsonCodec,
+}
+
+# Preference order of the 'auto' setting
+AUTO_CODECS = ('orjson', 'simdjson', 'ujson', 'json')
+
+_codecs = {}
+
+
+def _create_codec(name):
+    if name == 'auto':
+        for candidate in AUTO_CODECS:
+            try:
+                return CODECS[candidate]()
+            except ImportError:
+                continue
+    if name not in CODECS:
+        raise ValueError(
+            "Unknown JSON codec %r, expected one of: %s"
+            % (name, ', '.join(sorted(CODECS) + ['auto'])),
+        )
+    try:
+        return CODECS[name]()
+    except ImportError:
+        warnings.warn(
+            "JSON codec %r is not installed, falling back to the json "
+            "module." % name,
+        )
+        return JsonCodec()
+
+
+def get_codec(setting=None):
+    """Returns the codec of setting, by default the one currently set in
+    apiconfig."""
+    if setting is None:
+        setting = apiconfig.ads_api_config.get('JSON_CODEC', 'json')
+    if not isinstance(setting, six.string_types):
+        return setting
+    codec = _codecs.get(setting)
+    if codec is None:
+        codec = _codecs[setting] = _create_codec(setting)
+    return codec
+
+
+def loads(data):
+    return get_codec().loads(data)
+
+
+def dumps(obj, sort_keys=False):
+    return get_codec().dumps(obj, sort_keys=sort_keys)
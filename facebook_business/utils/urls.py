@@ -20,6 +20,18 @@
 
 import six
 
+# The quoted form of each byte, as rendered by urllib.parse.quote
+_QUOTED_BYTES = [
+    six.moves.urllib.parse.quote(six.int2byte(byte))
+    for byte in range(256)
+]
+
+# The bytes left as is by urllib.parse.quote
+_SAFE_BYTES = b''.join(
+    six.int2byte(byte) for byte in range(256)
+    if len(_QUOTED_BYTES[byte]) == 1
+)
+
 
 def quote_with_encoding(val):
     """Quote a string that will be placed in url.
@@ -42,4 +54,38 @@ def quote_with_encoding(val):
     elif not isinstance(val, bytes):
         val = val.encode("utf-8")
 
-    return six.moves.urllib.parse.quote(val)
+    # Values with nothing to quote, such as ids and field names, are the
+    # most common: urllib.parse.quote(val) returns them as is too
+    if not val.rstrip(_SAFE_BYTES):
+        return val.decode('ascii') if six.PY3 else val
+    # Same as urllib.parse.quote(val), which is slower on values to quote
+    # such as JSON-encoded targeting specs
+    return ''.join(map(_QUOTED_BYTES.__getitem__, bytearray(val)))
+
+
+# The params authenticating a call, which caches and recordings leave out
+SECRET_PARAMS = ('access_token', 'appsecret_proof')
+
+
+def split_secret_params(url):
+    """Returns url without the SECRET_PARAMS of its query string, which
+    paging URLs carry, and the list of their values."""
+    parts = six.moves.urllib.parse.urlsplit(url)
+    if not parts.query:
+        return url, []
+    query = []
+    secrets = []
+    for key, value in six.moves.urllib.parse.parse_qsl(
+        parts.query,
+        keep_blank_values=True,
+    ):
+        if key in SECRET_PARAMS:
+            secrets.append(value)
+        else:
+            query.append((key, value))
+    if not secrets:
+        return url, []
+    url = six.moves.urllib.parse.urlunsplit(
+        parts._replace(query=six.moves.urllib.parse.urlencode(query)),
+    )
+    return url, secrets
@@ -22,8 +22,10 @@
 video uploader that is used to upload video to adaccount
 """
 
+from facebook_business.api import check_sync_api
 from facebook_business.exceptions import FacebookError
 from facebook_business.exceptions import FacebookRequestError
+from facebook_business.session import FacebookSession
 from abc import ABCMeta, abstractmethod
 
 import os
@@ -64,6 +66,7 @@ class VideoUploadSession(object):
     def __init__(self, video, wait_for_encoding=False, interval=3, timeout=180):
         self._video = video
         self._api = video.get_api_assured()
+        check_sync_api(self._api, 'VideoUploader')
         if (video.Field.filepath in video):
             self._file_path = video[video.Field.filepath]
             self._slideshow_spec = None
@@ -374,7 +377,7 @@ class VideoUploadRequest(object):
             path,
             params=self._params,
             files=self._files,
-            url_override='https://graph-video.facebook.com',
+            url_override=FacebookSession.GRAPH_VIDEO,
         )
 
     def setParams(self, params, files=None):
@@ -386,6 +389,7 @@ class VideoEncodingStatusChecker(object):
 
     @staticmethod
     def waitUntilReady(api, video_id, interval, timeout):
+        check_sync_api(api, 'waitUntilReady')
         start_time = time.time()
         while True:
             status = VideoEncodingStatusChecker.getStatus(api, video_id)
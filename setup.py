@@ -47,6 +47,10 @@ PACKAGE_DATA = {
     'facebook_business': ['*.crt'],
     'facebook_business.test': ['*.jpg']
 }
+PACKAGE_EXTRAS_REQUIRE = {
+    'async': ['aiohttp >= 3.5.0'],
+    'http2': ['httpx[http2] >= 0.26.0'],
+}
 PACKAGE_LICENSE = 'LICENSE.txt'
 PACKAGE_DESCRIPTION = 'Facebook Business SDK'
 
@@ -69,5 +73,6 @@ setup(
     description=PACKAGE_DESCRIPTION,
     long_description=PACKAGE_LONG_DESCRIPTION,
     install_requires=PACKAGE_INSTALL_REQUIRES,
+    extras_require=PACKAGE_EXTRAS_REQUIRE,
     long_description_content_type="text/markdown",
 )